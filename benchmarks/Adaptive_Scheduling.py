@@ -0,0 +1,162 @@
+"""
+Portal requests and detection latency of the fixed cadence versus the adaptive DisciplineScheduler.
+
+Simulated time, no portal: every discipline publishes as a Poisson process with its
+own rate (a few active blogs, many occasional or dormant ones). Both strategies see
+the same posts. The history_days before the simulation seed the scheduler, as the
+stored posts do at startup. Quiet hours are not modelled.
+
+- fixed: every discipline is checked every --fixed-seconds (the crawler loop's sleep).
+- adaptive: a cycle starts when the next discipline is due and only checks the due ones.
+
+A check is counted as one portal request (the first page of the blog).
+
+    python -m benchmarks.Adaptive_Scheduling --disciplines 200 --days 14 --output scheduling.json
+"""
+import argparse
+import bisect
+import json
+import random
+import statistics
+import sys
+from datetime import date
+from typing import Dict, List
+
+from src.application.services.Discipline_Scheduler import DisciplineScheduler
+
+DAY = 86400
+# Share of the disciplines and their mean posts per day
+PROFILES = [("active", 0.15, 1.0), ("occasional", 0.35, 1 / 7), ("dormant", 0.5, 1 / 30)]
+
+
+class _Clock:
+    def __init__(self, now: float):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def build_posts(disciplines: int, start: float, end: float, seed: int) -> Dict[str, List[float]]:
+    """Publication times (epoch seconds) per discipline between start and end."""
+    rng = random.Random(seed)
+    posts = {}
+    for i in range(disciplines):
+        roll, rate = rng.random(), PROFILES[-1][2]
+        for _, share, profile_rate in PROFILES:
+            if roll < share:
+                rate = profile_rate
+                break
+            roll -= share
+        times, t = [], start
+        while True:
+            t += rng.expovariate(rate / DAY)
+            if t >= end:
+                break
+            times.append(t)
+        posts[f"disc{i:04d}"] = times
+    return posts
+
+
+def _summary(checks: int, latencies: List[float], days: float) -> Dict[str, float]:
+    ordered = sorted(latencies)
+    return {
+        "checks": checks,
+        "checks_per_day": round(checks / days, 1),
+        "posts_detected": len(ordered),
+        "median_latency_seconds": round(statistics.median(ordered), 1) if ordered else 0.0,
+        "p90_latency_seconds": round(ordered[int(len(ordered) * 0.9)], 1) if ordered else 0.0,
+        "max_latency_seconds": round(ordered[-1], 1) if ordered else 0.0,
+    }
+
+
+def simulate_fixed(posts: Dict[str, List[float]], start: float, end: float, interval: float) -> Dict[str, float]:
+    checks, latencies = 0, []
+    for times in posts.values():
+        index = bisect.bisect_right(times, start)
+        t = start
+        while t < end:
+            checks += 1
+            while index < len(times) and times[index] <= t:
+                latencies.append(t - times[index])
+                index += 1
+            t += interval
+    return _summary(checks, latencies, (end - start) / DAY)
+
+
+def simulate_adaptive(posts: Dict[str, List[float]], start: float, end: float, max_sleep: float,
+                      scheduler_options: Dict[str, float], history_days: int) -> Dict[str, float]:
+    clock = _Clock(start)
+    scheduler = DisciplineScheduler(clock=clock, history_days=history_days, **scheduler_options)
+    history = {id_cripto: [date.fromtimestamp(t) for t in times if t <= start] for id_cripto, times in posts.items()}
+    next_index = {id_cripto: bisect.bisect_right(times, start) for id_cripto, times in posts.items()}
+    checks, latencies = 0, []
+
+    while clock.now < end:
+        for id_cripto in scheduler.plan(posts.keys(), lambda: history):
+            checks += 1
+            times, index = posts[id_cripto], next_index[id_cripto]
+            found = []
+            while index < len(times) and times[index] <= clock.now:
+                latencies.append(clock.now - times[index])
+                found.append(date.fromtimestamp(times[index]))
+                index += 1
+            next_index[id_cripto] = index
+            scheduler.record(id_cripto, found)
+        # Same rule as the crawler loops: sleep until the next due discipline, within [30 s, max_sleep]
+        clock.now += max(30.0, scheduler.seconds_until_next_due(max_sleep))
+
+    return _summary(checks, latencies, (end - start) / DAY)
+
+
+def run(disciplines: int, days: float, history_days: int, fixed_seconds: float, seed: int,
+        scheduler_options: Dict[str, float]) -> Dict:
+    start = 1_700_000_000.0
+    end = start + days * DAY
+    posts = build_posts(disciplines, start - history_days * DAY, end, seed)
+    fixed = simulate_fixed(posts, start, end, fixed_seconds)
+    adaptive = simulate_adaptive(posts, start, end, fixed_seconds, scheduler_options, history_days)
+    return {
+        "disciplines": disciplines,
+        "days": days,
+        "fixed_seconds": fixed_seconds,
+        "scheduler": scheduler_options,
+        "fixed": fixed,
+        "adaptive": adaptive,
+        "checks_ratio": round(adaptive["checks"] / fixed["checks"], 4) if fixed["checks"] else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulates the fixed and the adaptive polling of the disciplines.")
+    parser.add_argument("--disciplines", type=int, default=200)
+    parser.add_argument("--days", type=float, default=14)
+    parser.add_argument("--history-days", type=int, default=60)
+    parser.add_argument("--fixed-seconds", type=float, default=300, help="Cadence of the fixed crawler loop")
+    parser.add_argument("--min-interval", type=float, default=120)
+    parser.add_argument("--max-interval-minutes", type=float, default=360)
+    parser.add_argument("--backoff", type=float, default=1.5)
+    parser.add_argument("--daily-interval", type=float, default=180,
+                        help="Ceiling of a discipline posting once a day (seconds)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Writes the results to this JSON file (stdout otherwise)")
+    args = parser.parse_args()
+
+    options = {"min_interval_seconds": args.min_interval, "max_interval_seconds": args.max_interval_minutes * 60,
+               "backoff": args.backoff, "daily_interval_seconds": args.daily_interval}
+    report = run(args.disciplines, args.days, args.history_days, args.fixed_seconds, args.seed, options)
+    for name in ("fixed", "adaptive"):
+        result = report[name]
+        print(f"{name:>9}: {result['checks_per_day']:>9} checks/day, median latency "
+              f"{result['median_latency_seconds']:.0f}s, p90 {result['p90_latency_seconds']:.0f}s, "
+              f"max {result['max_latency_seconds']:.0f}s", file=sys.stderr)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""
+In-memory fakes for the repositories and services used by the sync pipeline,
+built from a SyntheticCorpus so benchmarks measure our code and not the
+database, the portal or WhatsApp.
+"""
+import datetime
+import html
+import threading
+from typing import Callable, Dict, List, Optional, Set, Tuple
+from src.domain.models.Discipline import Discipline
+from src.domain.models.Post import Post
+from src.domain.models.Report_Card import ReportCard
+from src.domain.models.Student import Student
+from src.domain.models.Student_Discipline import StudentDiscipline
+from src.domain.services.Notification_Service import NotificationService
+from src.domain.services.Scraping_Service import ScrapingService
+from benchmarks.Portal_Stand_In import SyntheticCorpus
+
+BASE_URL = "http://portal.invalid"
+POSTS_PAGE_SIZE = 3
+
+
+class FakeDatabase:
+    """Rows as the repositories would return them, with IDs assigned like the real tables."""
+
+    def __init__(self, corpus: SyntheticCorpus, known_posts_per_discipline: Optional[int] = None):
+        self.students: List[Student] = []
+        self.disciplines: List[Discipline] = []
+        self.posts: List[Post] = []
+        self.student_disciplines: List[StudentDiscipline] = []
+
+        discipline_ids: Dict[str, int] = {}
+        for i, (id_cripto, name) in enumerate(corpus.disciplines.items(), start=1):
+            discipline_ids[id_cripto] = i
+            self.disciplines.append(Discipline(name=html.unescape(name), id_cripto=id_cripto, id_discipline=i, baselined=True))
+
+        post_id = 0
+        for id_cripto, posts in corpus.posts.items():
+            # The newest posts beyond known_posts_per_discipline are left out, so a cycle finds them as new
+            known = posts if known_posts_per_discipline is None else posts[len(posts) - known_posts_per_discipline:]
+            for post in known:
+                post_id += 1
+                self.posts.append(to_post(post, discipline_ids[id_cripto], post_id))
+
+        for i, (registration, (password, name)) in enumerate(corpus.students.items(), start=1):
+            self.students.append(Student(phone_number=f"5527{i:09d}", registration=registration,
+                                         password=password, id_student=i, name=name))
+            for id_cripto in corpus.enrollments[registration]:
+                self.student_disciplines.append(StudentDiscipline(i, discipline_ids[id_cripto]))
+
+
+def to_post(post, discipline_id: int, post_id: Optional[int] = None) -> Post:
+    return Post(post_date=post.date, post_url=f"{BASE_URL}/Aluno/BlogPost/?id={post.post_id}",
+                discipline_id=discipline_id, content=f"{post.title}:\n{post.body}", id_post=post_id)
+
+
+class FakeStudentRepository:
+    def __init__(self, db: FakeDatabase):
+        self.db = db
+
+    def get_all(self) -> List[Student]:
+        return list(self.db.students)
+
+    def get_all_ids(self) -> Set[int]:
+        return {s.id_student for s in self.db.students}
+
+    def get_since(self, last_id: int) -> List[Student]:
+        return [s for s in self.db.students if s.id_student > last_id]
+
+
+class FakeDisciplineRepository:
+    def __init__(self, db: FakeDatabase):
+        self.db = db
+        self._lock = threading.Lock()
+
+    def get_all(self) -> List[Discipline]:
+        return list(self.db.disciplines)
+
+    def get_since(self, last_id: int) -> List[Discipline]:
+        return [d for d in self.db.disciplines if d.id_discipline > last_id]
+
+    def save_many(self, disciplines: List[Discipline]) -> List[Discipline]:
+        with self._lock:
+            for discipline in disciplines:
+                discipline.id_discipline = len(self.db.disciplines) + 1
+                self.db.disciplines.append(discipline)
+        return disciplines
+
+    def mark_baselined_many(self, discipline_ids: List[int]) -> None:
+        ids = set(discipline_ids)
+        for discipline in self.db.disciplines:
+            if discipline.id_discipline in ids:
+                discipline.baselined = True
+
+
+class FakePostRepository:
+    def __init__(self, db: FakeDatabase):
+        self.db = db
+        self.saved = 0
+
+    def get_all(self) -> List[Post]:
+        return list(self.db.posts)
+
+    def get_since(self, last_id: int) -> List[Post]:
+        return [p for p in self.db.posts if p.id_post > last_id]
+
+    def save_many(self, posts: List[Post]) -> None:
+        self.saved += len(posts)
+
+
+class FakeStudentDisciplineRepository:
+    def __init__(self, db: FakeDatabase):
+        self.db = db
+
+    def get_all(self) -> List[StudentDiscipline]:
+        return list(self.db.student_disciplines)
+
+    def save_many(self, student_disciplines: List[StudentDiscipline]) -> None:
+        pass
+
+    def delete_many(self, student_disciplines: List[StudentDiscipline]) -> None:
+        pass
+
+
+class FakeScrapingService(ScrapingService):
+    """Answers from the corpus, paginating posts like CrawlerPosts does."""
+
+    def __init__(self, corpus: SyntheticCorpus, db: FakeDatabase):
+        self.corpus = corpus
+        self.discipline_ids = {d.id_cripto: d.id_discipline for d in db.disciplines}
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def _request(self):
+        with self._lock:
+            self.requests += 1
+
+    def login(self, registration: str, password: str) -> Optional[Tuple[object, object]]:
+        self._request()
+        return {"registration": registration}, {"registration": registration}
+
+    def logout(self, session) -> None:
+        self._request()
+
+    def get_disciplines(self, session, dashboard_html) -> List[Discipline]:
+        return [Discipline(name=html.unescape(self.corpus.disciplines[id_cripto]), id_cripto=id_cripto)
+                for id_cripto in self.corpus.enrollments[dashboard_html["registration"]]]
+
+    def get_posts(self, session, discipline: Discipline,
+                  is_known: Optional[Callable[[Post], bool]] = None, raise_on_error: bool = False) -> List[Post]:
+        posts = self.corpus.posts.get(discipline.id_cripto, [])
+        result = []
+        for start in range(0, len(posts), POSTS_PAGE_SIZE):
+            self._request()
+            page = [to_post(post, self.discipline_ids[discipline.id_cripto]) for post in posts[start:start + POSTS_PAGE_SIZE]]
+            result.extend(page)
+            if is_known and page and is_known(page[-1]):
+                break
+        return result
+
+    def get_student_name(self, registration: str, password: str) -> str:
+        return self.corpus.students[registration][1]
+
+    def get_report_card(self, username: str, password: str) -> ReportCard:
+        return ReportCard(fetched_at=datetime.datetime.now())
+
+    def get_report_card_with_session(self, session, dashboard_html) -> ReportCard:
+        return ReportCard(fetched_at=datetime.datetime.now())
+
+    def get_grades(self, username: str, password: str) -> Dict[str, Dict[str, str]]:
+        return {}
+
+    def get_absences(self, username: str, password: str) -> Dict[str, Dict[str, str]]:
+        return {}
+
+
+class FakeNotificationService(NotificationService):
+    """Counts messages instead of sending them."""
+
+    def __init__(self):
+        self.sent = 0
+        self._lock = threading.Lock()
+
+    def send_notification(self, message: str) -> None:
+        self.send_direct_message("group", message)
+
+    def student_msg(self, phone: str, msg: str) -> None:
+        self.send_direct_message(phone, msg)
+
+    def send_direct_message(self, phone: str, msg: str) -> None:
+        with self._lock:
+            self.sent += 1
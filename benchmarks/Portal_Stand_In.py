@@ -0,0 +1,371 @@
+"""
+Local stand-in for the academic portal, so the scraping layer and the whole
+sync pipeline can be exercised and benchmarked without network access.
+
+It serves a synthetic corpus (or recorded pages dropped in a directory):
+    POST /                                   login (Matricula, password) -> dashboard
+    GET  /Aluno/Logout                       logout
+    GET  /Ajax/GetSujectList/                disciplines as JSON
+    GET  /Aluno/BlogCarregarMais/            paginated posts (parametros, pageSize, pageNumber)
+    GET  /Aluno/Boletins                     report card tables
+    GET  /__stats                            request counters (JSON)
+    POST /__publish?parametros=<id>          publishes a new post in a discipline
+
+Usage:
+    python -m benchmarks.Portal_Stand_In --students 1000 --disciplines 200 --posts-per-discipline 250
+    BLOG_URL=http://127.0.0.1:8080 python -m src.interface.Cli
+"""
+import argparse
+import datetime
+import html
+import json
+import os
+import random
+import secrets
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+MONTHS = ['jan', 'fev', 'mar', 'abr', 'mai', 'jun', 'jul', 'ago', 'set', 'out', 'nov', 'dez']
+SESSION_COOKIE = "ASP.NET_SessionId"
+LOGIN_PAGE = "<html><body><form>Login</form></body></html>"
+
+
+@dataclass
+class SyntheticPost:
+    post_id: int
+    date: datetime.date
+    title: str
+    body: str
+
+
+@dataclass
+class SyntheticCorpus:
+    """Deterministic students, disciplines, enrollments, posts and grades built from a seed."""
+    students: Dict[str, Tuple[str, str]] = field(default_factory=dict)  # registration -> (password, name)
+    disciplines: Dict[str, str] = field(default_factory=dict)  # id_cripto -> name
+    enrollments: Dict[str, List[str]] = field(default_factory=dict)  # registration -> [id_cripto]
+    posts: Dict[str, List[SyntheticPost]] = field(default_factory=dict)  # id_cripto -> posts, newest first
+    grades: Dict[Tuple[str, str], Dict[str, str]] = field(default_factory=dict)  # (registration, id_cripto) -> columns
+
+    @classmethod
+    def build(cls, students: int = 100, disciplines: int = 20, disciplines_per_student: int = 6,
+              posts_per_discipline: int = 30, seed: int = 42) -> "SyntheticCorpus":
+        rng = random.Random(seed)
+        corpus = cls()
+        today = datetime.date.today()
+
+        for d in range(disciplines):
+            id_cripto = f"D{d:05d}{rng.getrandbits(32):08x}"
+            corpus.disciplines[id_cripto] = f"Disciplina {d:03d} - Tópicos &amp; Métodos"
+            # Posts spread over the last ~300 days, one date per post, newest first
+            days_ago = sorted(rng.sample(range(300), min(posts_per_discipline, 300)))
+            corpus.posts[id_cripto] = [
+                SyntheticPost(post_id=d * 100000 + i,
+                              date=today - datetime.timedelta(days=days_ago[i % len(days_ago)]),
+                              title=f"Aviso {i} da disciplina {d}",
+                              body=cls._post_body(rng, i))
+                for i in range(posts_per_discipline)
+            ]
+
+        ids = list(corpus.disciplines)
+        for s in range(students):
+            registration = f"2024{s:06d}"
+            corpus.students[registration] = ("senha", f"Aluno Sintético {s}")
+            enrolled = rng.sample(ids, min(disciplines_per_student, len(ids)))
+            corpus.enrollments[registration] = enrolled
+            for id_cripto in enrolled:
+                av1, av2 = rng.choice(["-", f"{rng.randint(0, 10)},0"]), rng.choice(["-", f"{rng.randint(0, 10)},5"])
+                corpus.grades[(registration, id_cripto)] = {
+                    "AV1": av1, "AV2": av2, "MP": "-", "PF": "-", "Final": "-", "Resultado": "Cursando",
+                    "TF1": str(rng.randint(0, 8)), "TF2": str(rng.randint(0, 8)), "TF": str(rng.randint(0, 16)),
+                }
+        return corpus
+
+    @staticmethod
+    def _post_body(rng: random.Random, i: int) -> str:
+        paragraphs = [f"Prezados alunos, informação número {i} &eacute; importante ."]
+        for _ in range(rng.randint(1, 4)):
+            paragraphs.append("Lorem ipsum dolor sit amet, <b>consectetur</b> adipiscing elit" + ", sed do" * rng.randint(1, 20))
+        return "<br>".join(paragraphs) + "<script>track()</script><a href='#'>anexo</a>"
+
+
+class PortalStandIn:
+    """
+    Threaded HTTP server serving a SyntheticCorpus. Every response can be delayed
+    (latency_ms +- jitter_ms) and a fraction of them turned into HTTP 500s (error_rate).
+    Pages found in corpus_dir (dashboard.html, posts.html, boletins.html) are served
+    verbatim instead of the synthetic ones. Blog pages larger than max_page_size are
+    silently cut to that size, or answered with HTTP 400 with reject_large_pages.
+    """
+
+    def __init__(self, corpus: SyntheticCorpus, host: str = "127.0.0.1", port: int = 0,
+                 latency_ms: float = 0, jitter_ms: float = 0, error_rate: float = 0,
+                 corpus_dir: Optional[str] = None, seed: int = 42,
+                 max_page_size: Optional[int] = None, reject_large_pages: bool = False):
+        self.corpus = corpus
+        self.max_page_size = max_page_size
+        self.reject_large_pages = reject_large_pages
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.recorded = self._load_recorded(corpus_dir)
+        self._rng = random.Random(seed)
+        self._sessions: Dict[str, str] = {}  # cookie -> registration
+        self._stats: Dict[str, int] = {}
+        self._next_post_id = 10 ** 9
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "PortalStandIn":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="portal-stand-in", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats)
+
+    def reset_stats(self):
+        with self._lock:
+            self._stats.clear()
+
+    def publish(self, id_cripto: str, title: str = "Novo aviso", body: str = "Conteúdo novo.") -> Optional[SyntheticPost]:
+        """Adds a post at the top of a discipline's blog, as the portal would."""
+        with self._lock:
+            if id_cripto not in self.corpus.posts:
+                return None
+            self._next_post_id += 1
+            post = SyntheticPost(self._next_post_id, datetime.date.today(), title, body)
+            self.corpus.posts[id_cripto].insert(0, post)
+            return post
+
+    # --- Rendering ---
+
+    def render_dashboard(self, registration: str) -> str:
+        if "dashboard.html" in self.recorded:
+            return self.recorded["dashboard.html"]
+        _, name = self.corpus.students[registration]
+        cards = "".join(
+            f'<div class="card-turma"><h3>{self.corpus.disciplines[id_cripto]}</h3>'
+            f'<a href="#">menu</a><a href="/Aluno/Blog/?parametros={id_cripto}&tab=1">Blog</a></div>'
+            for id_cripto in self.corpus.enrollments[registration]
+        )
+        return (f'<html><head><title>Portal</title></head><body>'
+                f'<nav><a title="Boletins" href="/Aluno/Boletins">Boletins</a></nav>'
+                f'<p class="perfil-aluno-nome">{html.escape(name)}</p>'
+                f'<div class="turmas">{cards}</div></body></html>')
+
+    def render_posts(self, id_cripto: str, page_size: int, page_number: int) -> str:
+        if "posts.html" in self.recorded:
+            return self.recorded["posts.html"] if page_number == 0 else ""
+        with self._lock:
+            posts = list(self.corpus.posts.get(id_cripto, []))
+        page = posts[page_number * page_size:(page_number + 1) * page_size]
+        return "".join(
+            f'<li class="timeline-inverted"><div class="timeline-badge"></div>'
+            f'<div class="timeline-date">{post.date.day:02d} {MONTHS[post.date.month - 1]}</div>'
+            f'<div class="timeline-panel"><div class="panel-heading"><h4 class="panel-title">{post.title}</h4></div>'
+            f'<a class="btn btn-default" href="/Aluno/BlogPost/?id={post.post_id}">Ver</a>'
+            f'<div class="panel-body">{post.body}</div></div></li>'
+            for post in page
+        )
+
+    def render_report_card(self, registration: str) -> str:
+        if "boletins.html" in self.recorded:
+            return self.recorded["boletins.html"]
+        columns = ["AV1", "AV2", "MP", "PF", "Final", "Resultado", "TF1", "TF2", "TF"]
+        header = "".join(f"<th>{c}</th>" for c in ["Disciplina"] + columns)
+        rows = "".join(
+            f"<tr><td>{self.corpus.disciplines[id_cripto]}</td>"
+            + "".join(f"<td>{self.corpus.grades[(registration, id_cripto)][c]}</td>" for c in columns)
+            + "</tr>"
+            for id_cripto in self.corpus.enrollments[registration]
+        )
+        return (f'<html><body><h2>Boletim</h2>'
+                f'<table class="table table-hover table-bordered school-report"><thead><tr>{header}</tr></thead>'
+                f'<tbody>{rows}</tbody></table></body></html>')
+
+    def render_disciplines_json(self, registration: str) -> str:
+        return json.dumps([
+            {"NomeDisciplina": "\t" + self.corpus.disciplines[id_cripto], "IdBlogPostCripto": id_cripto}
+            for id_cripto in self.corpus.enrollments[registration]
+        ])
+
+    # --- Plumbing ---
+
+    @staticmethod
+    def _load_recorded(corpus_dir: Optional[str]) -> Dict[str, str]:
+        recorded = {}
+        if corpus_dir:
+            for name in ("dashboard.html", "posts.html", "boletins.html"):
+                path = os.path.join(corpus_dir, name)
+                if os.path.exists(path):
+                    with open(path, encoding="utf-8") as f:
+                        recorded[name] = f.read()
+        return recorded
+
+    def _count(self, key: str):
+        with self._lock:
+            self._stats[key] = self._stats.get(key, 0) + 1
+
+    def _delay_and_maybe_fail(self) -> bool:
+        with self._lock:
+            delay = self.latency_ms + self._rng.uniform(-self.jitter_ms, self.jitter_ms)
+            fail = self._rng.random() < self.error_rate
+        if delay > 0:
+            time.sleep(delay / 1000)
+        return fail
+
+    def _handler_class(self):
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body leave in one write; two small writes hit Nagle + delayed ACK (~40 ms each)
+            wbufsize = 64 * 1024
+
+            def log_message(self, format, *args):
+                pass  # Keeps benchmark output clean
+
+            def do_GET(self):
+                self._dispatch("GET")
+
+            def do_POST(self):
+                self._dispatch("POST")
+
+            def _dispatch(self, method: str):
+                parts = urlsplit(self.path)
+                path = parts.path.rstrip("/") or "/"
+                query = {k: v[0] for k, v in parse_qs(parts.query, keep_blank_values=True).items()}
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length).decode("utf-8") if length else ""
+                stand_in._count(f"{method} {path}")
+
+                if path == "/__stats":
+                    return self._send(200, json.dumps(stand_in.stats()), "application/json")
+                if path == "/__publish" and method == "POST":
+                    post = stand_in.publish(query.get("parametros", ""))
+                    return self._send(200 if post else 404, json.dumps({"published": bool(post)}), "application/json")
+
+                if stand_in._delay_and_maybe_fail():
+                    stand_in._count("errors")
+                    return self._send(500, "Erro interno simulado")
+
+                if path == "/" and method == "POST":
+                    return self._login({k: v[0] for k, v in parse_qs(body).items()})
+
+                registration = self._session_student()
+                if registration is None:
+                    if path == "/":
+                        return self._send(200, LOGIN_PAGE)
+                    return self._redirect("/")
+
+                if path == "/Aluno/Logout":
+                    with stand_in._lock:
+                        stand_in._sessions.pop(self._cookie(), None)
+                    return self._send(200, "<html><body>Até logo</body></html>")
+                if path == "/Aluno/BlogCarregarMais":
+                    page_size = int(query.get("pageSize") or 3)
+                    if stand_in.max_page_size and page_size > stand_in.max_page_size:
+                        if stand_in.reject_large_pages:
+                            return self._send(400, "pageSize inválido")
+                        page_size = stand_in.max_page_size
+                    page_number = int(query.get("pageNumber") or 0)
+                    return self._send(200, stand_in.render_posts(query.get("parametros", ""), page_size, page_number))
+                if path == "/Aluno/Boletins":
+                    return self._send(200, stand_in.render_report_card(registration))
+                if path == "/Ajax/GetSujectList":
+                    return self._send(200, stand_in.render_disciplines_json(registration), "application/json")
+                if path == "/Aluno":
+                    return self._send(200, stand_in.render_dashboard(registration))
+                return self._send(404, "Not found")
+
+            def _login(self, form: Dict[str, str]):
+                registration = form.get("Matricula", "")
+                student = stand_in.corpus.students.get(registration)
+                if student is None or student[0] != form.get("password"):
+                    # The real portal answers a failed login with the login page itself
+                    return self._send(401, LOGIN_PAGE)
+                cookie = secrets.token_hex(16)
+                with stand_in._lock:
+                    stand_in._sessions[cookie] = registration
+                return self._send(200, stand_in.render_dashboard(registration),
+                                  headers={"Set-Cookie": f"{SESSION_COOKIE}={cookie}; Path=/; HttpOnly"})
+
+            def _cookie(self) -> Optional[str]:
+                for part in (self.headers.get("Cookie") or "").split(";"):
+                    name, _, value = part.strip().partition("=")
+                    if name == SESSION_COOKIE:
+                        return value
+                return None
+
+            def _session_student(self) -> Optional[str]:
+                with stand_in._lock:
+                    return stand_in._sessions.get(self._cookie())
+
+            def _redirect(self, location: str):
+                self._send(302, "", headers={"Location": location})
+
+            def _send(self, status: int, content: str, content_type: str = "text/html; charset=utf-8",
+                      headers: Optional[Dict[str, str]] = None):
+                payload = content.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(payload)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+                self.wfile.flush()
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serves a synthetic copy of the academic portal.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--students", type=int, default=100)
+    parser.add_argument("--disciplines", type=int, default=20)
+    parser.add_argument("--disciplines-per-student", type=int, default=6)
+    parser.add_argument("--posts-per-discipline", type=int, default=30)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--error-rate", type=float, default=0)
+    parser.add_argument("--corpus-dir", default=None, help="Directory with recorded dashboard.html, posts.html, boletins.html")
+    parser.add_argument("--max-page-size", type=int, default=None, help="Largest blog page served")
+    parser.add_argument("--reject-large-pages", action="store_true", help="Answer larger pages with HTTP 400 instead of cutting them")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    corpus = SyntheticCorpus.build(args.students, args.disciplines, args.disciplines_per_student,
+                                   args.posts_per_discipline, args.seed)
+    stand_in = PortalStandIn(corpus, args.host, args.port, args.latency_ms, args.jitter_ms, args.error_rate,
+                             args.corpus_dir, args.seed, args.max_page_size, args.reject_large_pages).start()
+    print(f"Portal stand-in listening on {stand_in.url} "
+          f"({len(corpus.students)} students, {len(corpus.disciplines)} disciplines). "
+          f"Students log in as 2024000000.. with password 'senha'.")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        stand_in.stop()
+
+
+if __name__ == "__main__":
+    main()
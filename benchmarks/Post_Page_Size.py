@@ -0,0 +1,108 @@
+"""
+Blog requests per discipline versus the BlogCarregarMais page size, against the portal stand-in.
+
+For every page size the real CrawlerPosts (with a fresh page size negotiation) reads:
+
+- full: the whole blog of every discipline, as the baseline of a new class does.
+- check: a regular check, where only the newest --new-posts posts of each blog are unknown.
+
+Scenarios: the portal honours any size, cuts pages to --cap posts, or answers larger
+pages with HTTP 400. Requests are counted by the stand-in and include the probes
+and the retries caused by the negotiation.
+
+    python -m benchmarks.Post_Page_Size --sizes 3 5 10 20 50 --output page_size.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+from typing import Dict, List, Optional
+
+from benchmarks.Portal_Stand_In import PortalStandIn, SyntheticCorpus
+
+os.environ.setdefault("PORTAL_REQUESTS_PER_SECOND", "1000000")
+os.environ.setdefault("PORTAL_BURST", "1000000")
+
+POSTS_PATH = "GET /Aluno/BlogCarregarMais"
+
+
+def _crawl(stand_in: PortalStandIn, size: int, new_posts: Optional[int]) -> Dict[str, float]:
+    from src.domain.models.Discipline import Discipline
+    from src.infrastructure.scraping.Crawler_Posts import CrawlerPosts
+    from src.infrastructure.scraping.Scraping_Login import ScrapingLogin
+
+    login = ScrapingLogin()
+    registration = next(iter(stand_in.corpus.students))
+    session, _ = login.login(registration, stand_in.corpus.students[registration][0])
+    crawler = CrawlerPosts(login, page_size=size)
+    disciplines = [Discipline(name, id_cripto, i) for i, (id_cripto, name) in enumerate(stand_in.corpus.disciplines.items())]
+
+    found = 0
+    stand_in.reset_stats()
+    started = time.perf_counter()
+    for discipline in disciplines:
+        is_known = None
+        if new_posts is not None:
+            new_urls = {f"{login.url}/Aluno/BlogPost/?id={post.post_id}"
+                        for post in stand_in.corpus.posts[discipline.id_cripto][:new_posts]}
+            is_known = lambda post, new_urls=new_urls: post.post_url not in new_urls
+        with contextlib.redirect_stdout(io.StringIO()):
+            found += len(crawler.get_posts(session, discipline, is_known))
+    elapsed = time.perf_counter() - started
+    requests = stand_in.stats().get(POSTS_PATH, 0)
+    session.close()
+    return {
+        "requests_per_discipline": round(requests / len(disciplines), 2),
+        "posts_per_discipline": round(found / len(disciplines), 2),
+        "seconds_per_discipline": round(elapsed / len(disciplines), 4),
+        "negotiated_page_size": crawler.page_size,
+    }
+
+
+def run(sizes: List[int], disciplines: int, posts: int, new_posts: int, cap: int, latency_ms: float) -> Dict:
+    corpus = SyntheticCorpus.build(students=1, disciplines=disciplines, disciplines_per_student=1,
+                                   posts_per_discipline=posts)
+    scenarios = {"honoured": {}, "capped": {"max_page_size": cap}, "rejected": {"max_page_size": cap, "reject_large_pages": True}}
+    results = {}
+    for scenario, options in scenarios.items():
+        stand_in = PortalStandIn(corpus, latency_ms=latency_ms, **options).start()
+        os.environ["BLOG_URL"] = stand_in.url
+        try:
+            for size in sizes:
+                result = {"full": _crawl(stand_in, size, None), "check": _crawl(stand_in, size, new_posts)}
+                results.setdefault(scenario, {})[str(size)] = result
+                print(f"{scenario:>9} size {size:>3}: full {result['full']['requests_per_discipline']:>6} req/discipline "
+                      f"({result['full']['posts_per_discipline']:g} posts), check "
+                      f"{result['check']['requests_per_discipline']:>5} req/discipline, "
+                      f"negotiated {result['check']['negotiated_page_size']}", file=sys.stderr)
+        finally:
+            stand_in.stop()
+    return {"disciplines": disciplines, "posts_per_discipline": posts, "new_posts": new_posts, "cap": cap,
+            "latency_ms": latency_ms, "results": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measures blog requests per discipline versus the page size.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[3, 5, 10, 20, 50])
+    parser.add_argument("--disciplines", type=int, default=20)
+    parser.add_argument("--posts", type=int, default=60, help="Posts per discipline blog")
+    parser.add_argument("--new-posts", type=int, default=2, help="Unknown posts per blog in a regular check")
+    parser.add_argument("--cap", type=int, default=10, help="Page size cap of the capped and rejecting scenarios")
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--output", help="Writes the results to this JSON file (stdout otherwise)")
+    args = parser.parse_args()
+
+    report = run(args.sizes, args.disciplines, args.posts, args.new_posts, args.cap, args.latency_ms)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,319 @@
+"""
+Benchmarks for the sync pipeline, run against the fakes in benchmarks/Fakes.py
+(and optionally against the portal stand-in with the real scrapers).
+
+For every benchmark it reports the median wall time and CPU time over --repeat runs,
+the allocations of one extra run traced with tracemalloc, and the process peak RSS.
+Results are written as JSON, and --compare flags the benchmarks that got slower
+than a previous result file.
+
+    python -m benchmarks.Run_Benchmarks --scale realistic --output results.json
+    python -m benchmarks.Run_Benchmarks --scale realistic --compare results.json
+"""
+import argparse
+import contextlib
+import datetime
+import importlib.util
+import io
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+os.environ.setdefault("BLOG_URL", "http://portal.invalid")
+
+from benchmarks.Fakes import (FakeDatabase, FakeDisciplineRepository, FakeNotificationService, FakePostRepository,
+                              FakeScrapingService, FakeStudentDisciplineRepository, FakeStudentRepository)
+from benchmarks.Portal_Stand_In import PortalStandIn, SyntheticCorpus
+from src.application.services.InMemory_Store import InMemoryStore
+from src.application.services.Notification_Dispatcher import NotificationDispatcher
+from src.application.services.Sync_Unit_Of_Work import SyncUnitOfWork
+from src.application.use_cases.Sync_And_Notify import SyncAndNotifyUseCase
+from src.infrastructure.scraping.Html_Parser import POSTS_STRAINER, SUPPORTED_BACKENDS, parse_html
+from src.infrastructure.scraping.Utils import Utils
+
+# students, disciplines, disciplines per student, posts per discipline, new posts per discipline in a cycle
+SCALES = {
+    "small": dict(students=100, disciplines=20, disciplines_per_student=6, posts_per_discipline=30, new_posts=2),
+    # 1k students, 200 disciplines, 50k posts, 20k associations
+    "realistic": dict(students=1000, disciplines=200, disciplines_per_student=20, posts_per_discipline=250, new_posts=2),
+}
+
+# A cycle usually reads the first page or two of each blog, so deeper pages are left out
+CATCH_POSTS_PAGES = 5
+
+
+@dataclass
+class Fixture:
+    corpus: SyntheticCorpus
+    new_posts: int
+
+    def database(self) -> FakeDatabase:
+        known = len(next(iter(self.corpus.posts.values()))) - self.new_posts
+        return FakeDatabase(self.corpus, known_posts_per_discipline=known)
+
+    def store(self, db: FakeDatabase) -> InMemoryStore:
+        store = InMemoryStore()
+        store.full_sync(FakeStudentRepository(db), FakeDisciplineRepository(db), FakePostRepository(db),
+                        FakeStudentDisciplineRepository(db))
+        return store
+
+    def use_case(self, db: FakeDatabase, store: InMemoryStore, scheduling_mode: str = "discipline",
+                 workers: int = 4) -> SyncAndNotifyUseCase:
+        notification_service = FakeNotificationService()
+        # No pacing: the benchmark measures the pipeline, not the WhatsApp limits
+        dispatcher = NotificationDispatcher(notification_service, workers=workers, queue_size=10 ** 7,
+                                            per_destination_per_minute=10 ** 9, per_destination_burst=10 ** 6)
+        dispatcher.start()
+        return SyncAndNotifyUseCase(store, FakeDisciplineRepository(db), FakeStudentDisciplineRepository(db),
+                                    FakePostRepository(db), FakeScrapingService(self.corpus, db), notification_service,
+                                    max_workers=workers, scheduling_mode=scheduling_mode,
+                                    notification_dispatcher=dispatcher)
+
+
+def measure(run: Callable[[object], None], setup: Callable[[], object], repeat: int) -> Dict[str, float]:
+    """Times run(setup()) repeat times, then traces the allocations of one more run. Setup is not measured."""
+    walls, cpus = [], []
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            state = setup()
+            wall, cpu = time.perf_counter(), time.process_time()
+            run(state)
+            walls.append(time.perf_counter() - wall)
+            cpus.append(time.process_time() - cpu)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        state = setup()
+        tracemalloc.start()
+        run(state)
+        current, peak = tracemalloc.get_traced_memory()
+        blocks = sum(stat.count for stat in tracemalloc.take_snapshot().statistics("filename"))
+        tracemalloc.stop()
+
+    return {
+        "wall_seconds": statistics.median(walls),
+        "wall_seconds_min": min(walls),
+        "cpu_seconds": statistics.median(cpus),
+        "alloc_peak_bytes": peak,
+        "alloc_retained_bytes": current,
+        "alloc_retained_blocks": blocks,
+        # High-water mark of the whole process so far (kilobytes on Linux)
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "repeat": repeat,
+    }
+
+
+def bench_store_full_sync(fixture: Fixture, repeat: int) -> Dict[str, float]:
+    db = fixture.database()
+    return measure(lambda _: fixture.store(db), lambda: None, repeat)
+
+
+def bench_sync_student_disciplines(fixture: Fixture, repeat: int) -> Dict[str, float]:
+    """Every student's discipline sync in a steady state (nothing to add or remove)."""
+    def setup():
+        db = fixture.database()
+        use_case = fixture.use_case(db, fixture.store(db))
+        return use_case, [(student, use_case.scraping_service.login(student.registration, student.password))
+                          for student in db.students]
+
+    def run(state):
+        use_case, logins = state
+        for student, (session, dashboard_html) in logins:
+            unit_of_work = use_case._new_unit_of_work()
+            use_case._sync_student_disciplines(student, session, dashboard_html, unit_of_work)
+            unit_of_work.flush()
+        use_case.notification_dispatcher.stop()
+
+    return measure(run, setup, repeat)
+
+
+def bench_sync_discipline_posts(fixture: Fixture, repeat: int) -> Dict[str, float]:
+    """Every discipline crawled once, finding fixture.new_posts new posts each and notifying the class."""
+    def setup():
+        db = fixture.database()
+        use_case = fixture.use_case(db, fixture.store(db))
+        discipline_students = use_case._build_discipline_students_map()
+        students = {s.id_student: s for s in db.students}
+        work = []
+        for discipline in db.disciplines:
+            student_ids = discipline_students.get(discipline.id_cripto)
+            if student_ids:
+                student = students[min(student_ids)]
+                work.append((student, discipline, use_case.scraping_service.login(student.registration, student.password)[0]))
+        return use_case, work, discipline_students
+
+    def run(state):
+        use_case, work, discipline_students = state
+        processed = set()
+        for student, discipline, session in work:
+            unit_of_work = use_case._new_unit_of_work()
+            use_case._sync_discipline_posts(student, [discipline], processed, session, unit_of_work, discipline_students)
+            unit_of_work.flush()
+        use_case.notification_dispatcher.stop()
+
+    return measure(run, setup, repeat)
+
+
+def bench_catch_posts(fixture: Fixture, repeat: int, backend: str) -> Dict[str, float]:
+    """Parses and extracts the first CATCH_POSTS_PAGES post pages (3 posts each) of every discipline."""
+    stand_in = PortalStandIn(fixture.corpus).start()
+    try:
+        db = fixture.database()
+        pages = []
+        for discipline in db.disciplines:
+            count = len(fixture.corpus.posts[discipline.id_cripto])
+            pages.extend((stand_in.render_posts(discipline.id_cripto, 3, n).encode(), discipline)
+                         for n in range(min(CATCH_POSTS_PAGES, (count + 2) // 3)))
+    finally:
+        stand_in.stop()
+
+    def run(_):
+        for page, discipline in pages:
+            Utils.catch_posts(parse_html(page, POSTS_STRAINER, backend), discipline)
+
+    return measure(run, lambda: None, repeat)
+
+
+def bench_end_to_end_cycle(fixture: Fixture, repeat: int, scheduling_mode: str) -> Dict[str, float]:
+    """One full cycle of execute() with fake portal and WhatsApp, until every notification was delivered."""
+    def setup():
+        db = fixture.database()
+        return fixture.use_case(db, fixture.store(db), scheduling_mode)
+
+    def run(use_case):
+        use_case.execute()
+        use_case.notification_dispatcher.stop()
+
+    return measure(run, setup, repeat)
+
+
+def bench_portal_cycle(fixture: Fixture, repeat: int, latency_ms: float) -> Dict[str, float]:
+    """One cycle with the real ScrapingAdapter against the portal stand-in, over HTTP."""
+    stand_in = PortalStandIn(fixture.corpus, latency_ms=latency_ms).start()
+    os.environ["BLOG_URL"] = stand_in.url
+    os.environ.setdefault("PORTAL_REQUESTS_PER_SECOND", "1000000")
+    os.environ.setdefault("PORTAL_BURST", "1000000")
+    from src.infrastructure.scraping.Scraping_Adapter import ScrapingAdapter
+
+    def setup():
+        db = fixture.database()
+        use_case = fixture.use_case(db, fixture.store(db))
+        use_case.scraping_service = ScrapingAdapter()
+        stand_in.reset_stats()
+        return use_case
+
+    def run(use_case):
+        use_case.execute()
+        use_case.notification_dispatcher.stop()
+
+    try:
+        result = measure(run, setup, repeat)
+        result["portal_requests"] = stand_in.stats()
+        return result
+    finally:
+        stand_in.stop()
+
+
+def run_benchmarks(scale: str, repeat: int, only: Optional[List[str]], portal: bool, latency_ms: float) -> Dict[str, Dict]:
+    params = dict(SCALES[scale])
+    new_posts = params.pop("new_posts")
+    fixture = Fixture(SyntheticCorpus.build(**params), new_posts)
+
+    benchmarks: Dict[str, Callable[[], Dict[str, float]]] = {
+        "store_full_sync": lambda: bench_store_full_sync(fixture, repeat),
+        "sync_student_disciplines": lambda: bench_sync_student_disciplines(fixture, repeat),
+        "sync_discipline_posts": lambda: bench_sync_discipline_posts(fixture, repeat),
+        "end_to_end_cycle_discipline": lambda: bench_end_to_end_cycle(fixture, repeat, "discipline"),
+        "end_to_end_cycle_student": lambda: bench_end_to_end_cycle(fixture, repeat, "student"),
+    }
+    for backend in SUPPORTED_BACKENDS:
+        if backend == "lxml" and _missing("lxml"):
+            continue
+        benchmarks[f"catch_posts_{backend.replace('.', '_')}"] = lambda backend=backend: bench_catch_posts(fixture, repeat, backend)
+    if portal:
+        benchmarks["portal_cycle"] = lambda: bench_portal_cycle(fixture, repeat, latency_ms)
+
+    results = {}
+    for name, bench in benchmarks.items():
+        if only and name not in only:
+            continue
+        print(f"Running {name}...", file=sys.stderr)
+        results[name] = bench()
+        print(f"  wall {results[name]['wall_seconds']:.3f}s, cpu {results[name]['cpu_seconds']:.3f}s, "
+              f"alloc peak {results[name]['alloc_peak_bytes'] / 2 ** 20:.1f} MiB", file=sys.stderr)
+    return {"metadata": _metadata(scale, SCALES[scale], repeat), "results": results}
+
+
+def _missing(module: str) -> bool:
+    return importlib.util.find_spec(module) is None
+
+
+def _metadata(scale: str, params: Dict, repeat: int) -> Dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "scale": scale,
+        "params": params,
+        "repeat": repeat,
+    }
+
+
+def compare(current: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """Returns one line per benchmark whose wall or CPU time grew by more than threshold (e.g. 0.1 = 10%)."""
+    regressions = []
+    for name, result in current["results"].items():
+        previous = baseline.get("results", {}).get(name)
+        if not previous:
+            continue
+        for metric in ("wall_seconds", "cpu_seconds"):
+            if previous[metric] > 0 and result[metric] > previous[metric] * (1 + threshold):
+                regressions.append(f"{name}: {metric} {previous[metric]:.4f} -> {result[metric]:.4f} "
+                                   f"(+{(result[metric] / previous[metric] - 1) * 100:.0f}%)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks the sync pipeline against fake services.")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--only", nargs="*", help="Names of the benchmarks to run")
+    parser.add_argument("--portal", action="store_true", help="Also run a cycle with the real scrapers against the portal stand-in")
+    parser.add_argument("--latency-ms", type=float, default=0, help="Latency of the portal stand-in")
+    parser.add_argument("--output", help="Writes the results to this JSON file (stdout otherwise)")
+    parser.add_argument("--compare", help="Previous results file; exits with 1 when a benchmark regressed")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Allowed slowdown for --compare (0.10 = 10%%)")
+    args = parser.parse_args()
+
+    report = run_benchmarks(args.scale, max(1, args.repeat), args.only, args.portal, args.latency_ms)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(report, json.load(f), args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
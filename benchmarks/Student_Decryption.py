@@ -0,0 +1,140 @@
+"""
+Full-sync time versus student count for the encrypted student table.
+
+Each student row has four Fernet encrypted columns. For every student count the
+rows are loaded into an InMemoryStore through StudentPgRepository._decrypt_rows:
+
+- per_value: the previous behaviour, one Fernet.decrypt per column, no cache.
+- cold_sequential: FieldCipher with an empty cache and no process pool.
+- cold_parallel: FieldCipher with an empty cache, split across the (already started) process pool.
+- warm: the next full sync, with every column already in the cache.
+
+    python -m benchmarks.Student_Decryption --students 250 1000 4000 16000 --output decryption.json
+"""
+import argparse
+import base64
+import contextlib
+import io
+import json
+import os
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List
+from cryptography.fernet import Fernet
+
+os.environ.setdefault("WEB_SCRAPER_SECRET_KEY", Fernet.generate_key().decode("utf-8"))
+
+from benchmarks.Fakes import FakeDatabase, FakeDisciplineRepository, FakePostRepository, FakeStudentDisciplineRepository
+from benchmarks.Portal_Stand_In import SyntheticCorpus
+from src.application.services.InMemory_Store import InMemoryStore
+from src.domain.models.Student import Student
+from src.infrastructure.database.Field_Cipher import FieldCipher
+from src.infrastructure.database.Student_pg import StudentPgRepository
+
+
+class _EncryptedStudentRepository:
+    """Serves pre-encrypted rows through the real decryption path, with no database."""
+
+    def __init__(self, repository: StudentPgRepository, rows: List[tuple]):
+        self.repository = repository
+        self.rows = rows
+
+    def get_all(self) -> List[Student]:
+        return self.repository._decrypt_rows(self.rows)
+
+
+class _PerValueStudentRepository:
+    """The decryption as it was before FieldCipher: one Fernet.decrypt per column on every load."""
+
+    def __init__(self, fernet: Fernet, rows: List[tuple]):
+        self.fernet = fernet
+        self.rows = rows
+
+    def _decrypt(self, value: str) -> str:
+        return self.fernet.decrypt(base64.urlsafe_b64decode(value.encode("utf-8"))).decode("utf-8")
+
+    def get_all(self) -> List[Student]:
+        return [Student(phone_number=self._decrypt(row[1]), password=self._decrypt(row[2]), name=self._decrypt(row[3]),
+                        registration=self._decrypt(row[4]), id_student=row[0])
+                for row in self.rows]
+
+
+def _encrypted_rows(count: int, cipher: FieldCipher) -> List[tuple]:
+    return [(i, cipher.encrypt(f"5527{i:09d}"), cipher.encrypt("senha"), cipher.encrypt(f"Aluno Sintético {i}"),
+             cipher.encrypt(f"2024{i:06d}"))
+            for i in range(1, count + 1)]
+
+
+def _time(run: Callable[[], None], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            started = time.perf_counter()
+            run()
+            timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def run(student_counts: List[int], repeat: int, workers: int) -> Dict:
+    key = os.environ["WEB_SCRAPER_SECRET_KEY"]
+    # Disciplines and posts are kept tiny, so the full sync time is the student load
+    db = FakeDatabase(SyntheticCorpus.build(students=1, disciplines=1, disciplines_per_student=1, posts_per_discipline=1))
+    others = (FakeDisciplineRepository(db), FakePostRepository(db), FakeStudentDisciplineRepository(db))
+    results = {}
+
+    for count in student_counts:
+        print(f"Encrypting {count} students...", file=sys.stderr)
+        rows = _encrypted_rows(count, FieldCipher(key))
+        repository = StudentPgRepository(InMemoryStore())
+
+        def full_sync(student_repo):
+            InMemoryStore().full_sync(student_repo, *others)
+
+        def cold(cipher: FieldCipher):
+            # No cache: every load decrypts every column, as the first load of a process does
+            repository.cipher = cipher
+            full_sync(_EncryptedStudentRepository(repository, rows))
+
+        sequential = FieldCipher(key, cache_size=0, workers=1)
+        # The worker processes are started once per process and reused, so they are started before timing
+        parallel = FieldCipher(key, cache_size=0, workers=workers, parallel_threshold=0)
+        parallel.decrypt_many([value for row in rows[:workers] for value in row[1:5]])
+
+        legacy = _PerValueStudentRepository(Fernet(key.encode("utf-8")), rows)
+
+        result = {
+            "per_value_seconds": _time(lambda: full_sync(legacy), repeat),
+            "cold_sequential_seconds": _time(lambda: cold(sequential), repeat),
+            "cold_parallel_seconds": _time(lambda: cold(parallel), repeat),
+        }
+        parallel.shutdown()
+        repository.cipher = FieldCipher(key, cache_size=count * 4)
+        repository.cipher.decrypt_many([value for row in rows for value in row[1:5]])
+        result["warm_seconds"] = _time(lambda: full_sync(_EncryptedStudentRepository(repository, rows)), repeat)
+        results[str(count)] = result
+        print(f"  {count:>6} students: " + ", ".join(f"{name.replace('_seconds', '')} {seconds:.3f}s"
+                                                     for name, seconds in result.items()), file=sys.stderr)
+
+    return {"workers": workers, "cpu_count": os.cpu_count(), "repeat": repeat, "results": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measures full-sync time versus student count with encrypted rows.")
+    parser.add_argument("--students", type=int, nargs="+", default=[250, 1000, 4000, 16000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--output", help="Writes the results to this JSON file (stdout otherwise)")
+    args = parser.parse_args()
+
+    report = run(args.students, max(1, args.repeat), max(1, args.workers))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
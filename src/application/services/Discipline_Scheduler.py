@@ -0,0 +1,127 @@
+import heapq
+import math
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Callable, Dict, Iterable, List, Set, Tuple
+
+
+@dataclass
+class _DisciplineSchedule:
+    interval: float
+    next_due: float
+    post_dates: List[date] = field(default_factory=list)
+
+
+class DisciplineScheduler:
+    """
+    Decides which disciplines are worth a portal request in the current cycle.
+
+    Every discipline (by id_cripto) has its own polling interval, kept in a heap ordered
+    by the next due time:
+
+    - A check that finds new posts brings the interval down to min_interval_seconds.
+    - A check that finds nothing multiplies it by backoff, up to the discipline's ceiling.
+    - The ceiling follows the posting rate of the last history_days days. It is
+      daily_interval_seconds for a discipline posting once a day, and scales with
+      1 / sqrt(posts per day), which gives the lowest mean detection latency for a given
+      number of requests. Quiet disciplines count as half a post per history window.
+
+    Disciplines seen for the first time are due at once, so the first cycle crawls everything.
+    """
+
+    def __init__(self,
+                 min_interval_seconds: float = 120,
+                 max_interval_seconds: float = 6 * 3600,
+                 backoff: float = 1.5,
+                 daily_interval_seconds: float = 180,
+                 history_days: int = 60,
+                 clock: Callable[[], float] = time.time):
+        self.min_interval_seconds = min_interval_seconds
+        self.max_interval_seconds = max(max_interval_seconds, min_interval_seconds)
+        self.backoff = max(backoff, 1.0)
+        self.daily_interval_seconds = daily_interval_seconds
+        self.history_days = history_days
+        self.clock = clock
+        self._schedules: Dict[str, _DisciplineSchedule] = {}
+        self._heap: List[Tuple[float, str]] = []
+        self._lock = threading.Lock()
+
+    def plan(self, id_criptos: Iterable[str],
+             history: Callable[[], Dict[str, List[date]]]) -> Set[str]:
+        """
+        Returns the disciplines among id_criptos that are due now. They are rescheduled right away
+        with their current interval, so a check that never reports back (error, no session) is retried
+        later instead of on every cycle. history is only called when a discipline is new to the
+        scheduler, and returns the known post dates per id_cripto.
+        """
+        wanted = set(id_criptos)
+        now = self.clock()
+        with self._lock:
+            due = wanted - self._schedules.keys()
+            if due:
+                post_dates = history()
+                for id_cripto in due:
+                    schedule = _DisciplineSchedule(0, now, self._recent(post_dates.get(id_cripto, []), now))
+                    schedule.interval = self._ceiling(schedule, now)
+                    self._schedules[id_cripto] = schedule
+
+            while self._heap and self._heap[0][0] <= now:
+                next_due, id_cripto = heapq.heappop(self._heap)
+                schedule = self._schedules.get(id_cripto)
+                if schedule is None or schedule.next_due != next_due:
+                    continue  # Superseded by a later push
+                if id_cripto not in wanted:
+                    # Nobody is enrolled anymore: forgotten, and seeded again if it comes back
+                    del self._schedules[id_cripto]
+                    continue
+                due.add(id_cripto)
+
+            for id_cripto in due:
+                self._push(id_cripto, now + self._schedules[id_cripto].interval)
+        return due
+
+    def record(self, id_cripto: str, new_post_dates: List[date]):
+        """Adapts the interval of a discipline after a check that found new_post_dates."""
+        now = self.clock()
+        with self._lock:
+            schedule = self._schedules.get(id_cripto)
+            if schedule is None:
+                return
+            if new_post_dates:
+                schedule.post_dates = self._recent(schedule.post_dates + list(new_post_dates), now)
+                schedule.interval = self.min_interval_seconds
+            else:
+                schedule.interval = min(schedule.interval * self.backoff, self._ceiling(schedule, now))
+            self._push(id_cripto, now + schedule.interval)
+
+    def seconds_until_next_due(self, default: float) -> float:
+        """How long the crawler can sleep before the next discipline is due, at most default seconds."""
+        with self._lock:
+            while self._heap:
+                next_due, id_cripto = self._heap[0]
+                schedule = self._schedules.get(id_cripto)
+                if schedule is not None and schedule.next_due == next_due:
+                    return max(0.0, min(default, next_due - self.clock()))
+                heapq.heappop(self._heap)
+        return default
+
+    def intervals(self) -> Dict[str, float]:
+        """Current polling interval (seconds) of every tracked discipline."""
+        with self._lock:
+            return {id_cripto: schedule.interval for id_cripto, schedule in self._schedules.items()}
+
+    def _push(self, id_cripto: str, next_due: float):
+        self._schedules[id_cripto].next_due = next_due
+        heapq.heappush(self._heap, (next_due, id_cripto))
+
+    def _ceiling(self, schedule: _DisciplineSchedule, now: float) -> float:
+        posts_per_day = max(len(self._recent(schedule.post_dates, now)), 0.5) / self.history_days
+        ceiling = self.daily_interval_seconds / math.sqrt(posts_per_day)
+        return min(self.max_interval_seconds, max(self.min_interval_seconds, ceiling))
+
+    def _recent(self, post_dates: List[date], now: float) -> List[date]:
+        today = date.fromtimestamp(now)
+        days = [d.date() if isinstance(d, datetime) else d for d in post_dates if d is not None]
+        return [d for d in days if (today - d).days < self.history_days]
@@ -1,4 +1,7 @@
-from typing import List, Optional, Dict
+import functools
+import threading
+from datetime import date
+from typing import List, Optional, Dict, Set, Tuple
 from src.domain.models.Discipline import Discipline
 from src.domain.models.Post import Post
 from src.domain.models.Student import Student
@@ -9,40 +12,236 @@ from src.domain.repositories.Student_Discipline_Repository import StudentDiscipl
 from src.domain.repositories.Student_Repository import StudentRepository
 
 
+def _locked(method):
+    """Runs the method while holding the store's lock."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
 class InMemoryStore:
     """
     Acts as a central in-memory cache for database entities
     to minimize database read operations.
+
+    Besides the entity lists, the store keeps hash indexes and the
+    student <-> discipline adjacency maps, so lookups are O(1). The lists
+    and indexes must only be changed through the add/remove methods.
+
+    Every public method runs under the store's re-entrant lock, so the API and the
+    crawler threads can share it. Callers that need several calls to be atomic
+    (check-then-add) hold `store.lock` around them. Syncs read the database
+    without the lock and only hold it while swapping the new data in.
     """
 
     def __init__(self):
+        self.lock = threading.RLock()
         self.students: List[Student] = []
-        self._students_by_phone: Dict[str, Student] = {}  # Index for fast lookups
         self.disciplines: List[Discipline] = []
         self.posts: List[Post] = []
         self.student_disciplines: List[StudentDiscipline] = []
 
+        # Indexes for fast lookups
+        self._students_by_phone: Dict[str, Student] = {}
+        self._students_by_registration: Dict[str, Student] = {}
+        self._students_by_id: Dict[int, Student] = {}
+        self._disciplines_by_id: Dict[int, Discipline] = {}
+        self._disciplines_by_key: Dict[Tuple[str, str], Discipline] = {}
+        self._posts_by_key: Dict[Tuple[str, date], Post] = {}
+        self._associations: Set[Tuple[int, int]] = set()
+        self._disciplines_by_student: Dict[int, Set[int]] = {}
+        self._students_by_discipline: Dict[int, Set[int]] = {}
+
+        # Highest database IDs loaded so far, used as watermarks by delta_sync
+        self._watermarks: Dict[str, int] = {'student': 0, 'discipline': 0, 'post': 0}
+        self._fully_synced = False
+
+    # --- Students ---
+
+    @_locked
     def get_student_by_phone(self, phone_number: str) -> Optional[Student]:
         """Gets a student by phone number from the in-memory cache."""
         return self._students_by_phone.get(phone_number)
 
+    @_locked
+    def get_student_by_registration(self, registration: str) -> Optional[Student]:
+        return self._students_by_registration.get(registration)
+
+    @_locked
+    def get_student_by_id(self, student_id: int) -> Optional[Student]:
+        return self._students_by_id.get(student_id)
+
+    @_locked
+    def add_student(self, student: Student):
+        if self.students is None:
+            self.students = []
+        if student.id_student in self._students_by_id:
+            return
+        self.students.append(student)
+        self._index_student(student)
+
+    @_locked
+    def remove_student(self, student_id: int):
+        """Removes a student and all of their discipline associations."""
+        student = self._students_by_id.pop(student_id, None)
+        if student is None:
+            return
+        self.students = [s for s in self.students if s.id_student != student_id]
+        if self._students_by_phone.get(student.phone_number) is student:
+            del self._students_by_phone[student.phone_number]
+        if self._students_by_registration.get(student.registration) is student:
+            del self._students_by_registration[student.registration]
+
+        for discipline_id in self._disciplines_by_student.pop(student_id, set()):
+            self._students_by_discipline.get(discipline_id, set()).discard(student_id)
+            self._associations.discard((student_id, discipline_id))
+        self.student_disciplines = [sd for sd in self.student_disciplines if sd.id_student != student_id]
+
+    # --- Disciplines ---
+
+    @_locked
     def get_discipline_by_id(self, discipline_id: int) -> Optional[Discipline]:
-        for discipline in self.disciplines:
-            if discipline.id_discipline == discipline_id:
-                return discipline
-        return None
+        return self._disciplines_by_id.get(discipline_id)
 
+    @_locked
+    def find_discipline(self, name: str, id_cripto: str) -> Optional[Discipline]:
+        """Finds a discipline by its name and encrypted ID."""
+        return self._disciplines_by_key.get((name, id_cripto))
+
+    @_locked
     def add_discipline(self, discipline: Discipline):
-        if discipline not in self.disciplines:
-            self.disciplines.append(discipline)
+        if (discipline.name, discipline.id_cripto) in self._disciplines_by_key:
+            return
+        self.disciplines.append(discipline)
+        self._index_discipline(discipline)
+
+    # --- Posts ---
+
+    @_locked
+    def has_post(self, post_url: str, post_date: date) -> bool:
+        return (post_url, post_date) in self._posts_by_key
 
+    @_locked
     def add_post(self, post: Post):
-        if post not in self.posts:
-            self.posts.append(post)
+        if self.has_post(post.post_url, post.post_date):
+            return
+        self.posts.append(post)
+        self._posts_by_key[(post.post_url, post.post_date)] = post
+
+    @_locked
+    def remove_posts(self, posts: List[Post]):
+        """Removes these post objects (e.g. ones that could not be saved), leaving any reloaded copy alone."""
+        removed = set()
+        for post in posts:
+            key = (post.post_url, post.post_date)
+            if self._posts_by_key.get(key) is post:
+                del self._posts_by_key[key]
+                removed.add(id(post))
+        if removed:
+            self.posts = [p for p in self.posts if id(p) not in removed]
+
+    # --- Student <-> Discipline associations ---
+
+    @_locked
+    def has_student_discipline_association(self, student_id: int, discipline_id: int) -> bool:
+        return (student_id, discipline_id) in self._associations
 
+    @_locked
     def add_student_discipline_association(self, association: StudentDiscipline):
-        if association not in self.student_disciplines:
-            self.student_disciplines.append(association)
+        if self.has_student_discipline_association(association.id_student, association.id_discipline):
+            return
+        self.student_disciplines.append(association)
+        self._index_association(association)
+
+    @_locked
+    def remove_student_discipline_associations(self, student_id: int, discipline_ids: Set[int]):
+        """Removes the associations between one student and the given disciplines."""
+        removed = {d_id for d_id in discipline_ids if (student_id, d_id) in self._associations}
+        if not removed:
+            return
+        for discipline_id in removed:
+            self._associations.discard((student_id, discipline_id))
+            self._disciplines_by_student.get(student_id, set()).discard(discipline_id)
+            self._students_by_discipline.get(discipline_id, set()).discard(student_id)
+        self.student_disciplines = [
+            sd for sd in self.student_disciplines
+            if not (sd.id_student == student_id and sd.id_discipline in removed)
+        ]
+
+    @_locked
+    def get_discipline_ids_for_student(self, student_id: int) -> Set[int]:
+        return set(self._disciplines_by_student.get(student_id, ()))
+
+    @_locked
+    def get_student_ids_for_discipline(self, discipline_id: int) -> Set[int]:
+        return set(self._students_by_discipline.get(discipline_id, ()))
+
+    @_locked
+    def get_disciplines_for_student(self, student_id: int) -> List[Discipline]:
+        return [
+            self._disciplines_by_id[d_id]
+            for d_id in self._disciplines_by_student.get(student_id, ())
+            if d_id in self._disciplines_by_id
+        ]
+
+    @_locked
+    def get_students_for_discipline(self, discipline_id: int) -> List[Student]:
+        return [
+            self._students_by_id[s_id]
+            for s_id in self._students_by_discipline.get(discipline_id, ())
+            if s_id in self._students_by_id
+        ]
+
+    # --- Index maintenance ---
+
+    def _index_student(self, student: Student):
+        self._students_by_phone[student.phone_number] = student
+        self._students_by_registration[student.registration] = student
+        if student.id_student is not None:
+            self._students_by_id[student.id_student] = student
+
+    def _index_discipline(self, discipline: Discipline):
+        self._disciplines_by_key[(discipline.name, discipline.id_cripto)] = discipline
+        if discipline.id_discipline is not None:
+            self._disciplines_by_id[discipline.id_discipline] = discipline
+
+    def _index_association(self, association: StudentDiscipline):
+        self._associations.add((association.id_student, association.id_discipline))
+        self._disciplines_by_student.setdefault(association.id_student, set()).add(association.id_discipline)
+        self._students_by_discipline.setdefault(association.id_discipline, set()).add(association.id_student)
+
+    @_locked
+    def get_students(self) -> List[Student]:
+        """Returns a snapshot of the students list."""
+        return list(self.students or [])
+
+    @_locked
+    def get_disciplines(self) -> List[Discipline]:
+        """Returns a snapshot of the disciplines list."""
+        return list(self.disciplines or [])
+
+    def _rebuild_indexes(self):
+        """Rebuilds every index from the entity lists."""
+        self._students_by_phone = {}
+        self._students_by_registration = {}
+        self._students_by_id = {}
+        for student in self.students or []:
+            self._index_student(student)
+
+        self._disciplines_by_id = {}
+        self._disciplines_by_key = {}
+        for discipline in self.disciplines or []:
+            self._index_discipline(discipline)
+
+        self._posts_by_key = {(post.post_url, post.post_date): post for post in self.posts or []}
+
+        self._associations = set()
+        self._disciplines_by_student = {}
+        self._students_by_discipline = {}
+        for association in self.student_disciplines or []:
+            self._index_association(association)
 
     def full_sync(self,
                   student_repo: StudentRepository,
@@ -55,19 +254,109 @@ class InMemoryStore:
         """
         print("Performing full data synchronization with the database...")
         try:
-            self.students = student_repo.get_all()
-            self._students_by_phone = {student.phone_number: student for student in self.students}
-            print(f"  {len(self.students or [])} students loaded and indexed by phone.")
+            students = student_repo.get_all()
+            print(f"  {len(students or [])} students loaded.")
+
+            disciplines = discipline_repo.get_all()
+            print(f"  {len(disciplines or [])} disciplines loaded.")
+
+            posts = post_repo.get_all()
+            print(f"  {len(posts or [])} posts loaded.")
+
+            student_disciplines = student_discipline_repo.get_all()
+            associations_loaded = student_disciplines is not None
+            print(f"  {len(student_disciplines or [])} associations loaded.")
+            if student_disciplines is None:
+                # A failed query must not empty the associations: the loaded ones are kept until the next sync
+                student_disciplines = self.student_disciplines
+
+            with self.lock:
+                self.students = students
+                self.disciplines = disciplines
+                self.posts = posts
+                self.student_disciplines = student_disciplines
 
-            self.disciplines = discipline_repo.get_all()
-            print(f"  {len(self.disciplines or [])} disciplines loaded.")
+                self._rebuild_indexes()
+                print("  Indexes rebuilt.")
 
-            self.posts = post_repo.get_all()
-            print(f"  {len(self.posts or [])} posts loaded.")
-            
-            self.student_disciplines = student_discipline_repo.get_all() or []
-            print(f"  {len(self.student_disciplines or [])} associations loaded.")
+                self._watermarks = {
+                    'student': max((s.id_student or 0 for s in self.students or []), default=0),
+                    'discipline': max((d.id_discipline or 0 for d in self.disciplines or []), default=0),
+                    'post': max((p.id_post or 0 for p in self.posts or []), default=0),
+                }
+                self._fully_synced = self.students is not None and self.disciplines is not None and \
+                    self.posts is not None and associations_loaded
 
             print("Full synchronization complete.")
         except Exception as e:
             print(f"An error occurred during full synchronization: {e}")
+
+    def delta_sync(self,
+                   student_repo: StudentRepository,
+                   discipline_repo: DisciplineRepository,
+                   post_repo: PostRepository,
+                   student_discipline_repo: StudentDisciplineRepository):
+        """
+        Applies only the rows added since the last sync, using the highest IDs
+        already loaded as watermarks. Deleted students are detected by comparing
+        IDs and associations are reconciled, as both are cheap to read.
+        Updated rows (a changed name, phone number or password) are not seen:
+        they are picked up by the periodic full_sync (FULL_SYNC_INTERVAL_HOURS).
+        Falls back to full_sync when the store was never fully loaded or a query fails.
+        """
+        if not self._fully_synced:
+            print("Store was never fully loaded. Falling back to full synchronization.")
+            self.full_sync(student_repo, discipline_repo, post_repo, student_discipline_repo)
+            return
+
+        print("Performing delta synchronization with the database...")
+        try:
+            with self.lock:
+                watermarks = dict(self._watermarks)
+            student_ids = student_repo.get_all_ids()
+            new_disciplines = discipline_repo.get_since(watermarks['discipline'])
+            new_posts = post_repo.get_since(watermarks['post'])
+            associations = student_discipline_repo.get_all()
+            if student_ids is None or new_disciplines is None or new_posts is None or associations is None:
+                raise ValueError("a delta query failed")
+            new_students = student_repo.get_since(watermarks['student'])
+
+            with self.lock:
+                # Students above the watermark may have been added (e.g. registered through the API) after
+                # the ID snapshot was read: only the ones known when the queries started can be judged deleted
+                removed_ids = {i for i in self._students_by_id if i <= watermarks['student']} - student_ids
+                for student_id in removed_ids:
+                    self.remove_student(student_id)
+                for student in new_students:
+                    self.add_student(student)
+                print(f"  {len(new_students)} students added, {len(removed_ids)} removed.")
+
+                for discipline in new_disciplines:
+                    self.add_discipline(discipline)
+                print(f"  {len(new_disciplines)} new disciplines.")
+
+                for post in new_posts:
+                    self.add_post(post)
+                print(f"  {len(new_posts)} new posts.")
+
+                added, removed = self._reconcile_associations(associations)
+                print(f"  {added} associations added, {removed} removed.")
+
+                self._watermarks['student'] = max([self._watermarks['student']] + [s.id_student for s in new_students])
+                self._watermarks['discipline'] = max([self._watermarks['discipline']] + [d.id_discipline for d in new_disciplines])
+                self._watermarks['post'] = max([self._watermarks['post']] + [p.id_post for p in new_posts])
+            print("Delta synchronization complete.")
+        except Exception as e:
+            print(f"An error occurred during delta synchronization: {e}. Falling back to full synchronization.")
+            self.full_sync(student_repo, discipline_repo, post_repo, student_discipline_repo)
+
+    def _reconcile_associations(self, associations: List[StudentDiscipline]) -> Tuple[int, int]:
+        """Makes the stored associations match the given ones. Returns (added, removed)."""
+        wanted = {(sd.id_student, sd.id_discipline) for sd in associations}
+        stale = self._associations - wanted
+        for student_id, discipline_id in stale:
+            self.remove_student_discipline_associations(student_id, {discipline_id})
+        missing = [sd for sd in associations if (sd.id_student, sd.id_discipline) not in self._associations]
+        for association in missing:
+            self.add_student_discipline_association(association)
+        return len(missing), len(stale)
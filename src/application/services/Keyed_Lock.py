@@ -0,0 +1,34 @@
+import threading
+from contextlib import contextmanager
+from typing import Dict, Hashable, Iterator, List
+
+
+class KeyedLock:
+    """
+    Hands out one lock per key (e.g. a student's registration), so work on
+    different records never contends. Locks are created on demand and dropped
+    once nobody holds or waits for them.
+    """
+
+    def __init__(self):
+        self._locks: Dict[Hashable, List] = {}  # key -> [lock, holders and waiters]
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def hold(self, key: Hashable) -> Iterator[None]:
+        with self._lock:
+            entry = self._locks.get(key)
+            if entry is None:
+                entry = [threading.Lock(), 0]
+                self._locks[key] = entry
+            entry[1] += 1
+
+        entry[0].acquire()
+        try:
+            yield
+        finally:
+            entry[0].release()
+            with self._lock:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self._locks[key]
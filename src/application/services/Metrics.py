@@ -0,0 +1,193 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+# Upper bounds (seconds) of the timing histogram buckets, from a cache hit to a stuck portal page
+DEFAULT_BUCKETS: Tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+class Histogram:
+    """Per-bucket (not cumulative) counts plus the count, sum and max of the observed durations."""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts: List[int] = [0] * (len(buckets) + 1)  # Last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float):
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if seconds <= bound:
+                index = i
+                break
+        self.counts[index] += 1
+        self.count += 1
+        self.sum += seconds
+        self.max = max(self.max, seconds)
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "sum_seconds": round(self.sum, 6),
+            "avg_seconds": round(self.sum / self.count, 6) if self.count else 0.0,
+            "max_seconds": round(self.max, 6),
+            "buckets": {str(bound): count for bound, count in zip(list(self.buckets) + ["+Inf"], self.counts)},
+        }
+
+
+class _MetricSet:
+    def __init__(self):
+        self.counters: Dict[str, int] = {}
+        self.histograms: Dict[str, Histogram] = {}
+
+    def increment(self, name: str, value: int):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def observe(self, name: str, seconds: float):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram()
+        histogram.observe(seconds)
+
+    def to_dict(self) -> dict:
+        return {
+            "counters": dict(sorted(self.counters.items())),
+            "timings": {name: h.to_dict() for name, h in sorted(self.histograms.items())},
+        }
+
+
+class Metrics:
+    """
+    Thread-safe counters and timing histograms for the sync pipeline.
+
+    Everything is recorded twice: in the running totals since startup and in the
+    current cycle. end_cycle() keeps the finished cycle as last_cycle, so a slow
+    cycle can be broken down by stage (login, get_disciplines, get_posts, ...).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._totals = _MetricSet()
+        self._cycle = _MetricSet()
+        self._cycle_started_at: Optional[float] = None
+        self._last_cycle: Optional[dict] = None
+
+    @contextmanager
+    def span(self, name: str):
+        """Times the block into the `name` histogram. A block that raises also counts `<name>_errors`."""
+        started = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            self.increment(f"{name}_errors")
+            raise
+        finally:
+            self.observe(name, time.perf_counter() - started)
+
+    def observe(self, name: str, seconds: float):
+        with self._lock:
+            self._totals.observe(name, seconds)
+            self._cycle.observe(name, seconds)
+
+    def increment(self, name: str, value: int = 1):
+        with self._lock:
+            self._totals.increment(name, value)
+            self._cycle.increment(name, value)
+
+    def start_cycle(self):
+        with self._lock:
+            self._cycle = _MetricSet()
+            self._cycle_started_at = time.time()
+
+    def end_cycle(self, success: bool = True) -> dict:
+        """Closes the current cycle and returns its summary."""
+        with self._lock:
+            ended_at = time.time()
+            started_at = self._cycle_started_at or ended_at
+            summary = {
+                "started_at": started_at,
+                "duration_seconds": round(ended_at - started_at, 6),
+                "success": success,
+                **self._cycle.to_dict(),
+            }
+            self._totals.increment("cycles" if success else "cycles_failed", 1)
+            self._totals.observe("cycle", ended_at - started_at)
+            self._last_cycle = summary
+            self._cycle = _MetricSet()
+            self._cycle_started_at = None
+            return summary
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            current = None
+            if self._cycle_started_at is not None:
+                current = {"started_at": self._cycle_started_at,
+                           "elapsed_seconds": round(time.time() - self._cycle_started_at, 6),
+                           **self._cycle.to_dict()}
+            return {"current_cycle": current, "last_cycle": self._last_cycle, "totals": self._totals.to_dict()}
+
+    def reset(self):
+        with self._lock:
+            self._totals = _MetricSet()
+            self._cycle = _MetricSet()
+            self._cycle_started_at = None
+            self._last_cycle = None
+
+    def dump_json(self, path: str):
+        """Writes the snapshot to a JSON file, replacing it atomically."""
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, indent=2)
+        os.replace(temp_path, path)
+
+    def render_prometheus(self, prefix: str = "myblogalerts") -> str:
+        """Renders the totals (and the last cycle's duration) in the Prometheus text format."""
+        snapshot = self.snapshot()
+        lines = []
+        for name, value in snapshot["totals"]["counters"].items():
+            lines.append(f"# TYPE {prefix}_{name}_total counter")
+            lines.append(f"{prefix}_{name}_total {value}")
+        for name, histogram in snapshot["totals"]["timings"].items():
+            metric = f"{prefix}_{name}_seconds"
+            lines.append(f"# TYPE {metric} histogram")
+            cumulative = 0
+            for bound, count in histogram["buckets"].items():
+                cumulative += count
+                lines.append(f'{metric}_bucket{{le="{bound}"}} {cumulative}')
+            lines.append(f"{metric}_sum {histogram['sum_seconds']}")
+            lines.append(f"{metric}_count {histogram['count']}")
+        if snapshot["last_cycle"]:
+            lines.append(f"# TYPE {prefix}_last_cycle_duration_seconds gauge")
+            lines.append(f"{prefix}_last_cycle_duration_seconds {snapshot['last_cycle']['duration_seconds']}")
+            lines.append(f"# TYPE {prefix}_last_cycle_timestamp_seconds gauge")
+            lines.append(f"{prefix}_last_cycle_timestamp_seconds {snapshot['last_cycle']['started_at']}")
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def format_cycle_summary(summary: dict) -> str:
+        """One line per stage with its count, total and max time, for the logs."""
+        lines = [f"Cycle took {summary['duration_seconds']:.2f}s "
+                 f"({', '.join(f'{k}={v}' for k, v in summary['counters'].items()) or 'no counters'})"]
+        for name, timing in sorted(summary["timings"].items(), key=lambda item: -item[1]["sum_seconds"]):
+            lines.append(f"  {name}: {timing['count']}x, total {timing['sum_seconds']:.2f}s, "
+                         f"avg {timing['avg_seconds'] * 1000:.0f}ms, max {timing['max_seconds'] * 1000:.0f}ms")
+        return "\n".join(lines)
+
+
+_metrics: Optional[Metrics] = None
+_metrics_lock = threading.Lock()
+
+
+def get_metrics() -> Metrics:
+    """Returns the process-wide Metrics shared by the use cases, the scrapers and the dispatcher."""
+    global _metrics
+    if _metrics is None:
+        with _metrics_lock:
+            if _metrics is None:
+                _metrics = Metrics()
+    return _metrics
@@ -0,0 +1,189 @@
+import heapq
+import itertools
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional
+from src.application.services.Metrics import Metrics, get_metrics
+from src.application.services.Rate_Limiter import RateLimiter
+from src.domain.services.Notification_Service import NotificationService
+
+
+@dataclass(order=True)
+class _Job:
+    ready_at: float
+    seq: int
+    phone: str = field(compare=False)
+    message: str = field(compare=False)
+    on_delivered: Optional[Callable[[], None]] = field(compare=False, default=None)
+    on_failed: Optional[Callable[[Exception], None]] = field(compare=False, default=None)
+    attempts: int = field(compare=False, default=0)
+    reserved: bool = field(compare=False, default=False)
+
+
+class NotificationDispatcher:
+    """
+    Delivers direct messages through a fixed pool of worker threads.
+
+    - The queue is bounded: submit blocks (backpressure) while it is full.
+    - Each destination has its own token bucket; a message over the limit is
+      rescheduled instead of holding a worker.
+    - Failed sends are retried with exponential backoff up to max_attempts.
+    """
+
+    def __init__(self,
+                 notification_service: NotificationService,
+                 workers: int = 4,
+                 queue_size: int = 1000,
+                 per_destination_per_minute: float = 20,
+                 per_destination_burst: int = 3,
+                 max_attempts: int = 8,
+                 base_backoff_seconds: float = 5,
+                 max_backoff_seconds: float = 600,
+                 metrics: Optional[Metrics] = None):
+        self.notification_service = notification_service
+        self.metrics = metrics or get_metrics()
+        self.workers = max(1, workers)
+        self.queue_size = max(1, queue_size)
+        self.max_attempts = max_attempts
+        self.base_backoff_seconds = base_backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.destination_limiter = RateLimiter(per_destination_per_minute / 60, per_destination_burst)
+
+        self._heap: List[_Job] = []
+        self._pending = 0  # Jobs submitted and not yet finished, retries included
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._threads: List[threading.Thread] = []
+        self._running = False
+
+    def start(self):
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"notify-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: Optional[float] = None):
+        """Stops the workers after the queue is drained, or after timeout seconds."""
+        self.join(timeout)
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join(timeout=1)
+        self._threads = []
+
+    def submit(self, phone: str, message: str,
+               on_delivered: Optional[Callable[[], None]] = None,
+               on_failed: Optional[Callable[[Exception], None]] = None,
+               timeout: Optional[float] = None) -> bool:
+        """
+        Queues a direct message. Blocks while the queue is full (up to timeout seconds,
+        forever when None). Returns False if the message could not be queued in time.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while len(self._heap) >= self.queue_size:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    print(f"Notification queue is full. Dropping message to {phone}.")
+                    return False
+                self._cond.wait(remaining)
+            job = _Job(time.monotonic(), next(self._seq), phone, message, on_delivered, on_failed)
+            heapq.heappush(self._heap, job)
+            self._pending += 1
+            self._cond.notify_all()
+        self.metrics.increment("notifications_queued")
+        return True
+
+    def join(self, timeout: Optional[float] = None) -> bool:
+        """Waits until every submitted message was delivered or given up. Returns False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._pending > 0:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def qsize(self) -> int:
+        with self._cond:
+            return len(self._heap)
+
+    def _next_job(self) -> Optional[_Job]:
+        with self._cond:
+            while self._running:
+                if not self._heap:
+                    self._cond.wait()
+                    continue
+                wait = self._heap[0].ready_at - time.monotonic()
+                if wait > 0:
+                    self._cond.wait(wait)
+                    continue
+                job = heapq.heappop(self._heap)
+                self._cond.notify_all()  # Frees a slot for blocked producers
+                return job
+            return None
+
+    def _reschedule(self, job: _Job, delay: float):
+        with self._cond:
+            job.ready_at = time.monotonic() + delay
+            job.seq = next(self._seq)
+            # Retries were already admitted, so they do not count against the queue bound
+            heapq.heappush(self._heap, job)
+            self._cond.notify_all()
+
+    def _finish(self):
+        with self._cond:
+            self._pending -= 1
+            self._cond.notify_all()
+
+    def _worker(self):
+        while True:
+            job = self._next_job()
+            if job is None:
+                return
+
+            if not job.reserved:
+                wait = self.destination_limiter.reserve(job.phone)
+                job.reserved = True
+                if wait > 0:
+                    self._reschedule(job, wait)
+                    continue
+
+            job.reserved = False
+            job.attempts += 1
+            try:
+                with self.metrics.span("notification_send"):
+                    self.notification_service.send_direct_message(job.phone, job.message)
+            except Exception as e:
+                if job.attempts < self.max_attempts:
+                    self.metrics.increment("notification_retries")
+                    delay = min(self.max_backoff_seconds, self.base_backoff_seconds * 2 ** (job.attempts - 1))
+                    print(f"Failed to send message to {job.phone} (attempt {job.attempts}/{self.max_attempts}): {e}. "
+                          f"Retrying in {delay:.0f} seconds.")
+                    self._reschedule(job, delay)
+                    continue
+                print(f"Giving up on message to {job.phone} after {job.attempts} attempts: {e}")
+                self.metrics.increment("notifications_failed")
+                self._run_callback(job.on_failed, e)
+                self._finish()
+                continue
+
+            self.metrics.increment("notifications_sent")
+            self._run_callback(job.on_delivered)
+            self._finish()
+
+    @staticmethod
+    def _run_callback(callback: Optional[Callable], *args):
+        if callback is None:
+            return
+        try:
+            callback(*args)
+        except Exception as e:
+            print(f"Notification callback failed: {e}")
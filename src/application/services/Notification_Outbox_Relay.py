@@ -0,0 +1,92 @@
+import threading
+from typing import Optional
+from src.application.services.InMemory_Store import InMemoryStore
+from src.application.services.Notification_Dispatcher import NotificationDispatcher
+from src.domain.models.Notification import Notification
+from src.domain.repositories.Notification_Outbox_Repository import NotificationOutboxRepository
+
+
+class NotificationOutboxRelay:
+    """
+    Moves pending messages from the notification outbox to the dispatcher.
+    A row is marked sent as soon as the dispatcher delivers it, and released
+    (or given up after max_attempts) when the dispatcher fails. Rows left
+    claimed by a crashed process are picked up again once their lease expires.
+    """
+
+    def __init__(self,
+                 outbox_repo: NotificationOutboxRepository,
+                 dispatcher: NotificationDispatcher,
+                 store: InMemoryStore,
+                 batch_size: int = 100,
+                 poll_interval_seconds: float = 30,
+                 lease_seconds: float = 3600,
+                 max_attempts: int = 3):
+        self.outbox_repo = outbox_repo
+        self.dispatcher = dispatcher
+        self.store = store
+        self.batch_size = max(1, batch_size)
+        self.poll_interval_seconds = poll_interval_seconds
+        # Must outlast the dispatcher's own retries, otherwise a message could be claimed twice
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+
+        self._wake = threading.Event()
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="outbox-relay", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        self._running = False
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def wake(self):
+        """Asks the relay to drain the outbox now instead of waiting for the next poll."""
+        self._wake.set()
+
+    def drain_once(self) -> int:
+        """Hands every pending notification to the dispatcher. Returns how many were submitted."""
+        submitted = 0
+        while self._running:
+            notifications = self.outbox_repo.claim_pending(self.batch_size, self.lease_seconds)
+            for notification in notifications:
+                self._submit(notification)
+            submitted += len(notifications)
+            if len(notifications) < self.batch_size:
+                break
+        if submitted:
+            print(f"Outbox relay: {submitted} notifications handed to the dispatcher.")
+        return submitted
+
+    def _submit(self, notification: Notification):
+        notification_id = notification.id_notification
+        student = self.store.get_student_by_id(notification.student_id)
+        if student is None:
+            self.outbox_repo.mark_failed(notification_id, "Student not found in the store.", self.max_attempts)
+            return
+
+        # submit blocks while the dispatcher queue is full, which throttles the relay
+        self.dispatcher.submit(
+            student.phone_number,
+            notification.message,
+            on_delivered=lambda: self.outbox_repo.mark_sent(notification_id),
+            on_failed=lambda e: self.outbox_repo.mark_failed(notification_id, str(e), self.max_attempts)
+        )
+
+    def _run(self):
+        while self._running:
+            try:
+                self.drain_once()
+            except Exception as e:
+                print(f"Outbox relay failed to drain the outbox: {e}")
+            self._wake.wait(self.poll_interval_seconds)
+            self._wake.clear()
@@ -0,0 +1,93 @@
+import asyncio
+import threading
+import time
+from typing import Dict, Hashable
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket. Tokens refill continuously at `rate` per second
+    up to `burst`. Callers reserve a token and then wait for their reservation,
+    so waiting happens outside the lock and works for both threads and asyncio.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        if rate <= 0:
+            raise ValueError("rate must be greater than zero")
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens: float = 1) -> float:
+        """
+        Takes the tokens right away (possibly going into debt) and returns how long the
+        caller must wait before using them. Useful to reschedule work instead of blocking.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= tokens
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def try_acquire(self, tokens: float = 1) -> bool:
+        """Takes the tokens only if they are available right now."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+    def acquire(self, tokens: float = 1) -> float:
+        """Blocks the calling thread until the tokens are available. Returns the time waited."""
+        wait = self.reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self, tokens: float = 1) -> float:
+        """Awaits until the tokens are available without blocking the event loop. Returns the time waited."""
+        wait = self.reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+
+class RateLimiter:
+    """
+    Keeps one TokenBucket per key (e.g. a host name or a phone number),
+    all created with the same rate and burst.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._buckets: Dict[Hashable, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, key: Hashable) -> TokenBucket:
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = TokenBucket(self.rate, self.burst)
+                self._buckets[key] = bucket
+            return bucket
+
+    def acquire(self, key: Hashable, tokens: float = 1) -> float:
+        return self.bucket(key).acquire(tokens)
+
+    async def acquire_async(self, key: Hashable, tokens: float = 1) -> float:
+        return await self.bucket(key).acquire_async(tokens)
+
+    def try_acquire(self, key: Hashable, tokens: float = 1) -> bool:
+        return self.bucket(key).try_acquire(tokens)
+
+    def reserve(self, key: Hashable, tokens: float = 1) -> float:
+        return self.bucket(key).reserve(tokens)
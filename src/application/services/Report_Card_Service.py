@@ -0,0 +1,163 @@
+import asyncio
+import concurrent.futures
+import dataclasses
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+from src.domain.models.Report_Card import ReportCard
+from src.domain.models.Student import Student
+from src.domain.services.Scraping_Service import ScrapingService
+
+# Report card values whose changes are notified to the student
+GRADE_FIELDS = ("AV1", "AV2", "MP", "PF", "FINAL", "RESULTADO")
+
+
+class ReportCardService:
+    """
+    Serves report cards (grades and absences) from a per-student cache.
+    - A miss logs into the portal once and parses the whole page.
+    - Concurrent requests for the same student share the same in-flight fetch (single-flight).
+    - At most max_concurrent_fetches scrapes run at once, on a dedicated pool.
+    - When the portal is slower than timeout_seconds, the last known report card
+      is returned marked as stale, and the fetch keeps running to refresh the cache.
+    """
+
+    def __init__(self,
+                 scraping_service: ScrapingService,
+                 ttl_seconds: float = 600,
+                 max_concurrent_fetches: int = 4,
+                 timeout_seconds: float = 20):
+        self.scraping_service = scraping_service
+        self.ttl_seconds = ttl_seconds
+        self.timeout_seconds = timeout_seconds
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_concurrent_fetches),
+                                            thread_name_prefix="report-card")
+        # registration -> (expires_at, report card). Expired entries are kept as a stale fallback.
+        self._cache: Dict[str, Tuple[float, ReportCard]] = {}
+        self._in_flight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def get(self, student: Student, refresh: bool = False, timeout: Optional[float] = None) -> ReportCard:
+        """
+        Returns the student's report card, fetching it from the portal when missing, expired or refresh is set.
+        Raises TimeoutError if the portal is too slow and nothing is cached for the student.
+        """
+        cached = self._get_fresh(student.registration, refresh)
+        if cached is not None:
+            return cached
+
+        future = self.fetch(student)
+        try:
+            return future.result(timeout=self._timeout(timeout))
+        except concurrent.futures.TimeoutError:  # Only an alias of the builtin TimeoutError from Python 3.11
+            return self._stale_or_raise(student.registration)
+
+    async def get_async(self, student: Student, refresh: bool = False, timeout: Optional[float] = None) -> ReportCard:
+        """Same as get, but awaits the fetch without blocking the event loop."""
+        cached = self._get_fresh(student.registration, refresh)
+        if cached is not None:
+            return cached
+
+        future = self.fetch(student)
+        try:
+            # shield: a timed-out caller must not cancel the fetch shared with other callers
+            return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), self._timeout(timeout))
+        except asyncio.TimeoutError:
+            return self._stale_or_raise(student.registration)
+
+    def fetch(self, student: Student) -> Future:
+        """Starts a fetch for the student, or returns the one already running."""
+        key = student.registration
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is None or future.done():
+                future = self._executor.submit(self._fetch, student)
+                self._in_flight[key] = future
+            return future
+
+    def is_due(self, student: Student, interval_seconds: float) -> bool:
+        """Tells whether the student's snapshot is missing or older than interval_seconds."""
+        with self._lock:
+            entry = self._cache.get(student.registration)
+        if entry is None or entry[1].fetched_at is None:
+            return True
+        return (datetime.now() - entry[1].fetched_at).total_seconds() >= interval_seconds
+
+    def update(self, student: Student, report_card: ReportCard,
+               ttl_seconds: Optional[float] = None) -> Dict[str, Dict[str, Tuple[str, str]]]:
+        """
+        Stores a report card fetched elsewhere (e.g. by the crawler's session) as the student's snapshot.
+        Returns the grade values that changed since the previous snapshot, as
+        discipline -> field -> (old, new). Nothing is reported without a previous snapshot.
+        """
+        if report_card.fetched_at is None:
+            report_card.fetched_at = datetime.now()
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        with self._lock:
+            previous = self._cache.get(student.registration)
+            self._cache[student.registration] = (time.monotonic() + ttl, report_card)
+
+        if previous is None:
+            return {}
+        return self._grade_changes(previous[1], report_card)
+
+    @staticmethod
+    def _grade_changes(old: ReportCard, new: ReportCard) -> Dict[str, Dict[str, Tuple[str, str]]]:
+        changes: Dict[str, Dict[str, Tuple[str, str]]] = {}
+        for discipline, grades in new.grades.items():
+            old_grades = old.grades.get(discipline)
+            if old_grades is None:
+                continue
+            for grade_field in GRADE_FIELDS:
+                old_value = old_grades.get(grade_field, "")
+                new_value = grades.get(grade_field, "")
+                # A value that disappears is usually a portal glitch, not something to announce
+                if new_value and new_value != old_value:
+                    changes.setdefault(discipline, {})[grade_field] = (old_value, new_value)
+        return changes
+
+    def invalidate(self, registration: str):
+        """Drops the cached report card of a student, e.g. after they are deleted or change their password."""
+        with self._lock:
+            self._cache.pop(registration, None)
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _fetch(self, student: Student) -> ReportCard:
+        key = student.registration
+        try:
+            report_card = self.scraping_service.get_report_card(student.registration, student.password)
+            report_card.fetched_at = datetime.now()
+            with self._lock:
+                self._cache[key] = (time.monotonic() + self.ttl_seconds, report_card)
+            return report_card
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    def _get_fresh(self, key: str, refresh: bool) -> Optional[ReportCard]:
+        if refresh:
+            return None
+        with self._lock:
+            entry = self._cache.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            return None
+        return entry[1]
+
+    def _stale_or_raise(self, key: str) -> ReportCard:
+        with self._lock:
+            entry = self._cache.get(key)
+        if entry is None:
+            raise TimeoutError("The portal did not answer in time and no report card is cached for this student.")
+        print(f"Portal is slow. Serving the cached report card of {entry[1].fetched_at} instead.")
+        return dataclasses.replace(entry[1], stale=True)
+
+    def _timeout(self, timeout: Optional[float]) -> float:
+        return self.timeout_seconds if timeout is None else timeout
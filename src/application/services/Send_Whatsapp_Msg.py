@@ -40,8 +40,8 @@ class WhatsappNotificationService(NotificationService):
                     # Optionally, re-raise the exception or handle the failure
                     # raise e
 
-    def student_msg(self, phone: str, msg: str):
-        """Sends a direct message to a student."""
+    def send_direct_message(self, phone: str, msg: str) -> None:
+        """Makes a single attempt to send a direct message to a student. Raises on failure."""
         headers = {
             "Content-Type": "application/json",
             "x-api-key": self.api_key
@@ -53,11 +53,15 @@ class WhatsappNotificationService(NotificationService):
 
         url = self.url + "send/text"
 
+        response = self.connection.post(url, headers=headers, json=payload, timeout=30)
+        response.raise_for_status()
+        print(f"Direct message to {phone} sent successfully.")
+
+    def student_msg(self, phone: str, msg: str):
+        """Sends a direct message to a student."""
         for attempt in range(self.max_retries):
             try:
-                response = self.connection.post(url, headers=headers, json=payload)
-                response.raise_for_status()
-                print(f"Direct message to {phone} sent successfully.")
+                self.send_direct_message(phone, msg)
                 return
             except requests.exceptions.RequestException as e:
                 print(f"Network error on attempt {attempt + 1}/{self.max_retries}: {e}")
@@ -0,0 +1,81 @@
+from typing import List, Optional
+from src.domain.models.Discipline import Discipline
+from src.domain.models.Notification import Notification
+from src.domain.models.Post import Post
+from src.domain.models.Student_Discipline import StudentDiscipline
+from src.domain.repositories.Discipline_Repository import DisciplineRepository
+from src.domain.repositories.Notification_Outbox_Repository import NotificationOutboxRepository
+from src.domain.repositories.Post_Repository import PostRepository
+from src.domain.repositories.Student_Discipline_Repository import StudentDisciplineRepository
+
+
+class SyncUnitOfWork:
+    """
+    Collects the database writes produced while synchronizing one student
+    (new and removed associations, new posts) and flushes them with one
+    batched statement per kind. The in-memory store is updated by the
+    caller as changes are found, so the pending rows are already visible
+    to the rest of the cycle.
+    When an outbox repository is given, new posts and the notifications they
+    produce are written in the same transaction. Disciplines are only marked
+    as baselined once their posts are stored.
+    """
+
+    def __init__(self, student_discipline_repo: StudentDisciplineRepository, post_repo: PostRepository,
+                 outbox_repo: Optional[NotificationOutboxRepository] = None,
+                 discipline_repo: Optional[DisciplineRepository] = None):
+        self.student_discipline_repo = student_discipline_repo
+        self.post_repo = post_repo
+        self.outbox_repo = outbox_repo
+        self.discipline_repo = discipline_repo
+        self.new_associations: List[StudentDiscipline] = []
+        self.removed_associations: List[StudentDiscipline] = []
+        self.new_posts: List[Post] = []
+        self.new_notifications: List[Notification] = []
+        self.baselined_disciplines: List[Discipline] = []
+
+    def register_association(self, association: StudentDiscipline):
+        self.new_associations.append(association)
+
+    def register_removed_association(self, association: StudentDiscipline):
+        self.removed_associations.append(association)
+
+    def register_post(self, post: Post):
+        self.new_posts.append(post)
+
+    def register_notification(self, notification: Notification):
+        self.new_notifications.append(notification)
+
+    def register_baselined_discipline(self, discipline: Discipline):
+        self.baselined_disciplines.append(discipline)
+
+    def is_empty(self) -> bool:
+        return not (self.new_associations or self.removed_associations or self.new_posts or self.new_notifications
+                    or self.baselined_disciplines)
+
+    def flush(self):
+        """Writes every pending change to the database, one round-trip per kind."""
+        if self.is_empty():
+            return
+
+        if self.removed_associations:
+            self.student_discipline_repo.delete_many(self.removed_associations)
+        if self.new_associations:
+            self.student_discipline_repo.save_many(self.new_associations)
+        if self.outbox_repo is not None:
+            self.outbox_repo.save_posts_with_notifications(self.new_posts, self.new_notifications)
+        elif self.new_posts:
+            self.post_repo.save_many(self.new_posts)
+        if self.baselined_disciplines and self.discipline_repo is not None:
+            self.discipline_repo.mark_baselined_many([d.id_discipline for d in self.baselined_disciplines])
+        # Only now: a discipline marked before its posts are stored would have its history notified later
+        for discipline in self.baselined_disciplines:
+            discipline.baselined = True
+
+        print(f"  Flushed {len(self.new_associations)} new associations, {len(self.removed_associations)} "
+              f"removed associations, {len(self.new_posts)} posts and {len(self.new_notifications)} notifications.")
+        self.new_associations = []
+        self.removed_associations = []
+        self.new_posts = []
+        self.new_notifications = []
+        self.baselined_disciplines = []
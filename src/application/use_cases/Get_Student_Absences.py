@@ -1,28 +1,52 @@
-from src.domain.services.Scraping_Service import ScrapingService
+from src.application.services.Report_Card_Service import ReportCardService
+from src.application.use_cases.Get_Student_Grades import NOT_REGISTERED_MESSAGE, PORTAL_TIMEOUT_MESSAGE, stale_notice
+from src.domain.models.Report_Card import ReportCard
+from src.domain.models.Student import Student
 from src.domain.repositories.Student_Repository import StudentRepository
 
 
 class GetStudentAbsences:
-    def __init__(self, scraping_service: ScrapingService, student_repository: StudentRepository):
-        self.scraping_service = scraping_service
+    def __init__(self, report_card_service: ReportCardService, student_repository: StudentRepository):
+        self.report_card_service = report_card_service
         self.student_repository = student_repository
 
-    def execute(self, phone_number: str) -> str:
+    def execute(self, phone_number: str, refresh: bool = False) -> str:
         """
         Executes the use case to get absences for a student identified by their phone number.
+        The report card is served from the cache unless refresh is set.
         """
         student = self.student_repository.get_by_phone_number(phone_number)
 
         if not student:
-            return "Você não está cadastrado no MyBlogAlerts. Entre em contato com o responsável para se cadastrar."
+            return NOT_REGISTERED_MESSAGE
 
-        registration = student.registration
-        password = student.password
+        try:
+            report_card = self.report_card_service.get(student, refresh)
+        except TimeoutError:
+            return PORTAL_TIMEOUT_MESSAGE
 
-        absences_data = self.scraping_service.get_absences(registration, password)
+        return self._build_message(student, report_card)
+
+    async def execute_async(self, phone_number: str, refresh: bool = False) -> str:
+        """Same as execute, but awaits the portal without blocking the event loop."""
+        student = self.student_repository.get_by_phone_number(phone_number)
+
+        if not student:
+            return NOT_REGISTERED_MESSAGE
+
+        try:
+            report_card = await self.report_card_service.get_async(student, refresh)
+        except TimeoutError:
+            return PORTAL_TIMEOUT_MESSAGE
+
+        return self._build_message(student, report_card)
+
+    @staticmethod
+    def _build_message(student: Student, report_card: ReportCard) -> str:
+        absences_data = report_card.absences
 
         if not absences_data:
-            return f"Nenhuma falta encontrada para a matrícula {registration} no momento."
+            return f"Nenhuma falta encontrada para a matrícula {student.registration} no momento."
 
         response_message = f"Faltas para o aluno {student.name}:\n\n"
         for discipline, absences_dict in absences_data.items():
@@ -38,4 +62,4 @@ class GetStudentAbsences:
             response_message += f"- TF: *{tf}*\n"
             response_message += f"- Resultado: *{resultado}*\n\n"
 
-        return response_message
+        return response_message + stale_notice(report_card)
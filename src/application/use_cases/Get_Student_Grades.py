@@ -1,29 +1,55 @@
-from src.domain.services.Scraping_Service import ScrapingService
+from src.application.services.Report_Card_Service import ReportCardService
+from src.domain.models.Report_Card import ReportCard
+from src.domain.models.Student import Student
 from src.domain.repositories.Student_Repository import StudentRepository
 
+NOT_REGISTERED_MESSAGE = "Você não está cadastrado no MyBlogAlerts. Entre em contato com o responsável para se cadastrar."
+PORTAL_TIMEOUT_MESSAGE = "O portal do aluno está demorando para responder. Tente novamente em alguns instantes."
+
 
 class GetStudentGrades:
-    def __init__(self, scraping_service: ScrapingService, student_repository: StudentRepository):
-        self.scraping_service = scraping_service
+    def __init__(self, report_card_service: ReportCardService, student_repository: StudentRepository):
+        self.report_card_service = report_card_service
         self.student_repository = student_repository
 
-    def execute(self, phone_number: str) -> str:
+    def execute(self, phone_number: str, refresh: bool = False) -> str:
         """
         Executes the use case to get grades for a student identified by their phone number.
+        The report card is served from the cache unless refresh is set.
         """
         student = self.student_repository.get_by_phone_number(phone_number)
 
         # 2. Check if the student was found
         if not student:
-            return "Você não está cadastrado no MyBlogAlerts. Entre em contato com o responsável para se cadastrar."
+            return NOT_REGISTERED_MESSAGE
+
+        try:
+            report_card = self.report_card_service.get(student, refresh)
+        except TimeoutError:
+            return PORTAL_TIMEOUT_MESSAGE
+
+        return self._build_message(student, report_card)
+
+    async def execute_async(self, phone_number: str, refresh: bool = False) -> str:
+        """Same as execute, but awaits the portal without blocking the event loop."""
+        student = self.student_repository.get_by_phone_number(phone_number)
+
+        if not student:
+            return NOT_REGISTERED_MESSAGE
+
+        try:
+            report_card = await self.report_card_service.get_async(student, refresh)
+        except TimeoutError:
+            return PORTAL_TIMEOUT_MESSAGE
 
-        registration = student.registration
-        password = student.password
+        return self._build_message(student, report_card)
 
-        grades_data = self.scraping_service.get_grades(registration, password)
+    @staticmethod
+    def _build_message(student: Student, report_card: ReportCard) -> str:
+        grades_data = report_card.grades
 
         if not grades_data:
-            return f"Nenhuma nota encontrada para a matrícula {registration} no momento."
+            return f"Nenhuma nota encontrada para a matrícula {student.registration} no momento."
 
         response_message = f"Notas para o aluno {student.name}:\n\n"
         for discipline, grades_dict in grades_data.items():
@@ -43,4 +69,11 @@ class GetStudentGrades:
             response_message += f"- FINAL: *{final}*\n"
             response_message += f"- Resultado: *{resultado}*\n\n"
 
-        return response_message
+        return response_message + stale_notice(report_card)
+
+
+def stale_notice(report_card: ReportCard) -> str:
+    """Tells the student the answer comes from the cache because the portal was too slow."""
+    if not report_card.stale or not report_card.fetched_at:
+        return ""
+    return f"_O portal não respondeu a tempo. Dados consultados em {report_card.fetched_at.strftime('%d/%m às %H:%M')}._"
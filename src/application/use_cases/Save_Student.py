@@ -1,8 +1,9 @@
+from src.application.services.Keyed_Lock import KeyedLock
 from src.domain.repositories.Student_Repository import StudentRepository
 from src.domain.repositories.Student_Discipline_Repository import StudentDisciplineRepository
 from src.domain.services.Scraping_Service import ScrapingService
 from src.domain.models.Student import Student
-from typing import Union
+from typing import Optional, Union
 
 
 class StudentCreationError(Exception):
@@ -12,12 +13,22 @@ class StudentCreationError(Exception):
 
 class SaveStudent:
     def __init__(self, student_repo: StudentRepository, student_discipline_repo: StudentDisciplineRepository,
-                 scraping_service: ScrapingService):
+                 scraping_service: ScrapingService, student_locks: Optional[KeyedLock] = None):
         self.student_repo = student_repo
         self.student_discipline_repo = student_discipline_repo
         self.scraping_service = scraping_service
+        # Shared with the crawler: only work on the same registration is serialized
+        self.student_locks = student_locks or KeyedLock()
 
     def new_student(self, phone: str, faculty_registration: str, password: str) -> Union[Student, str]:
+        with self.student_locks.hold(faculty_registration):
+            return self._new_student(phone, faculty_registration, password)
+
+    def del_student(self, faculty_registration: str, password: str) -> Union[bool, str]:
+        with self.student_locks.hold(faculty_registration):
+            return self._del_student(faculty_registration, password)
+
+    def _new_student(self, phone: str, faculty_registration: str, password: str) -> Union[Student, str]:
         try:
             # 1. Verificar se o aluno já existe (agora busca no cache e no banco)
             if self.student_repo.find_by_registration(faculty_registration):
@@ -51,7 +62,7 @@ class SaveStudent:
             print(f"Erro inesperado no método new_student: {e}")
             raise  # Propaga a exceção para a API tratar como um erro 500
 
-    def del_student(self, faculty_registration: str, password: str) -> Union[bool, str]:
+    def _del_student(self, faculty_registration: str, password: str) -> Union[bool, str]:
         try:
             # Primeiro, valida as credenciais para autorizar a exclusão
             try:
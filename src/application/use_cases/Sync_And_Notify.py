@@ -1,10 +1,21 @@
 import threading
 import time
-from typing import List, Callable, Optional
+from datetime import date
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Callable, Optional, Dict, Set, Tuple
 import requests
 from bs4 import BeautifulSoup
+from src.application.services.Discipline_Scheduler import DisciplineScheduler
 from src.application.services.InMemory_Store import InMemoryStore
+from src.application.services.Keyed_Lock import KeyedLock
+from src.application.services.Metrics import Metrics, get_metrics
+from src.application.services.Notification_Dispatcher import NotificationDispatcher
+from src.application.services.Notification_Outbox_Relay import NotificationOutboxRelay
+from src.application.services.Report_Card_Service import ReportCardService
+from src.application.services.Sync_Unit_Of_Work import SyncUnitOfWork
 from src.domain.models.Discipline import Discipline
+from src.domain.models.Notification import Notification
+from src.domain.models.Post import Post
 from src.domain.models.Student import Student
 from src.domain.models.Student_Discipline import StudentDiscipline
 from src.domain.repositories.Discipline_Repository import DisciplineRepository
@@ -28,7 +39,18 @@ class SyncAndNotifyUseCase:
                  post_repo: PostRepository,
                  scraping_service: ScrapingService,
                  notification_service: NotificationService,
-                 sync_callback: Optional[Callable[[], None]] = None):
+                 sync_callback: Optional[Callable[[], None]] = None,
+                 max_workers: int = 4,
+                 scheduling_mode: str = "discipline",
+                 notification_dispatcher: Optional[NotificationDispatcher] = None,
+                 outbox_relay: Optional[NotificationOutboxRelay] = None,
+                 student_locks: Optional[KeyedLock] = None,
+                 report_card_service: Optional[ReportCardService] = None,
+                 report_card_refresh_seconds: float = 3600,
+                 metrics: Optional[Metrics] = None,
+                 discipline_scheduler: Optional[DisciplineScheduler] = None,
+                 baseline_new_disciplines: bool = True,
+                 discipline_refresh_seconds: float = 0):
         self.store = store
         self.discipline_repo = discipline_repo
         self.student_discipline_repo = student_discipline_repo
@@ -37,6 +59,57 @@ class SyncAndNotifyUseCase:
         self.notification_service = notification_service
         self.sync_callback = sync_callback
 
+        # Notifications are handed to a bounded dispatcher instead of one thread per message,
+        # so a cycle never waits on the WhatsApp API and per-destination limits are respected.
+        # With an outbox relay, messages are stored with the posts first and the relay feeds the dispatcher.
+        self.outbox_relay = outbox_relay
+        if notification_dispatcher is None and outbox_relay is not None:
+            notification_dispatcher = outbox_relay.dispatcher
+        if notification_dispatcher is None:
+            notification_dispatcher = NotificationDispatcher(notification_service)
+            notification_dispatcher.start()
+        self.notification_dispatcher = notification_dispatcher
+
+        # Worker pool: at most max_workers portal sessions at once. Politeness towards the
+        # portal is enforced by the scraping layer's shared per-host rate limiter.
+        self.max_workers = max(1, max_workers)
+
+        # "discipline": every discipline is crawled once per cycle with one enrolled student's session
+        # and its new posts are fanned out to the whole class. "student": every student crawls
+        # all of their own disciplines (legacy behaviour).
+        if scheduling_mode not in ("discipline", "student"):
+            raise ValueError(f"Unknown scheduling mode: {scheduling_mode}")
+        self.scheduling_mode = scheduling_mode
+        # Optional adaptive polling (discipline mode only): each cycle only crawls the disciplines
+        # that are due, checking active blogs often and dormant ones rarely.
+        self.discipline_scheduler = discipline_scheduler
+
+        # Baseline mode: the first crawl of a discipline that was never baselined (a class seen for the
+        # first time) stores its whole blog as already seen, without notifying the history. The flag is
+        # persisted with the discipline once its posts are stored, so a restart never baselines it again.
+        self.baseline_new_disciplines = baseline_new_disciplines
+
+        # A student's discipline list only changes between semesters (or on enrollment changes), so it
+        # is synced again every discipline_refresh_seconds or when the semester turns (0: every cycle).
+        self.discipline_refresh_seconds = discipline_refresh_seconds
+        self._disciplines_synced_at: Dict[int, Tuple[Tuple[int, int], float]] = {}
+
+        # The store's own lock, held around check-then-act sequences on the store
+        # and the per-cycle bookkeeping shared by the workers
+        self._store_lock = store.lock
+        # Per-student locks shared with registration/deletion, keyed by registration.
+        # A student's discipline sync never overlaps with their deletion.
+        self.student_locks = student_locks or KeyedLock()
+        self._discipline_creation_lock = threading.Lock()
+
+        # Optional report card prefetch: while a student is logged in for the cycle, their report card
+        # is refreshed every report_card_refresh_seconds and grade changes are sent to them.
+        self.report_card_service = report_card_service
+        self.report_card_refresh_seconds = report_card_refresh_seconds
+
+        # Timing spans and counters per stage, aggregated per cycle (see Metrics)
+        self.metrics = metrics or get_metrics()
+
         # State for recovery mechanism
         self.max_recovery_attempts = 3
         self.recovery_attempts = 0
@@ -53,6 +126,8 @@ class SyncAndNotifyUseCase:
         (e.g., due to corrupted in-memory data), it will attempt to trigger a
         recovery sync via the provided callback.
         """
+        self.metrics.start_cycle()
+        success = False
         try:
             # 1. Validate the store state before starting the expensive loop.
             if self.store.students is None or \
@@ -66,6 +141,7 @@ class SyncAndNotifyUseCase:
 
             # 2. If validation passes, run the main processing logic.
             self._run_processing_loop(processed_posts_this_cycle)
+            success = True
 
             # 3. If the logic completes successfully, it means the system is healthy.
             # Reset the counter if it was previously in a failed state.
@@ -79,52 +155,274 @@ class SyncAndNotifyUseCase:
             self._handle_execution_failure()
             # Re-raise the exception so the caller knows the execution failed.
             raise
+        finally:
+            print(Metrics.format_cycle_summary(self.metrics.end_cycle(success)))
 
     def _run_processing_loop(self, processed_posts_this_cycle: set):
-        """Contains the actual student processing loop."""
+        """
+        Processes every student of the store using a pool of workers. Each worker
+        runs its own portal session, while the scraping layer's rate limiter keeps
+        the total request rate under a global budget.
+        """
         print("Starting synchronization process using in-memory data...")
-        students = self.store.students
+        students = self.store.get_students()
         if not students:
             print("No students found in the in-memory store. A full sync may be required.")
             return
 
-        for student in students:
-            print(f"\nProcessing student: {student.name}")
-            session: Optional[requests.Session] = None
-            try:
-                login_result = self.scraping_service.login(student.registration, student.password)
-                if not login_result:
-                    print(f"Login failed for student {student.name}. Skipping this student.")
-                    continue
-                session, dashboard_html = login_result
-                
-                self._sync_student_disciplines(student, session, dashboard_html)
-
-                student_discipline_ids = {
-                    sd.id_discipline for sd in self.store.student_disciplines if sd.id_student == student.id_student
-                }
-                student_disciplines = [
-                    d for d in self.store.disciplines if d.id_discipline in student_discipline_ids
-                ]
-
-                if not student_disciplines:
-                    print(f"No disciplines found in store for student {student.name}. Skipping post search.")
-                    continue
+        print(f"Processing {len(students)} students with {self.max_workers} workers ({self.scheduling_mode} mode)...")
+        if self.scheduling_mode == "discipline":
+            self._run_discipline_centric_cycle(students, processed_posts_this_cycle)
+        else:
+            self._run_in_pool(self._process_student, [(student, processed_posts_this_cycle) for student in students])
+
+        print("\nSynchronization process finished.")
+
+    def _run_in_pool(self, task: Callable, args_list: List[tuple]) -> list:
+        """Runs task once per argument tuple in the worker pool and returns the results in order."""
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="sync-worker") as executor:
+            futures = [executor.submit(task, *args) for args in args_list]
+            # Per-student errors are handled inside the tasks; anything
+            # raised here is a critical failure and must reach execute().
+            return [future.result() for future in futures]
+
+    def _run_discipline_centric_cycle(self, students: List[Student], processed_posts_this_cycle: set):
+        """
+        Runs a cycle in two phases: first every student logs in and has their
+        disciplines synchronized, then every discipline is crawled once with the
+        session of one enrolled student and new posts are sent to the whole class.
+        """
+        sessions: Dict[int, Tuple[Student, requests.Session]] = {}
+        try:
+            print("Phase 1: logging in students and syncing disciplines...")
+            results = self._run_in_pool(self._open_student_session, [(student,) for student in students])
+            for student, session in zip(students, results):
+                if session:
+                    sessions[student.id_student] = (student, session)
+
+            print("Phase 2: crawling each discipline once...")
+            discipline_students = self._build_discipline_students_map()
+            due_students = discipline_students
+            if self.discipline_scheduler is not None:
+                due = self.discipline_scheduler.plan(discipline_students.keys(), self._post_dates_by_cripto)
+                due_students = {id_cripto: ids for id_cripto, ids in discipline_students.items() if id_cripto in due}
+                self.metrics.increment("disciplines_due", len(due_students))
+                self.metrics.increment("disciplines_skipped", len(discipline_students) - len(due_students))
+                print(f"  {len(due_students)} of {len(discipline_students)} disciplines are due for a check.")
+            assignments = self._assign_disciplines_to_sessions(sessions, due_students)
+            crawled = sum(len(disciplines) for _, disciplines in assignments.values())
+            print(f"  {crawled} disciplines assigned to {len(assignments)} student sessions.")
+
+            self._run_in_pool(self._crawl_assigned_disciplines, [
+                (student, disciplines, processed_posts_this_cycle, sessions[student.id_student][1], discipline_students)
+                for student, disciplines in assignments.values()
+            ])
+        finally:
+            for student, session in sessions.values():
+                try:
+                    self.scraping_service.logout(session)
+                except Exception as e:
+                    print(f"Could not log out student {student.name}: {e}")
+
+    def _open_student_session(self, student: Student) -> Optional[requests.Session]:
+        """Logs a student in and syncs their disciplines. Returns the session, kept open for phase 2."""
+        with self.student_locks.hold(student.registration):
+            if not self._is_still_registered(student):
+                return None
+            return self._login_and_sync_disciplines(student)
+
+    def _login_and_sync_disciplines(self, student: Student) -> Optional[requests.Session]:
+        print(f"\nProcessing student: {student.name}")
+        session: Optional[requests.Session] = None
+        unit_of_work = self._new_unit_of_work()
+        try:
+            with self.metrics.span("login"):
+                session, dashboard_html = self.scraping_service.login(student.registration, student.password)
+            if not session:
+                print(f"Login failed for student {student.name}. Skipping this student.")
+                self.metrics.increment("login_failures")
+                return None
+            self.metrics.increment("logins")
+
+            if self._disciplines_are_fresh(student):
+                self.metrics.increment("discipline_syncs_skipped")
+            elif self._sync_student_disciplines(student, session, dashboard_html, unit_of_work):
+                self._disciplines_synced_at[student.id_student] = (self._current_semester(), time.monotonic())
+            self._refresh_report_card(student, session, dashboard_html)
+            return session
+        except Exception as e:
+            print(f"An error occurred while processing student {student.name}: {e}")
+            if session:
+                self.scraping_service.logout(session)
+            return None
+        finally:
+            self._flush(unit_of_work)
+
+    def _disciplines_are_fresh(self, student: Student) -> bool:
+        synced = self._disciplines_synced_at.get(student.id_student)
+        if synced is None or self.discipline_refresh_seconds <= 0:
+            return False
+        semester, synced_at = synced
+        return semester == self._current_semester() and time.monotonic() - synced_at < self.discipline_refresh_seconds
+
+    @staticmethod
+    def _current_semester() -> Tuple[int, int]:
+        today = date.today()
+        return today.year, 1 if today.month <= 6 else 2
+
+    def _refresh_report_card(self, student: Student, session: requests.Session, dashboard_html: BeautifulSoup):
+        """Refreshes the student's report card snapshot with their open session and notifies grade changes."""
+        if self.report_card_service is None:
+            return
+        if not self.report_card_service.is_due(student, self.report_card_refresh_seconds):
+            return
+
+        print("  Refreshing report card...")
+        try:
+            with self.metrics.span("get_report_card"):
+                report_card = self.scraping_service.get_report_card_with_session(session, dashboard_html)
+        except Exception as e:
+            # A report card failure must not cost the student their post sync
+            print(f"  Could not refresh the report card of {student.name}: {e}")
+            return
+
+        # Kept until well after the next refresh, so the endpoints always answer from the snapshot
+        changes = self.report_card_service.update(student, report_card, ttl_seconds=self.report_card_refresh_seconds * 2)
+        if not changes:
+            return
+
+        message = "Seu boletim foi atualizado:\n"
+        for discipline, fields in changes.items():
+            message += f"\n*{discipline}*\n"
+            for grade_field, (old_value, new_value) in fields.items():
+                message += f"- {grade_field}: {old_value or '-'} → *{new_value}*\n"
+        print(f"  Report card of {student.name} changed in {len(changes)} disciplines. Notifying...")
+        with self.metrics.span("notification_enqueue"):
+            self.notification_dispatcher.submit(student.phone_number, message)
+
+    def _is_still_registered(self, student: Student) -> bool:
+        """The student may have been deleted while the cycle was waiting for their lock."""
+        if self.store.get_student_by_id(student.id_student) is None:
+            print(f"Student {student.name} was removed during the cycle. Skipping.")
+            return False
+        return True
+
+    def _build_discipline_students_map(self) -> Dict[str, Set[int]]:
+        """Maps every discipline id_cripto to the ids of the students enrolled in it."""
+        with self._store_lock:
+            discipline_students: Dict[str, Set[int]] = {}
+            for discipline in self.store.disciplines:
+                student_ids = self.store.get_student_ids_for_discipline(discipline.id_discipline)
+                if student_ids:
+                    discipline_students.setdefault(discipline.id_cripto, set()).update(student_ids)
+        return discipline_students
+
+    def _post_dates_by_cripto(self) -> Dict[str, List[date]]:
+        """Dates of the stored posts of every discipline, grouped by id_cripto (the scheduler's history)."""
+        with self._store_lock:
+            cripto_by_id = {d.id_discipline: d.id_cripto for d in self.store.disciplines}
+            post_dates: Dict[str, List[date]] = {}
+            for post in self.store.posts:
+                id_cripto = cripto_by_id.get(post.discipline_id)
+                if id_cripto is not None:
+                    post_dates.setdefault(id_cripto, []).append(post.post_date)
+        return post_dates
+
+    def _assign_disciplines_to_sessions(self,
+                                        sessions: Dict[int, Tuple[Student, requests.Session]],
+                                        discipline_students: Dict[str, Set[int]]
+                                        ) -> Dict[int, Tuple[Student, List[Discipline]]]:
+        """
+        Picks one authenticated session per id_cripto, spreading the disciplines
+        over the available sessions so the crawl work is balanced across workers.
+        """
+        with self._store_lock:
+            disciplines_by_cripto = {}
+            for d in self.store.disciplines:
+                disciplines_by_cripto.setdefault(d.id_cripto, d)
+
+        assignments: Dict[int, Tuple[Student, List[Discipline]]] = {}
+        for id_cripto, student_ids in discipline_students.items():
+            candidates = [student_id for student_id in student_ids if student_id in sessions]
+            if not candidates:
+                continue
+            chosen = min(candidates, key=lambda student_id: len(assignments.get(student_id, (None, []))[1]))
+            student = sessions[chosen][0]
+            assignments.setdefault(chosen, (student, []))[1].append(disciplines_by_cripto[id_cripto])
+        return assignments
+
+    def _crawl_assigned_disciplines(self, student: Student, disciplines: List[Discipline],
+                                    processed_posts_this_cycle: set, session: requests.Session,
+                                    discipline_students: Dict[str, Set[int]]):
+        """Crawls the disciplines assigned to a student session, isolating errors per student."""
+        unit_of_work = self._new_unit_of_work()
+        try:
+            self._sync_discipline_posts(student, disciplines, processed_posts_this_cycle, session, unit_of_work,
+                                        discipline_students)
+        except Exception as e:
+            print(f"An error occurred while crawling disciplines with student {student.name}: {e}")
+        finally:
+            self._flush(unit_of_work)
 
-                self._sync_discipline_posts(student, student_disciplines, processed_posts_this_cycle, session)
+    def _new_unit_of_work(self) -> SyncUnitOfWork:
+        outbox_repo = self.outbox_relay.outbox_repo if self.outbox_relay else None
+        return SyncUnitOfWork(self.student_discipline_repo, self.post_repo, outbox_repo, self.discipline_repo)
 
+    def _flush(self, unit_of_work: SyncUnitOfWork):
+        """
+        Writes the unit of work and lets the outbox relay deliver any notification it stored.
+        When the write fails, its posts are taken out of the store again, so the next cycle
+        finds them as new and queues their notifications once more.
+        """
+        has_notifications = bool(unit_of_work.new_notifications)
+        if not unit_of_work.is_empty():
+            try:
+                with self.metrics.span("db_flush"):
+                    unit_of_work.flush()
             except Exception as e:
-                # This handles non-critical errors for a single student (e.g., login failure).
-                # The loop will continue to the next student.
-                print(f"An error occurred while processing student {student.name}: {e}")
+                print(f"  Could not store {len(unit_of_work.new_posts)} posts and {len(unit_of_work.new_notifications)} "
+                      f"notifications, they will be found again next cycle: {e}")
+                self.metrics.increment("flush_failures")
+                self.store.remove_posts(unit_of_work.new_posts)
+                return
+        if has_notifications and self.outbox_relay:
+            self.outbox_relay.wake()
+
+    def _process_student(self, student: Student, processed_posts_this_cycle: set):
+        """Logs a single student in and synchronizes their disciplines and posts."""
+        print(f"\nProcessing student: {student.name}")
+        session: Optional[requests.Session] = None
+        try:
+            # Only the discipline sync is done under the student's lock; the post crawl can take
+            # a while and must not hold back a registration or deletion.
+            with self.student_locks.hold(student.registration):
+                if not self._is_still_registered(student):
+                    return
+                session = self._login_and_sync_disciplines(student)
+            if not session:
+                return
+
+            student_disciplines = self.store.get_disciplines_for_student(student.id_student)
+
+            if not student_disciplines:
+                print(f"No disciplines found in store for student {student.name}. Skipping post search.")
+                return
+
+            unit_of_work = self._new_unit_of_work()
+            try:
+                self._sync_discipline_posts(student, student_disciplines, processed_posts_this_cycle, session,
+                                            unit_of_work)
             finally:
-                if session: # Only logout if login was successful
-                    self.scraping_service.logout()
-                print(f"Finished processing student: {student.name}")
-                time.sleep(1)
-            time.sleep(30)
+                self._flush(unit_of_work)
 
-        print("\nSynchronization process finished.")
+        except Exception as e:
+            # This handles non-critical errors for a single student (e.g., login failure).
+            # The other workers keep going.
+            print(f"An error occurred while processing student {student.name}: {e}")
+        finally:
+            if session:  # Only logout if login was successful
+                self.scraping_service.logout(session)
+            print(f"Finished processing student: {student.name}")
 
     def _handle_execution_failure(self):
         """Handles the recovery logic when a critical error occurs."""
@@ -143,24 +441,24 @@ class SyncAndNotifyUseCase:
         else:
             print(f"--- Max recovery attempts ({self.max_recovery_attempts}) reached. Backing off. ---")
 
-    def _sync_student_disciplines(self, student: Student, session: requests.Session, dashboard_html: BeautifulSoup):
+    def _sync_student_disciplines(self, student: Student, session: requests.Session, dashboard_html: BeautifulSoup,
+                                  unit_of_work: SyncUnitOfWork) -> bool:
         """
         Fetches disciplines from scraping, finds or creates them,
         and associates them with the student, updating the in-memory store.
+        New disciplines are inserted in one batch; association changes are left in the unit of work.
+        Returns False when no discipline was found.
         """
         print("  Syncing disciplines...")
-        scraped_disciplines = self.scraping_service.get_disciplines(session, dashboard_html)
+        with self.metrics.span("get_disciplines"):
+            scraped_disciplines = self.scraping_service.get_disciplines(session, dashboard_html)
         if not scraped_disciplines:
             print("  No disciplines found in scraping.")
-            return
-        
+            return False
 
-        student_discipline_ids = {sd.id_discipline for sd in self.store.student_disciplines if sd.id_student == student.id_student}
-
-        disciplines_of_student = [
-            d for d in self.store.disciplines 
-            if d.id_discipline in student_discipline_ids
-        ]
+        # The student's associations are only changed by the holder of the student's lock,
+        # so the individual (locked) store calls are enough here.
+        disciplines_of_student = self.store.get_disciplines_for_student(student.id_student)
 
         scraped_ids = {d.id_cripto for d in scraped_disciplines}
         subjects_to_remove = [d for d in disciplines_of_student if d.id_cripto not in scraped_ids]
@@ -169,88 +467,161 @@ class SyncAndNotifyUseCase:
         print("  Checking for deleted disciplines...")
         for d in subjects_to_remove:
             print(f"    Deleting discipline '{student.id_student, d.name}'...")
-            self.student_discipline_repo.delete(student.id_student, d.id_discipline)
+            unit_of_work.register_removed_association(StudentDiscipline(student.id_student, d.id_discipline))
         if (len(ids_to_remove) > 0):
-            self.store.student_disciplines = [
-                sd for sd in self.store.student_disciplines 
-                if sd.id_discipline not in ids_to_remove
-            ]
-            
+            self.store.remove_student_discipline_associations(student.id_student, ids_to_remove)
+
+        scraped_disciplines = [d for d in scraped_disciplines if d.id_cripto is not None]
+        # Disciplines are shared between students: creating them is serialized on its own lock,
+        # so the store stays readable while the insert runs.
+        with self._discipline_creation_lock:
+            new_disciplines = {}
+            for scraped_discipline in scraped_disciplines:
+                key = (scraped_discipline.name, scraped_discipline.id_cripto)
+                if self.store.find_discipline(*key) is None and key not in new_disciplines:
+                    print(f"    New discipline found: '{scraped_discipline.name}'. Saving...")
+                    new_disciplines[key] = scraped_discipline
+            if new_disciplines:
+                with self.metrics.span("db_save_disciplines"):
+                    saved_disciplines = self.discipline_repo.save_many(list(new_disciplines.values()))
+                for saved_discipline in saved_disciplines:
+                    self.store.add_discipline(saved_discipline)
 
         for scraped_discipline in scraped_disciplines:
-            if scraped_discipline.id_cripto is None:
+            db_discipline = self.store.find_discipline(scraped_discipline.name, scraped_discipline.id_cripto)
+            if db_discipline is None:
+                # Its insert could not be matched back to a row: associated on a later sync
+                print(f"    Discipline '{scraped_discipline.name}' could not be saved. Skipping it.")
                 continue
 
-            db_discipline = next((d for d in self.store.disciplines if d.name == scraped_discipline.name and d.id_cripto == scraped_discipline.id_cripto), None)
-
-            if db_discipline is None:
-                print(f"    New discipline found: '{scraped_discipline.name}'. Saving...")
-                saved_discipline = self.discipline_repo.save(scraped_discipline)
-                self.store.add_discipline(saved_discipline)
-                db_discipline = saved_discipline
-
-            association_exists = any(
-                sd.id_student == student.id_student and sd.id_discipline == db_discipline.id_discipline
-                for sd in self.store.student_disciplines
-            )
-            if not association_exists:
+            if not self.store.has_student_discipline_association(student.id_student, db_discipline.id_discipline):
                 print(f"    Associating student with '{db_discipline.name}'...")
                 new_association = StudentDiscipline(student.id_student, db_discipline.id_discipline)
-                self.student_discipline_repo.save(new_association)
+                unit_of_work.register_association(new_association)
                 self.store.add_student_discipline_association(new_association)
+        return True
 
-    def _sync_discipline_posts(self, current_student: Student, disciplines: List[Discipline], processed_posts_this_cycle: set, session: requests.Session):
+    def _is_known_post(self, post: Post) -> bool:
+        """Tells whether a scraped post is already in the main store."""
+        with self._store_lock:
+            return self.store.has_post(post.post_url, post.post_date)
+
+    def _sync_discipline_posts(self, current_student: Student, disciplines: List[Discipline], processed_posts_this_cycle: set,
+                               session: requests.Session, unit_of_work: SyncUnitOfWork,
+                               discipline_students: Optional[Dict[str, Set[int]]] = None):
         """
         Fetches posts, and for each new post, finds all relevant students,
-        notifies them, saves the post, and marks it as processed for this cycle.
+        notifies them, queues the post in the unit of work, and marks it as processed for this cycle.
+        With an outbox relay the notifications are queued in the unit of work too, and only
+        delivered once they are stored together with the post.
+        When discipline_students is given, it is used to find the recipients (grouped by id_cripto).
         """
         print("  Syncing posts...")
         for discipline in disciplines:
+            if self._needs_baseline(discipline):
+                self._ingest_baseline(discipline, processed_posts_this_cycle, session, unit_of_work)
+                continue
+
             print(f"    Checking posts for '{discipline.name}'...")
-            scraped_posts = self.scraping_service.get_posts(session, discipline)
+            with self.metrics.span("get_posts"):
+                scraped_posts = self.scraping_service.get_posts(session, discipline, self._is_known_post)
+            new_post_dates: List[date] = []
             if not scraped_posts:
+                self._record_check(discipline, new_post_dates)
                 continue
 
             for post in reversed(scraped_posts):
-                # 1. Check if post is already in the main store (old post)
-                is_old_post = any(
-                    p.post_url == post.post_url and p.post_date == post.post_date
-                    for p in self.store.posts
-                )
-                if is_old_post:
-                    continue
-
-                # 2. Check if post was already handled in this sync cycle
-                if post.post_url in processed_posts_this_cycle:
-                    continue
-
-                # 3. This is a genuinely new post for this cycle. Process it.
+                with self._store_lock:
+                    # 1. Check if post is already in the main store (old post)
+                    if self._is_known_post(post):
+                        continue
+
+                    # 2. Check if post was already handled in this sync cycle (possibly by another worker)
+                    if post.post_url in processed_posts_this_cycle:
+                        continue
+
+                    # 3. Claim the post so no other worker notifies it again in this cycle
+                    processed_posts_this_cycle.add(post.post_url)
+                    new_post_dates.append(post.post_date)
+
+                    # Find all students for this discipline
+                    if discipline_students is not None:
+                        target_student_ids = discipline_students.get(discipline.id_cripto, set())
+                    else:
+                        target_student_ids = self.store.get_student_ids_for_discipline(discipline.id_discipline)
+                    target_students = [
+                        student for student in map(self.store.get_student_by_id, target_student_ids)
+                        if student is not None
+                    ]
+
+                # 4. This is a genuinely new post for this cycle. Process it.
                 print(f"      New post found in '{discipline.name}'. Notifying all relevant students...")
 
-                # Find all students for this discipline
-                target_student_ids = {
-                    sd.id_student
-                    for sd in self.store.student_disciplines
-                    if sd.id_discipline == discipline.id_discipline
-                }
-                target_students = [s for s in self.store.students if s.id_student in target_student_ids]
-
                 if not target_students:
                     print("        Warning: New post found but no students are associated with the discipline.")
                     continue
-                
+
+                self.metrics.increment("new_posts")
+
                 # Send notifications to all target students
                 message = f"Novo aviso em *{discipline.name}*:\n\n{post.content}\n\n*Url:* {post.post_url}"
-                for student_to_notify in target_students:
-                    print(f"        Sending DM to {student_to_notify.name} ({student_to_notify.phone_number})")
-                    # Send direct message using the notification service
-                    threading.Thread(target=self.notification_service.student_msg, args=(student_to_notify.phone_number, message)).start()
-                    time.sleep(1) # Small delay to avoid rate-limiting
-
-                # 4. Save the post to DB and main store
-                self.post_repo.save(post)
-                self.store.add_post(post)
+                with self.metrics.span("notification_enqueue"):
+                    for student_to_notify in target_students:
+                        print(f"        Queueing DM to {student_to_notify.name} ({student_to_notify.phone_number})")
+                        if self.outbox_relay:
+                            unit_of_work.register_notification(
+                                Notification(post.post_url, post.post_date, student_to_notify.id_student, message))
+                        else:
+                            # Queue the direct message; the dispatcher paces and retries the delivery
+                            self.notification_dispatcher.submit(student_to_notify.phone_number, message)
+
+                # 5. Queue the post for the batched insert and add it to the main store
+                unit_of_work.register_post(post)
+                with self._store_lock:
+                    self.store.add_post(post)
+
+            self._record_check(discipline, new_post_dates)
+
+    def _record_check(self, discipline: Discipline, new_post_dates: List[date]):
+        """Lets the scheduler adapt the discipline's polling interval to what the check found."""
+        if self.discipline_scheduler is not None and self.scheduling_mode == "discipline":
+            self.discipline_scheduler.record(discipline.id_cripto, new_post_dates)
+
+    def _needs_baseline(self, discipline: Discipline) -> bool:
+        if not self.baseline_new_disciplines:
+            return False
+        return not discipline.baselined
+
+    def _ingest_baseline(self, discipline: Discipline, processed_posts_this_cycle: set, session: requests.Session,
+                         unit_of_work: SyncUnitOfWork):
+        """
+        Stores every post of a discipline seen for the first time as already known: queued for the
+        batched insert and added to the store, with no notification. Only posts published after
+        the baseline are notified.
+        """
+        print(f"    First crawl of '{discipline.name}': storing its existing posts without notifying...")
+        try:
+            with self.metrics.span("get_posts_baseline"):
+                # All or nothing: a partial history would let the older posts be notified later
+                scraped_posts = self.scraping_service.get_posts(session, discipline, raise_on_error=True)
+        except Exception as e:
+            print(f"      Could not read the blog of '{discipline.name}', trying again next cycle: {e}")
+            return
 
-                # 5. Mark post as processed for this cycle to avoid duplicate notifications
+        ingested = []
+        with self._store_lock:
+            for post in reversed(scraped_posts):
+                if self._is_known_post(post) or post.post_url in processed_posts_this_cycle:
+                    continue
                 processed_posts_this_cycle.add(post.post_url)
-                time.sleep(3) # A longer delay after a batch of notifications for a new post
+                unit_of_work.register_post(post)
+                self.store.add_post(post)
+                ingested.append(post)
+            # Marked as baselined (in the database and here) once the posts are flushed
+            unit_of_work.register_baselined_discipline(discipline)
+
+        print(f"      {len(ingested)} existing posts stored as seen.")
+        self.metrics.increment("baseline_disciplines")
+        self.metrics.increment("baseline_posts", len(ingested))
+        # The history seeds the scheduler's posting rate of the discipline
+        self._record_check(discipline, [post.post_date for post in ingested])
@@ -7,3 +7,5 @@ class Discipline:
     name: str
     id_cripto: str
     id_discipline: Optional[int] = None
+    # Whether the blog history was already stored without notifications (see baseline mode)
+    baselined: bool = False
@@ -0,0 +1,13 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+
+@dataclass
+class Notification:
+    post_url: str
+    post_date: datetime.date
+    student_id: int
+    message: str
+    attempts: int = 0
+    id_notification: Optional[int] = None
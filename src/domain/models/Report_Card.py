@@ -0,0 +1,11 @@
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Optional
+
+
+@dataclass
+class ReportCard:
+    grades: Dict[str, Dict[str, str]] = field(default_factory=dict)
+    absences: Dict[str, Dict[str, str]] = field(default_factory=dict)
+    fetched_at: Optional[datetime] = None
+    stale: bool = False
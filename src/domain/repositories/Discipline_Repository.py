@@ -8,7 +8,16 @@ class DisciplineRepository(ABC):
     def get_all(self) -> Optional[List[Discipline]]:
         """
         Returns all disciplines from the database.
-        :return: A list of Discipline objects or None if no disciplines are found.
+        :return: A list of Discipline objects (empty when there are none) or None if the query fails.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_since(self, last_id: int) -> Optional[List[Discipline]]:
+        """
+        Returns the disciplines whose ID is greater than the given watermark.
+        :param last_id: The highest discipline ID already known.
+        :return: A list of Discipline objects (possibly empty) or None if the query fails.
         """
         raise NotImplementedError
 
@@ -38,4 +47,21 @@ class DisciplineRepository(ABC):
         :param discipline: The Discipline object to save.
         :return: The saved Discipline object with its database ID.
         """
-        raise NotImplementedError
\ No newline at end of file
+        raise NotImplementedError
+
+    @abstractmethod
+    def save_many(self, disciplines: List[Discipline]) -> List[Discipline]:
+        """
+        Saves several new disciplines in a single round-trip and returns them with their new IDs.
+        :param disciplines: The Discipline objects to save.
+        :return: The saved Discipline objects with their database IDs (only those matched to a new row).
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def mark_baselined_many(self, discipline_ids: List[int]) -> None:
+        """
+        Records that the blog history of these disciplines is stored, so it is never baselined again.
+        :param discipline_ids: The IDs of the baselined disciplines.
+        """
+        raise NotImplementedError
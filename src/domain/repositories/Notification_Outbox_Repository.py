@@ -0,0 +1,53 @@
+from abc import ABC, abstractmethod
+from typing import List
+from src.domain.models.Notification import Notification
+from src.domain.models.Post import Post
+
+
+class NotificationOutboxRepository(ABC):
+    @abstractmethod
+    def ensure_table(self) -> None:
+        """
+        Creates the outbox storage if it does not exist yet.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def save_posts_with_notifications(self, posts: List[Post], notifications: List[Notification]) -> None:
+        """
+        Saves new posts and the notifications they produce atomically, in a single transaction.
+        Notifications already in the outbox (same post_url, post_date and student_id) are ignored.
+        :param posts: The Post objects to save.
+        :param notifications: The Notification objects to enqueue.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def claim_pending(self, limit: int, lease_seconds: float) -> List[Notification]:
+        """
+        Claims pending notifications for delivery. Claimed rows are not returned again
+        until the lease expires, so a crashed worker's rows are eventually retried.
+        :param limit: The maximum number of notifications to claim.
+        :param lease_seconds: How long the claim is held.
+        :return: A list of Notification objects (possibly empty).
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def mark_sent(self, notification_id: int) -> None:
+        """
+        Marks a notification as delivered so it is never sent again.
+        :param notification_id: The ID of the notification.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def mark_failed(self, notification_id: int, error: str, max_attempts: int) -> None:
+        """
+        Records a failed delivery and releases the claim. The notification is given up
+        once it has failed max_attempts times.
+        :param notification_id: The ID of the notification.
+        :param error: A description of the failure.
+        :param max_attempts: The number of failures after which the notification is abandoned.
+        """
+        raise NotImplementedError
@@ -13,6 +13,14 @@ class PostRepository(ABC):
         """
         raise NotImplementedError
 
+    @abstractmethod
+    def save_many(self, posts: List[Post]) -> None:
+        """
+        Saves several new posts in a single round-trip, ignoring posts that already exist.
+        :param posts: The Post objects to save.
+        """
+        raise NotImplementedError
+
     @abstractmethod
     def find_by_url_and_date(self, url: str, post_date: date) -> Optional[Post]:
         """
@@ -27,6 +35,15 @@ class PostRepository(ABC):
     def get_all(self) -> Optional[List[Post]]:
         """
         Returns all posts from the database.
-        :return: A list of Post objects or None if no posts are found.
+        :return: A list of Post objects (empty when there are none) or None if the query fails.
         """
-        raise NotImplementedError
\ No newline at end of file
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_since(self, last_id: int) -> Optional[List[Post]]:
+        """
+        Returns the posts whose ID is greater than the given watermark.
+        :param last_id: The highest post ID already known.
+        :return: A list of Post objects (possibly empty) or None if the query fails.
+        """
+        raise NotImplementedError
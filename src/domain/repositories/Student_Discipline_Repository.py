@@ -13,6 +13,22 @@ class StudentDisciplineRepository(ABC):
         """
         raise NotImplementedError
 
+    @abstractmethod
+    def save_many(self, student_disciplines: List[StudentDiscipline]) -> None:
+        """
+        Saves several student-discipline associations in a single round-trip, ignoring existing ones.
+        :param student_disciplines: The StudentDiscipline objects to save.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete_many(self, student_disciplines: List[StudentDiscipline]) -> None:
+        """
+        Deletes several student-discipline associations in a single round-trip.
+        :param student_disciplines: The StudentDiscipline objects to delete.
+        """
+        raise NotImplementedError
+
     @abstractmethod
     def get_disciplines_by_student_id(self, student_id: int) -> Optional[List[Discipline]]:
         """
@@ -36,7 +52,7 @@ class StudentDisciplineRepository(ABC):
     def get_all(self) -> Optional[List[StudentDiscipline]]:
         """
         Returns all student-discipline associations from the database.
-        :return: A list of StudentDiscipline objects or None if none are found.
+        :return: A list of StudentDiscipline objects (empty when there are none) or None if the query fails.
         """
         raise NotImplementedError
 
@@ -47,4 +63,3 @@ class StudentDisciplineRepository(ABC):
         :param student_id: The ID of the student whose associations should be deleted.
         """
         raise NotImplementedError
-    
\ No newline at end of file
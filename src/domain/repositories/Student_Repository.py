@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import List, Optional, Set
 from src.domain.models.Student import Student
 
 
@@ -12,6 +12,23 @@ class StudentRepository(ABC):
         """
         raise NotImplementedError
 
+    @abstractmethod
+    def get_since(self, last_id: int) -> List[Student]:
+        """
+        Returns the students whose ID is greater than the given watermark.
+        :param last_id: The highest student ID already known.
+        :return: A list of Student objects, possibly empty.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_all_ids(self) -> Optional[Set[int]]:
+        """
+        Returns the IDs of all students, without decrypting any data.
+        :return: A set of student IDs or None if the query fails.
+        """
+        raise NotImplementedError
+
     @abstractmethod
     def get_by_id(self, student_id: int) -> Optional[Student]:
         """
@@ -30,6 +47,15 @@ class StudentRepository(ABC):
         """
         raise NotImplementedError
 
+    @abstractmethod
+    def find_by_phone_number(self, phone_number: str) -> Optional[Student]:
+        """
+        Finds a student by their phone number, in the cache and then in the database.
+        :param phone_number: The phone number to search for.
+        :return: A Student object or None if not found.
+        """
+        raise NotImplementedError
+
     @abstractmethod
     def get_by_phone_number(self, phone_number: str) -> Optional[Student]:
         """
@@ -9,3 +9,22 @@ class NotificationService(ABC):
         :param message: The content of the message to be sent.
         """
         raise NotImplementedError
+
+    @abstractmethod
+    def student_msg(self, phone: str, msg: str) -> None:
+        """
+        Sends a direct message to a student, retrying on network errors.
+        :param phone: The student's phone number.
+        :param msg: The content of the message.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def send_direct_message(self, phone: str, msg: str) -> None:
+        """
+        Makes a single attempt to send a direct message to a student.
+        Raises an exception if the message could not be sent, so callers can schedule retries.
+        :param phone: The student's phone number.
+        :param msg: The content of the message.
+        """
+        raise NotImplementedError
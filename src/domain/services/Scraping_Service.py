@@ -1,8 +1,9 @@
 from abc import ABC, abstractmethod
 import requests
-from typing import List, Optional, Tuple, Dict
+from typing import Callable, List, Optional, Tuple, Dict
 from src.domain.models.Discipline import Discipline
 from src.domain.models.Post import Post
+from src.domain.models.Report_Card import ReportCard
 from bs4 import BeautifulSoup
 
 
@@ -18,8 +19,11 @@ class ScrapingService(ABC):
         raise NotImplementedError
 
     @abstractmethod
-    def logout(self) -> None:
-        """ Logs out of the academic portal. """
+    def logout(self, session: requests.Session) -> None:
+        """
+        Logs out of the academic portal.
+        :param session: The authenticated requests session returned by login.
+        """
         raise NotImplementedError
 
     @abstractmethod
@@ -33,11 +37,15 @@ class ScrapingService(ABC):
         raise NotImplementedError
 
     @abstractmethod
-    def get_posts(self, session: requests.Session, discipline: Discipline) -> List[Post]:
+    def get_posts(self, session: requests.Session, discipline: Discipline,
+                  is_known: Optional[Callable[[Post], bool]] = None, raise_on_error: bool = False) -> List[Post]:
         """
-        Scrapes and returns the list of posts for a given discipline.
+        Scrapes and returns the list of posts for a given discipline, newest first.
         :param session: The authenticated requests session.
         :param discipline: The Discipline object to scrape posts from.
+        :param is_known: Optional predicate telling whether a post is already stored. Pagination stops
+                         at the first page whose oldest post is known.
+        :param raise_on_error: Raise when a page cannot be fetched, instead of returning the posts found so far.
         :return: A list of Post objects.
         """
         raise NotImplementedError
@@ -46,6 +54,26 @@ class ScrapingService(ABC):
     def get_student_name(self, registration: str, password: str) -> str:
         raise NotImplementedError
 
+    @abstractmethod
+    def get_report_card(self, username: str, password: str) -> ReportCard:
+        """
+        Scrapes the report card page once and returns both the grades and the absences.
+        :param username: The student's username/registration.
+        :param password: The student's password.
+        :return: A ReportCard whose grades and absences are keyed by discipline name.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_report_card_with_session(self, session: requests.Session, dashboard_html: BeautifulSoup) -> ReportCard:
+        """
+        Scrapes the report card with a session that is already logged in, e.g. during a sync cycle.
+        :param session: The authenticated requests session.
+        :param dashboard_html: The BeautifulSoup object of the dashboard page.
+        :return: A ReportCard whose grades and absences are keyed by discipline name.
+        """
+        raise NotImplementedError
+
     @abstractmethod
     def get_grades(self, username: str, password: str) -> Dict[str, Dict[str, str]]:
         """
@@ -1,21 +1,155 @@
 import os
-from typing import List, Optional
+import threading
+import time
+from typing import Dict, List, Optional
 from dotenv import load_dotenv
 import psycopg2
+from psycopg2 import extensions, extras, pool
+
+
+class ConnectionPool:
+    """
+    Process-wide pool of PostgreSQL connections shared by every repository.
+    Checkouts block (up to a timeout) when all connections are busy, broken
+    connections are replaced on checkout, and the search_path is set only
+    once per physical connection.
+    """
+
+    # Connections idle for longer than this are pinged with SELECT 1 before being handed out
+    HEALTH_CHECK_IDLE_SECONDS = 30
+
+    def __init__(self, database_url: str, min_size: int, max_size: int, checkout_timeout: float):
+        self.max_size = max_size
+        self.checkout_timeout = checkout_timeout
+        self._pool = pool.ThreadedConnectionPool(min_size, max_size, database_url)
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._lock = threading.Lock()
+        self._configured: Dict[int, extensions.connection] = {}
+        self._last_used: Dict[int, float] = {}
+        self._stats = {
+            "checkouts": 0,
+            "checkout_wait_seconds_total": 0.0,
+            "checkout_wait_seconds_max": 0.0,
+            "exhausted": 0,
+            "timeouts": 0,
+            "discarded": 0,
+        }
+
+    def getconn(self) -> extensions.connection:
+        started = time.monotonic()
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._stats["exhausted"] += 1
+            if not self._slots.acquire(timeout=self.checkout_timeout):
+                with self._lock:
+                    self._stats["timeouts"] += 1
+                raise pool.PoolError(f"No database connection available after {self.checkout_timeout} seconds.")
+
+        try:
+            conn = self._checkout_healthy()
+        except Exception:
+            self._slots.release()
+            raise
+
+        waited = time.monotonic() - started
+        with self._lock:
+            self._stats["checkouts"] += 1
+            self._stats["checkout_wait_seconds_total"] += waited
+            self._stats["checkout_wait_seconds_max"] = max(self._stats["checkout_wait_seconds_max"], waited)
+        return conn
+
+    def putconn(self, conn: extensions.connection, close: bool = False):
+        key = id(conn)
+        if close or conn.closed:
+            self._forget(conn)
+        else:
+            self._last_used[key] = time.monotonic()
+        try:
+            self._pool.putconn(conn, close=close or bool(conn.closed))
+        finally:
+            self._slots.release()
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            stats = dict(self._stats)
+        stats["max_size"] = self.max_size
+        return stats
+
+    def _checkout_healthy(self) -> extensions.connection:
+        # At most max_size + 1 attempts: every stale connection in the pool can be replaced once.
+        for _ in range(self.max_size + 1):
+            conn = self._pool.getconn()
+            if self._is_healthy(conn):
+                self._configure(conn)
+                return conn
+            with self._lock:
+                self._stats["discarded"] += 1
+            self._forget(conn)
+            self._pool.putconn(conn, close=True)
+        raise psycopg2.OperationalError("Could not obtain a healthy database connection from the pool.")
+
+    def _is_healthy(self, conn: extensions.connection) -> bool:
+        if conn.closed:
+            return False
+        if conn.info.transaction_status == extensions.TRANSACTION_STATUS_UNKNOWN:
+            return False
+        idle_since = self._last_used.get(id(conn))
+        if idle_since is not None and time.monotonic() - idle_since > self.HEALTH_CHECK_IDLE_SECONDS:
+            try:
+                with conn.cursor() as cur:
+                    cur.execute('SELECT 1')
+                conn.rollback()
+            except psycopg2.Error:
+                return False
+        return True
+
+    def _configure(self, conn: extensions.connection):
+        key = id(conn)
+        if self._configured.get(key) is conn:
+            return
+        with conn.cursor() as cur:
+            cur.execute('SET search_path TO "MyBlogAlerts"')
+        conn.commit()
+        self._configured[key] = conn
+
+    def _forget(self, conn: extensions.connection):
+        key = id(conn)
+        if self._configured.get(key) is conn:
+            del self._configured[key]
+        self._last_used.pop(key, None)
+
+
+_pool: Optional[ConnectionPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    """Returns the process-wide pool, creating it on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                load_dotenv()
+                _pool = ConnectionPool(
+                    database_url=os.getenv('DATABASE_URL'),
+                    min_size=int(os.getenv('DB_POOL_MIN_SIZE', '1')),
+                    max_size=int(os.getenv('DB_POOL_MAX_SIZE', '10')),
+                    checkout_timeout=float(os.getenv('DB_POOL_TIMEOUT_SECONDS', '30'))
+                )
+    return _pool
 
 
 class Connection:
     def __init__(self):
-        load_dotenv()
-        self.database_url = os.getenv('DATABASE_URL')
+        self.pool = None
         self.conn = None
         self.cur = None
 
     def __enter__(self):
         try:
-            self.conn = psycopg2.connect(self.database_url)
+            self.pool = get_pool()
+            self.conn = self.pool.getconn()
             self.cur = self.conn.cursor()
-            self.cur.execute('SET search_path TO "MyBlogAlerts"')
             return self
         except psycopg2.OperationalError as e:
             error_message = str(e)
@@ -24,21 +158,47 @@ class Connection:
             raise e
 
     def __exit__(self, exc_type, exc_val, exc_tb):
+        broken = False
         if self.conn:
-            if exc_type:
-                self.conn.rollback()
-                print("Transaction rolled back due to an exception.")
-            else:
-                self.conn.commit()
-        if self.cur:
-            self.cur.close()
-        if self.conn:
-            self.conn.close()
+            try:
+                if exc_type:
+                    self.conn.rollback()
+                    print("Transaction rolled back due to an exception.")
+                else:
+                    self.conn.commit()
+            except psycopg2.Error as e:
+                print(f"Failed to finish transaction: {e}")
+                broken = True
+                if not exc_type:
+                    raise
+            finally:
+                broken = broken or (exc_type is not None and issubclass(exc_type, (psycopg2.OperationalError,
+                                                                                    psycopg2.InterfaceError)))
+                if self.cur and not self.cur.closed:
+                    self.cur.close()
+                self.pool.putconn(self.conn, close=broken)
+
+    @staticmethod
+    def pool_stats() -> Dict[str, float]:
+        """Returns the checkout counters of the process-wide pool."""
+        return get_pool().stats()
 
     def run_query(self, query: str, values: Optional[tuple] = None):
         if self.cur:
             self.cur.execute(query, values)
 
+    def run_batch(self, query: str, values: List[tuple], template: Optional[str] = None,
+                  fetch: bool = False, page_size: int = 500) -> List[tuple]:
+        """
+        Runs a statement with a single "VALUES %s" placeholder for many rows at once
+        (multi-row VALUES through psycopg2.extras.execute_values).
+        Returns the rows produced by RETURNING when fetch is True.
+        """
+        if not self.cur or not values:
+            return []
+        result = extras.execute_values(self.cur, query, values, template=template, page_size=page_size, fetch=fetch)
+        return result or []
+
     def catch_one(self) -> Optional[tuple]:
         if self.cur:
             return self.cur.fetchone()
@@ -6,9 +6,22 @@ import psycopg2
 
 
 class DisciplinePgRepository(DisciplineRepository):
+    def ensure_schema(self) -> None:
+        """
+        Adds the Baselined column if it is missing. Rows that existed before it were crawled
+        without baseline mode, so they count as baselined; new rows are inserted with their own flag.
+        """
+        query = 'ALTER TABLE discipline ADD COLUMN IF NOT EXISTS "Baselined" BOOLEAN NOT NULL DEFAULT TRUE;'
+        try:
+            with Connection() as db:
+                db.run_query(query)
+        except Exception as e:
+            print(f"Failed to add the Baselined column to the discipline table: {e}")
+            raise e
+
     def save(self, discipline: Discipline) -> Discipline:
-        query = 'INSERT INTO discipline ("Name", "Id_Cripto") VALUES (%s, %s) RETURNING "idDiscipline";'
-        values = (discipline.name, discipline.id_cripto)
+        query = 'INSERT INTO discipline ("Name", "Id_Cripto", "Baselined") VALUES (%s, %s, %s) RETURNING "idDiscipline";'
+        values = (discipline.name, discipline.id_cripto, discipline.baselined)
         try:
             with Connection() as db:
                 db.run_query(query, values)
@@ -19,8 +32,30 @@ class DisciplinePgRepository(DisciplineRepository):
             print(f"Failed to save discipline: {e}")
             raise e
 
+    def save_many(self, disciplines: List[Discipline]) -> List[Discipline]:
+        if not disciplines:
+            return []
+        query = 'INSERT INTO discipline ("Name", "Id_Cripto", "Baselined") VALUES %s RETURNING "idDiscipline", "Name", "Id_Cripto";'
+        values = [(discipline.name, discipline.id_cripto, discipline.baselined) for discipline in disciplines]
+        try:
+            with Connection() as db:
+                rows = db.run_batch(query, values, fetch=True)
+            # RETURNING order is not guaranteed, so the new IDs are matched back by (name, id_cripto)
+            ids_by_key = {(row[1], row[2]): row[0] for row in rows}
+            saved = []
+            for discipline in disciplines:
+                discipline.id_discipline = ids_by_key.get((discipline.name, discipline.id_cripto))
+                if discipline.id_discipline is None:
+                    print(f"Discipline '{discipline.name}' was not returned by the insert. Skipping it.")
+                else:
+                    saved.append(discipline)
+            return saved
+        except Exception as e:
+            print(f"Failed to save {len(disciplines)} disciplines: {e}")
+            raise e
+
     def get_all(self) -> Optional[List[Discipline]]:
-        query = 'SELECT "idDiscipline", "Name", "Id_Cripto" FROM discipline'
+        query = 'SELECT "idDiscipline", "Name", "Id_Cripto", "Baselined" FROM discipline'
         disciplines = []
         try:
             with Connection() as db:
@@ -28,18 +63,30 @@ class DisciplinePgRepository(DisciplineRepository):
                 resp = db.catch_all()
 
             if not resp:
-                return None
+                return []  # An empty table, not a failed query
 
             for row in resp:
-                disciplines.append(Discipline(id_discipline=row[0], name=row[1], id_cripto=row[2]))
+                disciplines.append(Discipline(id_discipline=row[0], name=row[1], id_cripto=row[2], baselined=row[3]))
 
         except psycopg2.OperationalError as e:
             print(f"\tDB Error while fetching disciplines: {e}. Returning None.")
             return None
         return disciplines
 
+    def get_since(self, last_id: int) -> Optional[List[Discipline]]:
+        query = 'SELECT "idDiscipline", "Name", "Id_Cripto", "Baselined" FROM discipline WHERE "idDiscipline" > %s ORDER BY "idDiscipline"'
+        try:
+            with Connection() as db:
+                db.run_query(query, (last_id,))
+                resp = db.catch_all()
+
+            return [Discipline(id_discipline=row[0], name=row[1], id_cripto=row[2], baselined=row[3]) for row in resp]
+        except psycopg2.OperationalError as e:
+            print(f"\tDB Error while fetching new disciplines: {e}. Returning None.")
+            return None
+
     def get_by_id(self, discipline_id: int) -> Optional[Discipline]:
-        query = 'SELECT "idDiscipline", "Name", "Id_Cripto" FROM discipline WHERE "idDiscipline" = %s;'
+        query = 'SELECT "idDiscipline", "Name", "Id_Cripto", "Baselined" FROM discipline WHERE "idDiscipline" = %s;'
         try:
             with Connection() as db:
                 db.run_query(query, (discipline_id,))
@@ -48,13 +95,13 @@ class DisciplinePgRepository(DisciplineRepository):
             if not resp:
                 return None
 
-            return Discipline(id_discipline=resp[0], name=resp[1], id_cripto=resp[2])
+            return Discipline(id_discipline=resp[0], name=resp[1], id_cripto=resp[2], baselined=resp[3])
         except psycopg2.OperationalError as e:
             print(f"\tDB Error while fetching discipline by ID: {e}. Returning None.")
             return None
 
     def find_by_name_and_id_cripto(self, name: str, id_cripto: str) -> Optional[Discipline]:
-        query = 'SELECT "idDiscipline", "Name", "Id_Cripto" FROM discipline WHERE "Name" = %s AND "Id_Cripto" = %s;'
+        query = 'SELECT "idDiscipline", "Name", "Id_Cripto", "Baselined" FROM discipline WHERE "Name" = %s AND "Id_Cripto" = %s;'
         try:
             with Connection() as db:
                 db.run_query(query, (name, id_cripto))
@@ -63,11 +110,22 @@ class DisciplinePgRepository(DisciplineRepository):
             if not resp:
                 return None
 
-            return Discipline(id_discipline=resp[0], name=resp[1], id_cripto=resp[2])
+            return Discipline(id_discipline=resp[0], name=resp[1], id_cripto=resp[2], baselined=resp[3])
         except psycopg2.OperationalError as e:
             print(f"\tDB Error while finding discipline: {e}. Returning None.")
             return None
 
+    def mark_baselined_many(self, discipline_ids: List[int]) -> None:
+        if not discipline_ids:
+            return
+        query = 'UPDATE discipline SET "Baselined" = TRUE WHERE "idDiscipline" = ANY(%s);'
+        try:
+            with Connection() as db:
+                db.run_query(query, (list(discipline_ids),))
+        except Exception as e:
+            print(f"Failed to mark {len(discipline_ids)} disciplines as baselined: {e}")
+            raise e
+
     def change_name(self, discipline_id: int, name: str) -> None:
         query = 'UPDATE discipline SET "Name" = %s WHERE "idDiscipline" = %s;'
         try:
@@ -0,0 +1,138 @@
+import base64
+import hashlib
+import hmac
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+from cryptography.fernet import Fernet
+
+
+def _decrypt_chunk(key: bytes, values: List[str]) -> List[Optional[str]]:
+    """Runs in a worker process. Values that cannot be decrypted come back as None."""
+    fernet = Fernet(key)
+    result = []
+    for value in values:
+        try:
+            result.append(fernet.decrypt(base64.urlsafe_b64decode(value.encode("utf-8"))).decode("utf-8"))
+        except Exception:
+            result.append(None)
+    return result
+
+
+class FieldCipher:
+    """
+    Encrypts and decrypts the student columns (Fernet, stored base64 encoded).
+
+    A Fernet token always decrypts to the same plaintext, so decrypted values are
+    cached by ciphertext: rows that did not change since the last load are never
+    decrypted again. Cold loads with many uncached values are split across a
+    process pool, since Fernet decryption is CPU bound and holds the GIL.
+
+    Fernet ciphertext is randomized, so the database cannot compare it. Columns that
+    are looked up by value also store a blind index: a keyed HMAC of the plaintext.
+    """
+
+    def __init__(self, key: str, cache_size: int = 50000, workers: int = 0, parallel_threshold: int = 8000,
+                 index_key: Optional[str] = None):
+        self._key = key.encode("utf-8") if isinstance(key, str) else key
+        self.fernet = Fernet(self._key)
+        # Without a dedicated key, the index key is derived from the encryption key (never used as is)
+        if index_key:
+            self._index_key = index_key.encode("utf-8")
+        else:
+            self._index_key = hmac.new(self._key, b"blind-index", hashlib.sha256).digest()
+        self._column_keys: Dict[str, bytes] = {}
+        self.cache_size = cache_size
+        # 0 uses one worker per CPU; 1 disables the process pool
+        self.workers = workers or os.cpu_count() or 1
+        self.parallel_threshold = parallel_threshold
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+
+    def encrypt(self, value: str) -> str:
+        return base64.urlsafe_b64encode(self.fernet.encrypt(value.encode("utf-8"))).decode("utf-8")
+
+    def blind_index(self, column: str, value: str) -> str:
+        """
+        HMAC-SHA256 of the value (surrounding whitespace removed), as 64 hex characters.
+        Every column gets its own derived key, so equal values in different columns never match.
+        """
+        column_key = self._column_keys.get(column)
+        if column_key is None:
+            column_key = hmac.new(self._index_key, column.encode("utf-8"), hashlib.sha256).digest()
+            self._column_keys[column] = column_key
+        return hmac.new(column_key, value.strip().encode("utf-8"), hashlib.sha256).hexdigest()
+
+    def decrypt(self, value: str) -> str:
+        """Decrypts one value. Raises if it is not a valid token for this key."""
+        with self._lock:
+            cached = self._cache.get(value)
+            if cached is not None:
+                self._cache.move_to_end(value)
+                return cached
+        plaintext = self.fernet.decrypt(base64.urlsafe_b64decode(value.encode("utf-8"))).decode("utf-8")
+        self._remember({value: plaintext})
+        return plaintext
+
+    def decrypt_many(self, values: List[str]) -> List[Optional[str]]:
+        """Decrypts values in order. Values that cannot be decrypted come back as None."""
+        decrypted: dict = {}
+        with self._lock:
+            for value in values:
+                cached = self._cache.get(value)
+                if cached is not None:
+                    self._cache.move_to_end(value)
+                    decrypted[value] = cached
+        missing = list(dict.fromkeys(value for value in values if value not in decrypted))
+
+        if missing:
+            if self.workers > 1 and len(missing) >= self.parallel_threshold:
+                chunk_size = -(-len(missing) // self.workers)
+                chunks = [missing[i:i + chunk_size] for i in range(0, len(missing), chunk_size)]
+                executor = self._get_pool()
+                plaintexts = [p for chunk in executor.map(_decrypt_chunk, [self._key] * len(chunks), chunks)
+                              for p in chunk]
+            else:
+                plaintexts = _decrypt_chunk(self._key, missing)
+            fresh = {value: plaintext for value, plaintext in zip(missing, plaintexts) if plaintext is not None}
+            self._remember(fresh)
+            decrypted.update(fresh)
+
+        return [decrypted.get(value) for value in values]
+
+    def shutdown(self):
+        """Stops the worker processes, if any were started."""
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown()
+
+    def cache_info(self) -> dict:
+        with self._lock:
+            return {"size": len(self._cache), "max_size": self.cache_size}
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        """
+        The worker processes are started once and reused. They are never forked from this process:
+        the crawler, dispatcher and relay threads may hold locks that a forked child would inherit locked.
+        """
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    methods = multiprocessing.get_all_start_methods()
+                    context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+                    self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+        return self._pool
+
+    def _remember(self, plaintexts: dict):
+        if self.cache_size <= 0:
+            return
+        with self._lock:
+            self._cache.update(plaintexts)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
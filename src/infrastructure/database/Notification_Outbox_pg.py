@@ -0,0 +1,116 @@
+from typing import List
+
+import psycopg2
+
+from src.domain.models.Notification import Notification
+from src.domain.models.Post import Post
+from src.domain.repositories.Notification_Outbox_Repository import NotificationOutboxRepository
+from src.infrastructure.database.Connection import Connection
+from src.infrastructure.database.Post_pg import INSERT_POSTS_QUERY, post_values
+
+
+class NotificationOutboxPgRepository(NotificationOutboxRepository):
+    """
+    Stores pending WhatsApp messages in the notification_outbox table. The phone number
+    is not copied into the outbox (it is encrypted in the student table); it is resolved
+    from the student at delivery time.
+    """
+
+    def ensure_table(self) -> None:
+        query = """
+            CREATE TABLE IF NOT EXISTS notification_outbox (
+                "idNotification" BIGINT PRIMARY KEY GENERATED ALWAYS AS IDENTITY,
+                "Post_Url" VARCHAR NOT NULL,
+                "Post_Date" DATE NOT NULL,
+                "Student_id" INTEGER NOT NULL REFERENCES student ("idStudent") ON DELETE CASCADE,
+                "Message" VARCHAR NOT NULL,
+                "Status" VARCHAR(10) NOT NULL DEFAULT 'pending',
+                "Attempts" INTEGER NOT NULL DEFAULT 0,
+                "Last_Error" VARCHAR,
+                "Claimed_Until" TIMESTAMPTZ,
+                "Created_At" TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+                "Sent_At" TIMESTAMPTZ,
+                CONSTRAINT UQ_Notification UNIQUE ("Post_Url", "Post_Date", "Student_id")
+            );
+            CREATE INDEX IF NOT EXISTS IX_Notification_Pending
+                ON notification_outbox ("idNotification") WHERE "Status" = 'pending';
+        """
+        try:
+            with Connection() as db:
+                db.run_query(query)
+        except Exception as e:
+            print(f"Failed to create the notification outbox table: {e}")
+            raise e
+
+    def save_posts_with_notifications(self, posts: List[Post], notifications: List[Notification]) -> None:
+        if not posts and not notifications:
+            return
+        # The join skips students deleted while the cycle was running, instead of failing the whole transaction
+        query = """
+            INSERT INTO notification_outbox ("Post_Url", "Post_Date", "Student_id", "Message")
+            SELECT v.post_url, v.post_date::date, v.student_id, v.message
+            FROM (VALUES %s) AS v(post_url, post_date, student_id, message)
+            JOIN student s ON s."idStudent" = v.student_id
+            ON CONFLICT ("Post_Url", "Post_Date", "Student_id") DO NOTHING
+        """
+        values = [(n.post_url, n.post_date.strftime('%Y-%m-%d'), n.student_id, n.message) for n in notifications]
+        try:
+            # A single Connection is a single transaction: either the posts and their messages are both stored or neither is.
+            with Connection() as db:
+                db.run_batch(INSERT_POSTS_QUERY, [post_values(post) for post in posts])
+                db.run_batch(query, values)
+        except Exception as e:
+            # The caller already holds the posts as known: it has to learn they were not stored
+            print(f"Failed to save {len(posts)} posts with {len(notifications)} notifications: {e}")
+            raise e
+
+    def claim_pending(self, limit: int, lease_seconds: float) -> List[Notification]:
+        query = """
+            UPDATE notification_outbox SET "Claimed_Until" = NOW() + make_interval(secs => %s)
+            WHERE "idNotification" IN (
+                SELECT "idNotification" FROM notification_outbox
+                WHERE "Status" = 'pending' AND ("Claimed_Until" IS NULL OR "Claimed_Until" < NOW())
+                ORDER BY "idNotification"
+                LIMIT %s
+                FOR UPDATE SKIP LOCKED
+            )
+            RETURNING "idNotification", "Post_Url", "Post_Date", "Student_id", "Message", "Attempts"
+        """
+        try:
+            with Connection() as db:
+                db.run_query(query, (lease_seconds, limit))
+                resp = db.catch_all()
+        except psycopg2.OperationalError as e:
+            print(f"\tDB Error while claiming pending notifications: {e}. Returning empty list.")
+            return []
+
+        notifications = [Notification(post_url=row[1], post_date=row[2], student_id=row[3], message=row[4],
+                                      attempts=row[5], id_notification=row[0]) for row in resp]
+        notifications.sort(key=lambda n: n.id_notification)
+        return notifications
+
+    def mark_sent(self, notification_id: int) -> None:
+        query = """
+            UPDATE notification_outbox SET "Status" = 'sent', "Sent_At" = NOW(), "Claimed_Until" = NULL
+            WHERE "idNotification" = %s
+        """
+        try:
+            with Connection() as db:
+                db.run_query(query, (notification_id,))
+        except Exception as e:
+            print(f"Failed to mark notification {notification_id} as sent: {e}")
+
+    def mark_failed(self, notification_id: int, error: str, max_attempts: int) -> None:
+        query = """
+            UPDATE notification_outbox
+            SET "Attempts" = "Attempts" + 1,
+                "Last_Error" = %s,
+                "Claimed_Until" = NULL,
+                "Status" = CASE WHEN "Attempts" + 1 >= %s THEN 'failed' ELSE 'pending' END
+            WHERE "idNotification" = %s
+        """
+        try:
+            with Connection() as db:
+                db.run_query(query, (error[:500], max_attempts, notification_id))
+        except Exception as e:
+            print(f"Failed to record the failure of notification {notification_id}: {e}")
@@ -8,6 +8,13 @@ from src.domain.repositories.Post_Repository import PostRepository
 from src.infrastructure.database.Connection import Connection
 
 
+INSERT_POSTS_QUERY = 'INSERT INTO post ("Post_Date", "Post_Url", "Discipline_id", "Text_Content") VALUES %s ON CONFLICT DO NOTHING'
+
+
+def post_values(post: Post) -> tuple:
+    return post.post_date.strftime('%Y-%m-%d'), post.post_url, post.discipline_id, post.content
+
+
 class PostPgRepository(PostRepository):
 
     def save(self, post: Post) -> None:
@@ -20,6 +27,17 @@ class PostPgRepository(PostRepository):
         except Exception as e:
             print(f"Failed to save post: {e}")
 
+    def save_many(self, posts: List[Post]) -> None:
+        if not posts:
+            return
+        values = [post_values(post) for post in posts]
+        try:
+            with Connection() as db:
+                db.run_batch(INSERT_POSTS_QUERY, values)
+        except Exception as e:
+            print(f"Failed to save {len(posts)} posts: {e}")
+            raise e
+
     def find_by_url_and_date(self, url: str, post_date: date) -> Optional[Post]:
         query = 'SELECT "idPost", "Post_Date", "Post_Url", "Discipline_id", "Text_Content" FROM post WHERE "Post_Url" = %s AND "Post_Date" = %s'
         try:
@@ -45,7 +63,7 @@ class PostPgRepository(PostRepository):
                 resp = db.catch_all()
 
             if not resp:
-                return None
+                return []  # An empty table, not a failed query
 
             for row in resp:
                 posts.append(Post(id_post=row[0], post_date=row[1], post_url=row[2], discipline_id=row[3], content=row[4]))
@@ -55,6 +73,19 @@ class PostPgRepository(PostRepository):
             return None
         return posts
 
+    def get_since(self, last_id: int) -> Optional[List[Post]]:
+        query = 'SELECT "idPost", "Post_Date", "Post_Url", "Discipline_id", "Text_Content" FROM post WHERE "idPost" > %s ORDER BY "idPost"'
+        try:
+            with Connection() as db:
+                db.run_query(query, (last_id,))
+                resp = db.catch_all()
+
+            return [Post(id_post=row[0], post_date=row[1], post_url=row[2], discipline_id=row[3], content=row[4])
+                    for row in resp]
+        except psycopg2.OperationalError as e:
+            print(f"\tDB Error while fetching new posts: {e}. Returning None.")
+            return None
+
     def change_post_date(self, post_id: int, new_date: date) -> None:
         query = 'UPDATE post SET "Post_Date" = %s WHERE "idPost" = %s;'
         try:
@@ -19,6 +19,32 @@ class StudentDisciplinePgRepository(StudentDisciplineRepository):
         except Exception as e:
             print(f"Failed to save student-discipline association: {e}")
 
+    def save_many(self, student_disciplines: List[StudentDiscipline]) -> None:
+        if not student_disciplines:
+            return
+        query = 'INSERT INTO student_discipline ("Student_idStudent", "Discipline_idDiscipline") VALUES %s ON CONFLICT DO NOTHING'
+        values = [(sd.id_student, sd.id_discipline) for sd in student_disciplines]
+        try:
+            with Connection() as db:
+                db.run_batch(query, values)
+        except Exception as e:
+            print(f"Failed to save {len(student_disciplines)} student-discipline associations: {e}")
+
+    def delete_many(self, student_disciplines: List[StudentDiscipline]) -> None:
+        if not student_disciplines:
+            return
+        query = """
+            DELETE FROM student_discipline sd
+            USING (VALUES %s) AS d(student_id, discipline_id)
+            WHERE sd."Student_idStudent" = d.student_id AND sd."Discipline_idDiscipline" = d.discipline_id
+        """
+        values = [(sd.id_student, sd.id_discipline) for sd in student_disciplines]
+        try:
+            with Connection() as db:
+                db.run_batch(query, values)
+        except Exception as e:
+            print(f"Failed to delete {len(student_disciplines)} student-discipline associations: {e}")
+
     def exists(self, student_id: int, discipline_id: int) -> bool:
         query = 'SELECT 1 FROM student_discipline WHERE "Student_idStudent" = %s AND "Discipline_idDiscipline" = %s'
         try:
@@ -31,7 +57,7 @@ class StudentDisciplinePgRepository(StudentDisciplineRepository):
 
     def get_disciplines_by_student_id(self, student_id: int) -> Optional[List[Discipline]]:
         query = """
-            SELECT d."idDiscipline", d."Name", d."Id_Cripto"
+            SELECT d."idDiscipline", d."Name", d."Id_Cripto", d."Baselined"
             FROM discipline d
             JOIN student_discipline sd ON d."idDiscipline" = sd."Discipline_idDiscipline"
             WHERE sd."Student_idStudent" = %s
@@ -46,7 +72,7 @@ class StudentDisciplinePgRepository(StudentDisciplineRepository):
                 return None
 
             for row in resp:
-                disciplines.append(Discipline(id_discipline=row[0], name=row[1], id_cripto=row[2]))
+                disciplines.append(Discipline(id_discipline=row[0], name=row[1], id_cripto=row[2], baselined=row[3]))
 
         except psycopg2.OperationalError as e:
             print(f"\tDB Error while fetching disciplines for student {student_id}: {e}.")
@@ -62,7 +88,7 @@ class StudentDisciplinePgRepository(StudentDisciplineRepository):
                 resp = db.catch_all()
 
             if not resp:
-                return None
+                return []  # An empty table, not a failed query
 
             for row in resp:
                 associations.append(StudentDiscipline(id_student=row[0], id_discipline=row[1]))
@@ -1,23 +1,123 @@
-from typing import List, Optional
+from typing import List, Optional, Set
 from src.domain.repositories.Student_Repository import StudentRepository
 from src.domain.models.Student import Student
 from src.infrastructure.database.Connection import Connection
+from src.infrastructure.database.Field_Cipher import FieldCipher
 import os
 from dotenv import load_dotenv
-from cryptography.fernet import Fernet
-import base64
 import psycopg2
 
 from src.application.services.InMemory_Store import InMemoryStore
 
+# Blind-index columns: keyed HMACs of the plaintext, so lookups by value are a single indexed SELECT
+PHONE_INDEX_COLUMN = "Phone_Index"
+REGISTRATION_INDEX_COLUMN = "Registration_Index"
+SELECT_STUDENT_COLUMNS = 'SELECT "idStudent", "Phone_Number", "Password", "Name", "Registration" FROM student'
+
 
 class StudentPgRepository(StudentRepository):
 
     def __init__(self, in_memory_store: InMemoryStore):
         load_dotenv()
-        self.SECRET_KEY = Fernet(os.getenv("WEB_SCRAPER_SECRET_KEY"))
+        # Decrypted columns are cached by ciphertext, so a full sync only decrypts new or changed rows
+        self.cipher = FieldCipher(
+            os.getenv("WEB_SCRAPER_SECRET_KEY"),
+            cache_size=int(os.getenv("STUDENT_DECRYPT_CACHE_SIZE", "50000")),
+            workers=int(os.getenv("STUDENT_DECRYPT_WORKERS", "0")),
+            parallel_threshold=int(os.getenv("STUDENT_DECRYPT_PARALLEL_THRESHOLD", "8000")),
+            index_key=os.getenv("BLIND_INDEX_KEY")
+        )
         self.store = in_memory_store
 
+    def ensure_schema(self) -> None:
+        """
+        Adds the blind-index columns and their unique indexes if they are missing,
+        then fills them in for the rows that do not have them yet.
+        """
+        query = f"""
+            ALTER TABLE student ADD COLUMN IF NOT EXISTS "{PHONE_INDEX_COLUMN}" CHAR(64);
+            ALTER TABLE student ADD COLUMN IF NOT EXISTS "{REGISTRATION_INDEX_COLUMN}" CHAR(64);
+            CREATE UNIQUE INDEX IF NOT EXISTS UQ_Student_Phone_Index ON student ("{PHONE_INDEX_COLUMN}");
+            CREATE UNIQUE INDEX IF NOT EXISTS UQ_Student_Registration_Index ON student ("{REGISTRATION_INDEX_COLUMN}");
+        """
+        try:
+            with Connection() as db:
+                db.run_query(query)
+        except Exception as e:
+            print(f"Failed to add the blind-index columns to the student table: {e}")
+            raise e
+        self.backfill_blind_indexes()
+
+    def backfill_blind_indexes(self, rebuild: bool = False) -> int:
+        """
+        Computes the blind indexes of the rows that have none (every row when rebuild is True,
+        e.g. after changing BLIND_INDEX_KEY). Returns the number of rows updated.
+        """
+        condition = "" if rebuild else \
+            f' WHERE "{PHONE_INDEX_COLUMN}" IS NULL OR "{REGISTRATION_INDEX_COLUMN}" IS NULL'
+        with Connection() as db:
+            db.run_query(f'SELECT "idStudent", "Phone_Number", "Registration" FROM student{condition};')
+            rows = db.catch_all()
+        if not rows:
+            return 0
+
+        print(f"Computing blind indexes for {len(rows)} students...")
+        plaintexts = self.cipher.decrypt_many([value for row in rows for value in row[1:3]])
+        values = []
+        for i, row in enumerate(rows):
+            phone, registration = plaintexts[i * 2:i * 2 + 2]
+            if phone is None or registration is None:
+                print(f"Warning: Could not decrypt data for student ID {row[0]}. Its blind indexes were not set.")
+                continue
+            values.append((row[0], self.cipher.blind_index(PHONE_INDEX_COLUMN, phone),
+                           self.cipher.blind_index(REGISTRATION_INDEX_COLUMN, registration)))
+
+        query = f"""
+            UPDATE student SET "{PHONE_INDEX_COLUMN}" = v.phone_index, "{REGISTRATION_INDEX_COLUMN}" = v.registration_index
+            FROM (VALUES %s) AS v (id_student, phone_index, registration_index)
+            WHERE student."idStudent" = v.id_student;
+        """
+        try:
+            with Connection() as db:
+                db.run_batch(query, values)
+        except psycopg2.IntegrityError:
+            # Duplicated phone numbers or registrations: index the rows one by one and report the duplicates
+            print("Duplicated students found while computing blind indexes. Updating row by row...")
+            updated = 0
+            for value in values:
+                try:
+                    with Connection() as db:
+                        db.run_batch(query, [value])
+                    updated += 1
+                except psycopg2.IntegrityError:
+                    print(f"Warning: Student ID {value[0]} duplicates the phone number or registration of another "
+                          f"student. Its blind indexes were not set.")
+            return updated
+        print(f"Blind indexes computed for {len(values)} students.")
+        return len(values)
+
+    def _find_by_index(self, column: str, value: str) -> Optional[Student]:
+        """Looks a student up through a blind-index column. Only the matching row is decrypted."""
+        query = f'{SELECT_STUDENT_COLUMNS} WHERE "{column}" = %s;'
+        try:
+            with Connection() as db:
+                db.run_query(query, (self.cipher.blind_index(column, value),))
+                row = db.catch_one()
+        except psycopg2.Error as e:
+            print(f"\tDB Error while looking up a student by {column}: {e}. Returning None.")
+            return None
+        if not row:
+            return None
+        students = self._decrypt_rows([row])
+        return students[0] if students else None
+
+    def find_by_phone_number(self, phone_number: str) -> Optional[Student]:
+        student = self.store.get_student_by_phone(phone_number)
+        if student:
+            return student
+        print("Student not in cache. Querying database by phone index.")
+        return self._find_by_index(PHONE_INDEX_COLUMN, phone_number)
+
     def get_by_phone_number(self, phone_number: str) -> Optional[Student]:
         """
         Finds a student by their phone number from the in-memory cache.
@@ -27,7 +127,7 @@ class StudentPgRepository(StudentRepository):
         return self.store.get_student_by_phone(phone_number)
 
     def get_all(self) -> List[Student]:
-        query = 'SELECT "idStudent", "Phone_Number", "Password", "Name", "Registration" FROM student;'
+        query = f'{SELECT_STUDENT_COLUMNS};'
         students = []
         try:
             with Connection() as db:
@@ -37,26 +137,52 @@ class StudentPgRepository(StudentRepository):
             if not resp:
                 return []
 
-            for row in resp:
-                try:
-                    id_s = row[0]
-                    phone = self.SECRET_KEY.decrypt(base64.urlsafe_b64decode(row[1].encode("utf-8"))).decode("utf-8")
-                    password = self.SECRET_KEY.decrypt(base64.urlsafe_b64decode(row[2].encode("utf-8"))).decode("utf-8")
-                    name = self.SECRET_KEY.decrypt(base64.urlsafe_b64decode(row[3].encode("utf-8"))).decode("utf-8")
-                    registration = self.SECRET_KEY.decrypt(base64.urlsafe_b64decode(row[4].encode("utf-8"))).decode(
-                        "utf-8")
-                    students.append(
-                        Student(phone_number=phone, registration=registration, password=password, id_student=id_s,
-                                name=name))
-                except Exception:
-                    print(f"Warning: Could not decrypt data for student ID {row[0]}. Skipping.")
-                    continue
+            students = self._decrypt_rows(resp)
 
         except psycopg2.OperationalError as e:
             print(f"\tDB Error while fetching students: {e}. Returning empty list.")
             return []
         return students
 
+    def get_since(self, last_id: int) -> List[Student]:
+        query = 'SELECT "idStudent", "Phone_Number", "Password", "Name", "Registration" FROM student WHERE "idStudent" > %s ORDER BY "idStudent";'
+        try:
+            with Connection() as db:
+                db.run_query(query, (last_id,))
+                resp = db.catch_all()
+        except psycopg2.OperationalError as e:
+            print(f"\tDB Error while fetching new students: {e}. Returning empty list.")
+            return []
+        return self._decrypt_rows(resp)
+
+    def get_all_ids(self) -> Optional[Set[int]]:
+        query = 'SELECT "idStudent" FROM student;'
+        try:
+            with Connection() as db:
+                db.run_query(query)
+                return {row[0] for row in db.catch_all()}
+        except psycopg2.OperationalError as e:
+            print(f"\tDB Error while fetching student IDs: {e}. Returning None.")
+            return None
+
+    def _decrypt_rows(self, rows: List[tuple]) -> List[Student]:
+        """
+        Decrypts (idStudent, Phone_Number, Password, Name, Registration) rows into students.
+        All the columns are decrypted in one batch, which only decrypts values missing from the cache.
+        """
+        values = [value for row in rows for value in row[1:5]]
+        plaintexts = self.cipher.decrypt_many(values)
+        students = []
+        for i, row in enumerate(rows):
+            phone, password, name, registration = plaintexts[i * 4:i * 4 + 4]
+            if None in (phone, password, name, registration):
+                print(f"Warning: Could not decrypt data for student ID {row[0]}. Skipping.")
+                continue
+            students.append(
+                Student(phone_number=phone, registration=registration, password=password, id_student=row[0],
+                        name=name))
+        return students
+
     def get_by_id(self, student_id: int) -> Optional[Student]:
         query = 'SELECT "idStudent", "Phone_Number", "Password", "Name", "Registration" FROM student WHERE "idStudent" = %s;'
         try:
@@ -68,10 +194,10 @@ class StudentPgRepository(StudentRepository):
                 return None
 
             id_s = resp[0]
-            phone = self.SECRET_KEY.decrypt(base64.urlsafe_b64decode(resp[1].encode("utf-8"))).decode("utf-8")
-            password = self.SECRET_KEY.decrypt(base64.urlsafe_b64decode(resp[2].encode("utf-8"))).decode("utf-8")
+            phone = self.cipher.decrypt(resp[1])
+            password = self.cipher.decrypt(resp[2])
             name = resp[3]
-            registration = self.SECRET_KEY.decrypt(base64.urlsafe_b64decode(resp[4].encode("utf-8"))).decode("utf-8")
+            registration = self.cipher.decrypt(resp[4])
 
             return Student(phone_number=phone, registration=registration, password=password, id_student=id_s, name=name)
 
@@ -82,41 +208,29 @@ class StudentPgRepository(StudentRepository):
     def find_by_registration(self, registration: str) -> Optional[Student]:
         # Primeiro, checa o cache para uma busca rápida
         print(f"Searching for student with registration {registration} in cache.")
-        if self.store.students:
-            for student in self.store.students:
-                if student.registration == registration:
-                    print("Found student in cache.")
-                    return student
-
-        # Se não estiver no cache, busca no banco de dados como fallback.
-        # Nota: Isso é ineficiente devido à criptografia, mas é a única maneira com o design atual.
-        print(f"Student not in cache. Querying database for registration {registration}.")
-        all_students = self.get_all()
-        if not all_students:
-            return None
+        student = self.store.get_student_by_registration(registration)
+        if student:
+            print("Found student in cache.")
+            return student
 
-        for student in all_students:
-            if student.registration == registration:
-                print("Found student in database.")
-                # Opcional: Adicionar ao cache para futuras buscas.
-                # self.store.add_student(student)
-                return student
-
-        return None
+        # Se não estiver no cache, busca no banco pelo índice cego (um SELECT indexado, sem descriptografar a tabela)
+        print(f"Student not in cache. Querying database for registration {registration}.")
+        student = self._find_by_index(REGISTRATION_INDEX_COLUMN, registration)
+        if student:
+            print("Found student in database.")
+        return student
 
     def save(self, student: Student) -> Student:
-        name = self.SECRET_KEY.encrypt(student.name.encode('utf-8'))
-        password = self.SECRET_KEY.encrypt(student.password.encode('utf-8'))
-        registration = self.SECRET_KEY.encrypt(student.registration.encode('utf-8'))
-        phone_number = self.SECRET_KEY.encrypt(student.phone_number.encode('utf-8'))
+        name = self.cipher.encrypt(student.name)
+        password = self.cipher.encrypt(student.password)
+        registration = self.cipher.encrypt(student.registration)
+        phone_number = self.cipher.encrypt(student.phone_number)
 
-        name = base64.urlsafe_b64encode(name).decode("utf-8")
-        password = base64.urlsafe_b64encode(password).decode("utf-8")
-        registration = base64.urlsafe_b64encode(registration).decode("utf-8")
-        phone_number = base64.urlsafe_b64encode(phone_number).decode("utf-8")
-
-        query = 'INSERT INTO student ("Phone_Number", "Password", "Registration", "Name") VALUES (%s, %s, %s, %s) RETURNING "idStudent";'
-        values = (phone_number, password, registration, name)
+        query = f'''INSERT INTO student ("Phone_Number", "Password", "Registration", "Name", "{PHONE_INDEX_COLUMN}", "{REGISTRATION_INDEX_COLUMN}")
+                    VALUES (%s, %s, %s, %s, %s, %s) RETURNING "idStudent";'''
+        values = (phone_number, password, registration, name,
+                  self.cipher.blind_index(PHONE_INDEX_COLUMN, student.phone_number),
+                  self.cipher.blind_index(REGISTRATION_INDEX_COLUMN, student.registration))
 
         try:
             with Connection() as db:
@@ -126,9 +240,7 @@ class StudentPgRepository(StudentRepository):
             if new_id and new_id[0]:
                 student.id_student = new_id[0]
                 # Adiciona o novo aluno ao cache para manter a consistência
-                if self.store.students is None:
-                    self.store.students = []
-                self.store.students.append(student)
+                self.store.add_student(student)
                 print(f"Student {student.name} saved to DB with ID {student.id_student} and added to cache.")
                 return student
             else:
@@ -138,16 +250,16 @@ class StudentPgRepository(StudentRepository):
             raise e
 
     def change_number(self, student_id: int, new_phone: str) -> None:
-        phone_number = base64.urlsafe_b64encode(self.SECRET_KEY.encrypt(new_phone.encode('utf-8'))).decode("utf-8")
-        query = 'UPDATE student SET "Phone_Number" = %s WHERE "idStudent" = %s;'
+        phone_number = self.cipher.encrypt(new_phone)
+        query = f'UPDATE student SET "Phone_Number" = %s, "{PHONE_INDEX_COLUMN}" = %s WHERE "idStudent" = %s;'
         try:
             with Connection() as db:
-                db.run_query(query, (phone_number, student_id))
+                db.run_query(query, (phone_number, self.cipher.blind_index(PHONE_INDEX_COLUMN, new_phone), student_id))
         except Exception as e:
             print(f"Failed to change phone number: {e}")
 
     def change_password(self, student_id: int, password: str) -> None:
-        password_enc = base64.urlsafe_b64encode(self.SECRET_KEY.encrypt(password.encode('utf-8'))).decode("utf-8")
+        password_enc = self.cipher.encrypt(password)
         query = 'UPDATE student SET "Password" = %s WHERE "idStudent" = %s;'
         try:
             with Connection() as db:
@@ -156,12 +268,12 @@ class StudentPgRepository(StudentRepository):
             print(f"Failed to change password: {e}")
 
     def change_registration(self, student_id: int, registration: str) -> None:
-        registration_enc = base64.urlsafe_b64encode(self.SECRET_KEY.encrypt(registration.encode('utf-8'))).decode(
-            "utf-8")
-        query = 'UPDATE student SET "Registration" = %s WHERE "idStudent" = %s;'
+        registration_enc = self.cipher.encrypt(registration)
+        query = f'UPDATE student SET "Registration" = %s, "{REGISTRATION_INDEX_COLUMN}" = %s WHERE "idStudent" = %s;'
         try:
             with Connection() as db:
-                db.run_query(query, (registration_enc, student_id))
+                db.run_query(query, (registration_enc, self.cipher.blind_index(REGISTRATION_INDEX_COLUMN, registration),
+                                     student_id))
         except Exception as e:
             print(f"Failed to change registration: {e}")
 
@@ -176,16 +288,10 @@ class StudentPgRepository(StudentRepository):
     def delete(self, student_id: int) -> None:
         query = 'DELETE FROM student WHERE "idStudent" = %s;'
         try:
-            student_to_delete = self.get_by_id(student_id)
-
             with Connection() as db:
                 db.run_query(query, (student_id,))
 
-            if student_to_delete:
-                if self.store.students:
-                    self.store.students = [s for s in self.store.students if s.id_student != student_id]
-                if student_to_delete.phone_number in self.store._students_by_phone:
-                    del self.store._students_by_phone[student_to_delete.phone_number]
+            self.store.remove_student(student_id)
 
             print(f"Student with ID {student_id} deleted from DB and cache.")
         except Exception as e:
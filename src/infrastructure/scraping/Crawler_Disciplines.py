@@ -5,19 +5,59 @@ from urllib.parse import parse_qs, unquote_plus
 from bs4 import BeautifulSoup
 from src.domain.models.Discipline import Discipline
 from src.infrastructure.scraping.Scraping_Login import ScrapingLogin
+from src.infrastructure.scraping.Utils import Utils
 
 
 class CrawlerDisciplines:
-    def __init__(self, login_handler: ScrapingLogin):
+    def __init__(self, login_handler: ScrapingLogin, use_json: bool = True):
         self.login_handler = login_handler  # Still needed for URL base
+        # The JSON endpoint is used until it disagrees with the dashboard cards (checked once)
+        self.use_json = use_json
+        self._json_verified = False
 
     def get_disciplines(self, session: requests.Session, dashboard_html: BeautifulSoup) -> List[Discipline]:
         """
-        Parses the dashboard HTML to extract the student's disciplines.
+        Returns the student's disciplines for the current semester, from the GetSujectList JSON
+        endpoint when possible and from the dashboard cards otherwise.
         """
+        if self.use_json:
+            disciplines = self._fetch_disciplines_json(session)
+            if disciplines:
+                if self._json_verified:
+                    return disciplines
+                if self._agrees_with_dashboard(disciplines, dashboard_html):
+                    self._json_verified = True
+                    return disciplines
         # No need to fetch page again, dashboard_html is provided
         return self._parse_disciplines(dashboard_html)
 
+    def _fetch_disciplines_json(self, session: requests.Session) -> Optional[List[Discipline]]:
+        """None when the endpoint fails or its shape changed; the caller falls back to the dashboard."""
+        year, semester = Utils.catch_year_semester()
+        try:
+            resp = session.get(self.login_handler.url_disciplines.format(year, semester), timeout=10)
+            resp.raise_for_status()
+            return Utils.constructor_disciplines(resp)
+        except requests.exceptions.RequestException as e:
+            print(f"Could not fetch the discipline list: {e}. Using the dashboard.")
+        except (ValueError, KeyError, TypeError) as e:
+            print(f"Unexpected discipline list format ({e!r}). Using the dashboard.")
+        return None
+
+    def _agrees_with_dashboard(self, disciplines: List[Discipline], dashboard_html: Optional[BeautifulSoup]) -> bool:
+        """
+        Disciplines are stored by name and id_cripto, so the JSON must give exactly what the
+        dashboard gives. On a mismatch the JSON endpoint is turned off for good.
+        """
+        if dashboard_html is None:
+            return False
+        from_dashboard = {(d.name, d.id_cripto) for d in self._parse_disciplines(dashboard_html)}
+        if from_dashboard == {(d.name, d.id_cripto) for d in disciplines}:
+            return True
+        print("The discipline list endpoint disagrees with the dashboard. Using the dashboard from now on.")
+        self.use_json = False
+        return False
+
     def _parse_disciplines(self, soup: BeautifulSoup) -> List[Discipline]:
         """
         Parses the BeautifulSoup object to extract discipline information.
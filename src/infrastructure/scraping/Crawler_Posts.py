@@ -1,8 +1,10 @@
+import threading
 import time
-from typing import List
-from bs4 import BeautifulSoup
-from src.domain.models import Post
+from typing import Callable, Dict, List, Optional
+from src.application.services.Metrics import get_metrics
+from src.domain.models.Post import Post
 from src.domain.models.Discipline import Discipline
+from src.infrastructure.scraping.Html_Parser import POSTS_STRAINER, parse_html
 from src.infrastructure.scraping.Scraping_Login import ScrapingLogin
 from src.infrastructure.scraping.Utils import Utils
 import requests
@@ -11,52 +13,202 @@ import requests
 # Constants for retry logic
 MAX_PAGES_TO_SCRAPE = 50
 MAX_RETRIES = 3
-RETRY_DELAY_SECONDS = 5
+RETRY_BACKOFF_SECONDS = 2  # Doubled after every failed attempt; request pacing itself is done by the rate limiter
 REQUEST_TIMEOUT_SECONDS = 10
 
+# The page size of the portal's own "load more" button, always accepted
+LEGACY_PAGE_SIZE = 3
+# Same depth as MAX_PAGES_TO_SCRAPE pages of the legacy size, whatever the page size
+MAX_POSTS_TO_SCRAPE = MAX_PAGES_TO_SCRAPE * LEGACY_PAGE_SIZE
+# Only these answers say the page size itself is refused; 401/403/404/429 are ordinary failures
+PAGE_SIZE_REJECTION_STATUSES = {400, 413, 422}
+# Full pages fetched below the configured size before a larger size is tried again
+PAGE_SIZE_REPROBE_PAGES = 500
+
+
+class _PageSizeChanged(Exception):
+    """The negotiated page size changed during a crawl; the discipline is crawled again from the start."""
+
+
+class PageSizeNegotiator:
+    """
+    Blog page size agreed with the portal, shared by every crawler and session of the process:
+
+    - A 400/413/422 answer to a larger page halves the page size (down to LEGACY_PAGE_SIZE).
+    - A short page followed by a non-empty one means the portal caps the page size:
+      the cap becomes the page size.
+    - Once a full page was seen, the size is confirmed and a short page ends the blog.
+    - Below the configured size, the size is doubled again (up to the configured one) after
+      PAGE_SIZE_REPROBE_PAGES full pages, so a temporary refusal does not last forever.
+    """
+
+    def __init__(self, target_page_size: int, reprobe_pages: int = PAGE_SIZE_REPROBE_PAGES):
+        self.target_page_size = max(1, target_page_size)
+        self.reprobe_pages = reprobe_pages
+        self.page_size = self.target_page_size
+        self.confirmed = self.page_size <= LEGACY_PAGE_SIZE
+        self._full_pages = 0
+        self._lock = threading.Lock()
+
+    def full_page(self, page_size: int):
+        """A page came back with page_size posts."""
+        with self._lock:
+            if page_size != self.page_size:
+                return
+            self.confirmed = True
+            if self.page_size >= self.target_page_size:
+                return
+            self._full_pages += 1
+            if self._full_pages >= self.reprobe_pages:
+                self._full_pages = 0
+                self.page_size = min(self.target_page_size, self.page_size * 2)
+                self.confirmed = False
+                print(f"Trying blog pages of {self.page_size} posts again.")
+
+    def capped(self, page_size: int, items: int):
+        """The portal answered pages of page_size with only items posts, although more posts exist."""
+        with self._lock:
+            if self.page_size == page_size:
+                print(f"The portal caps the blog pages at {items} posts (asked for {page_size}). Using {items}.")
+                get_metrics().increment("post_page_size_fallbacks")
+                self.page_size = items
+                self.confirmed = True
+                self._full_pages = 0
+
+    def rejected(self, page_size: int, status_code: int):
+        """The portal refused pages of page_size posts."""
+        with self._lock:
+            if self.page_size == page_size:
+                self.page_size = max(LEGACY_PAGE_SIZE, page_size // 2)
+                self.confirmed = self.page_size == LEGACY_PAGE_SIZE
+                self._full_pages = 0
+                print(f"The portal rejected blog pages of {page_size} posts (HTTP {status_code}). "
+                      f"Trying {self.page_size}.")
+                get_metrics().increment("post_page_size_fallbacks")
+
+
+_page_size_negotiators: Dict[int, PageSizeNegotiator] = {}
+_page_size_negotiators_lock = threading.Lock()
+
+
+def get_page_size_negotiator(target_page_size: int) -> PageSizeNegotiator:
+    """Returns the process-wide PageSizeNegotiator for the configured page size."""
+    negotiator = _page_size_negotiators.get(target_page_size)
+    if negotiator is None:
+        with _page_size_negotiators_lock:
+            negotiator = _page_size_negotiators.get(target_page_size)
+            if negotiator is None:
+                negotiator = _page_size_negotiators[target_page_size] = PageSizeNegotiator(target_page_size)
+    return negotiator
+
 
 class CrawlerPosts:
-    def __init__(self, login: ScrapingLogin):
+    """
+    Pages through the discipline blogs with a configurable page size (PORTAL_POSTS_PAGE_SIZE),
+    negotiated with the portal by the process-wide PageSizeNegotiator. An explicit page_size
+    gets a negotiation of its own.
+    """
+
+    def __init__(self, login: ScrapingLogin, page_size: Optional[int] = None):
         self.page = login
+        if page_size:
+            self.negotiator = PageSizeNegotiator(page_size)
+        else:
+            self.negotiator = get_page_size_negotiator(login.posts_page_size)
+
+    @property
+    def page_size(self) -> int:
+        return self.negotiator.page_size
+
+    def get_posts(self, session: requests.Session, discipline: Discipline,
+                  is_known: Optional[Callable[[Post], bool]] = None, raise_on_error: bool = False) -> List[Post]:
+        """
+        Pages through the discipline blog, newest posts first. When is_known is given,
+        pagination stops at the first page whose oldest post is already known, since
+        every older page is known as well. A page that cannot be fetched ends the crawl
+        with the posts found so far, or raises with raise_on_error.
+        """
+        while True:
+            try:
+                return self._crawl(session, discipline, is_known, raise_on_error, self.page_size)
+            except _PageSizeChanged:
+                continue
 
-    def get_posts(self, session: requests.Session, discipline: Discipline) -> List[Post]:
-        time.sleep(1)  # Be nice to the server before starting
+    def _crawl(self, session: requests.Session, discipline: Discipline, is_known: Optional[Callable[[Post], bool]],
+               raise_on_error: bool, page_size: int) -> List[Post]:
         all_posts = []
         page = 0
-        
-        while page < MAX_PAGES_TO_SCRAPE:
-            resp = self._fetch_page_with_retries(session, discipline.id_cripto, page)
+        metrics = get_metrics()
 
-            if resp is None:
-                break
+        while page * page_size < MAX_POSTS_TO_SCRAPE:
+            with metrics.span("get_posts_page"):
+                resp = self._fetch_page_with_retries(session, discipline.id_cripto, page, page_size)
 
-            if not resp.text.strip():
-                break
+                if resp is None:
+                    if raise_on_error:
+                        raise Exception(f"Could not fetch page {page} of the blog of '{discipline.name}'.")
+                    break
 
-            html = BeautifulSoup(resp.content, 'html.parser')
-            posts = Utils.catch_posts(html, discipline)
+                if not resp.text.strip():
+                    break
+
+                metrics.increment("post_pages")
+                with metrics.span("parse_posts_page"):
+                    # Only the timeline entries are parsed; the rest of the page is never used
+                    html = parse_html(resp.content, POSTS_STRAINER)
+                    items = len(html.find_all("li", class_="timeline-inverted"))
+                    posts = Utils.catch_posts(html, discipline)
 
             if not posts:
                 break
 
             all_posts.extend(posts)
+
+            if is_known and is_known(posts[-1]):
+                break
+
+            if items < page_size:
+                if page_size != self.page_size:
+                    raise _PageSizeChanged()  # Negotiated by another crawl meanwhile
+                if self.negotiator.confirmed or not self._is_capped(session, discipline, page + 1, page_size, items):
+                    break  # A short page is the last one
+                raise _PageSizeChanged()
+            self.negotiator.full_page(page_size)
+
             page += 1
 
         return all_posts
 
-    def _fetch_page_with_retries(self, session: requests.Session, discipline_id: str, page: int) -> requests.Response | None:
+    def _is_capped(self, session: requests.Session, discipline: Discipline, next_page: int, page_size: int,
+                   items: int) -> bool:
+        """
+        Tells a short last page from a capped one by looking at the next page.
+        When the portal capped the page, the cap becomes the page size.
+        """
+        resp = self._fetch_page_with_retries(session, discipline.id_cripto, next_page, page_size)
+        if resp is None or not parse_html(resp.content, POSTS_STRAINER).find("li", class_="timeline-inverted"):
+            return False
+        self.negotiator.capped(page_size, items)
+        return True
+
+    def _fetch_page_with_retries(self, session: requests.Session, discipline_id: str, page: int,
+                                 page_size: int) -> requests.Response | None:
         for attempt in range(MAX_RETRIES):
             try:
                 resp = session.get(
-                    self.page.url_posts.format(discipline_id, page),
+                    self.page.url_posts.format(discipline_id, page_size, page),
                     timeout=REQUEST_TIMEOUT_SECONDS
                 )
+                if resp.status_code in PAGE_SIZE_REJECTION_STATUSES and page_size > LEGACY_PAGE_SIZE:
+                    self.negotiator.rejected(page_size, resp.status_code)
+                    raise _PageSizeChanged()
                 resp.raise_for_status()
                 return resp
             except requests.exceptions.RequestException as e:
                 print(f"Erro de rede ao buscar posts (tentativa {attempt + 1}/{MAX_RETRIES}): {e}")
                 if attempt < MAX_RETRIES - 1:
-                    time.sleep(RETRY_DELAY_SECONDS)
+                    get_metrics().increment("portal_retries")
+                    time.sleep(RETRY_BACKOFF_SECONDS * 2 ** attempt)
         
         print(f"Máximo de tentativas atingido para a página {page}. Desistindo da disciplina atual.")
         return None
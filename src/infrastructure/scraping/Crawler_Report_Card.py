@@ -0,0 +1,114 @@
+import os
+from typing import Dict, List
+import requests
+from bs4 import BeautifulSoup
+from src.domain.models.Report_Card import ReportCard
+from .Html_Parser import REPORT_CARD_STRAINER, parse_html
+from .Scraping_Login import ScrapingLogin
+from dotenv import load_dotenv
+
+load_dotenv()
+
+GRADE_COLUMNS = {"AV1": "AV1", "AV2": "AV2", "MP": "MP", "PF": "PF", "Final": "FINAL", "Resultado": "RESULTADO"}
+REQUIRED_GRADE_COLUMNS = ["AV1", "AV2", "MP", "Final"]
+ABSENCE_COLUMNS = {"TF1": "TF1", "TF2": "TF2", "TF": "TF", "Resultado": "RESULTADO"}
+
+
+class CrawlerReportCard:
+    """
+    Downloads the "Boletins" page once and extracts both the grades and the
+    absences from the same pass over the school-report tables.
+    """
+
+    def __init__(self, login_handler: ScrapingLogin):
+        self.login_handler = login_handler
+        self.BASE_URL = os.getenv("BLOG_URL")
+        if not self.BASE_URL:
+            raise ValueError("BLOG_URL environment variable is not set.")
+
+    def fetch_report_card(self, username, password) -> ReportCard:
+        """
+        Fetches and parses the report card of a student after logging in.
+        It dynamically finds the report card page URL from the student's dashboard.
+        """
+        session, dashboard_html = self.login_handler.login(username, password)
+        if not session or not dashboard_html:
+            raise Exception("Login failed: could not retrieve session or dashboard HTML.")
+
+        print(f"Successfully logged in as {username}. Searching for report card page link.")
+        try:
+            return self.fetch_report_card_with_session(session, dashboard_html)
+        finally:
+            self.login_handler.logout(session)
+
+    def fetch_report_card_with_session(self, session: requests.Session, dashboard_html: BeautifulSoup) -> ReportCard:
+        """Fetches and parses the report card using a session that is already logged in."""
+        # Dynamically find the report card page link from the dashboard
+        report_link_tag = dashboard_html.find("a", title="Boletins")
+        if not report_link_tag or not report_link_tag.get('href'):
+            raise Exception("Could not find the link to the report card page ('Boletins') on the dashboard.")
+
+        report_url = f"{self.BASE_URL}{report_link_tag['href']}"
+        print(f"Report card page found: {report_url}")
+
+        try:
+            response = session.get(report_url, timeout=30)
+            response.raise_for_status()
+        except Exception as e:
+            raise Exception(f"Failed to fetch report card page from {report_url}: {e}")
+
+        return self.parse_report_card(parse_html(response.content, REPORT_CARD_STRAINER))
+
+    @staticmethod
+    def parse_report_card(soup: BeautifulSoup) -> ReportCard:
+        report_card = ReportCard()
+
+        for table in soup.find_all("table", class_="table table-hover table-bordered school-report"):
+            headers = [th.get_text(strip=True) for th in table.find("thead").find_all("th")]
+
+            # Column positions, by the portal's header names ("Disciplina" for the discipline name)
+            positions: Dict[str, int] = {}
+            discipline_idx = -1
+            for i, header in enumerate(headers):
+                if header in GRADE_COLUMNS or header in ABSENCE_COLUMNS:
+                    positions.setdefault(header, i)
+                elif "Disciplina" in header:
+                    discipline_idx = i
+
+            if discipline_idx == -1:
+                print(f"Warning: Could not find the discipline column in a table. Headers found: {headers}")
+                continue
+
+            has_grades = all(column in positions for column in REQUIRED_GRADE_COLUMNS)
+            if not has_grades:
+                print(f"Warning: Could not find all required grade columns in a table. Headers found: {headers}")
+
+            last_idx = max([discipline_idx, *positions.values()])
+            for row in table.find("tbody").find_all("tr"):
+                cols = row.find_all("td")
+                if len(cols) <= last_idx:
+                    continue
+
+                values = {header: CrawlerReportCard._cell(cols, idx) for header, idx in positions.items()}
+                discipline_name = cols[discipline_idx].get_text(strip=True)
+
+                if has_grades:
+                    report_card.grades[discipline_name] = CrawlerReportCard._pick(values, GRADE_COLUMNS)
+                report_card.absences[discipline_name] = CrawlerReportCard._pick(values, ABSENCE_COLUMNS)
+
+        if not report_card.grades:
+            print("No grades found after parsing all tables.")
+        if not report_card.absences:
+            print("No absences found after parsing all tables.")
+
+        return report_card
+
+    @staticmethod
+    def _cell(cols: List, idx: int) -> str:
+        text = cols[idx].get_text(strip=True)
+        # '-' means an empty value in the portal
+        return text if text != '-' else ""
+
+    @staticmethod
+    def _pick(values: Dict[str, str], columns: Dict[str, str]) -> Dict[str, str]:
+        return {key: values.get(header, "") for header, key in columns.items()}
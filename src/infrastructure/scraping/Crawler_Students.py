@@ -1,4 +1,5 @@
 import requests
+from bs4 import BeautifulSoup
 
 from src.domain.models.Student import Student
 from src.infrastructure.scraping.Scraping_Login import ScrapingLogin
@@ -8,9 +9,9 @@ class CrawlerStudents:
     def __init__(self, login: ScrapingLogin):
         self.page = login
 
-    def get_name(self):
+    def get_name(self, dashboard_html: BeautifulSoup):
         try:
-            name = self.page.html.find('p', class_='perfil-aluno-nome').text
+            name = dashboard_html.find('p', class_='perfil-aluno-nome').text
             return name
         except requests.exceptions.RequestException as e:
             print(f"Erro de rede: {e}\n\nSeguindo programa. . .")
@@ -0,0 +1,54 @@
+import importlib.util
+import os
+import re
+from typing import Optional, Union
+from bs4 import BeautifulSoup, SoupStrainer
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# html.parser is the reference backend and the default: always available, and the one the parsers were
+# written against. lxml is several times faster but opt-in, as it can build different trees for malformed
+# markup (unclosed tags, whitespace text nodes), which was only compared on synthetic pages.
+SUPPORTED_BACKENDS = ("lxml", "html.parser")
+
+
+def _has_class(css_class: str) -> re.Pattern:
+    # While parsing, the strainer sees the raw class attribute ("table table-hover school-report"),
+    # so a plain string would only match elements with that single class.
+    return re.compile(rf"(^|\s){re.escape(css_class)}(\s|$)")
+
+
+# Partial parsing: only these subtrees are built for the pages that are parsed the most
+POSTS_STRAINER = SoupStrainer("li", class_=_has_class("timeline-inverted"))
+REPORT_CARD_STRAINER = SoupStrainer("table", class_=_has_class("school-report"))
+
+
+def _resolve_backend(requested: Optional[str]) -> str:
+    """
+    Picks the parser backend from HTML_PARSER_BACKEND ("html.parser", "lxml" or "auto").
+    The default is html.parser; "auto" uses lxml when it is installed, falling back to html.parser.
+    """
+    requested = (requested or "html.parser").strip().lower()
+    lxml_available = importlib.util.find_spec("lxml") is not None
+    if requested == "auto":
+        return "lxml" if lxml_available else "html.parser"
+    if requested not in SUPPORTED_BACKENDS:
+        print(f"Unknown HTML parser backend '{requested}'. Using html.parser.")
+        return "html.parser"
+    if requested == "lxml" and not lxml_available:
+        print("lxml is not installed. Using html.parser.")
+        return "html.parser"
+    return requested
+
+
+PARSER_BACKEND = _resolve_backend(os.getenv("HTML_PARSER_BACKEND"))
+
+
+def parse_html(markup: Union[str, bytes], parse_only: Optional[SoupStrainer] = None,
+               backend: Optional[str] = None) -> BeautifulSoup:
+    """
+    Parses a portal page with the configured backend. When parse_only is given,
+    only the matching subtrees are built (the rest of the document is skipped).
+    """
+    return BeautifulSoup(markup, backend or PARSER_BACKEND, parse_only=parse_only)
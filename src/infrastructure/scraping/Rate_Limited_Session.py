@@ -0,0 +1,48 @@
+import os
+import threading
+from typing import Optional
+from urllib.parse import urlsplit
+import requests
+from dotenv import load_dotenv
+from src.application.services.Metrics import get_metrics
+from src.application.services.Rate_Limiter import RateLimiter
+
+
+_portal_rate_limiter: Optional[RateLimiter] = None
+_portal_rate_limiter_lock = threading.Lock()
+
+
+def get_portal_rate_limiter() -> RateLimiter:
+    """
+    Returns the process-wide limiter shared by every request sent to the portal,
+    configured by PORTAL_REQUESTS_PER_SECOND and PORTAL_BURST.
+    """
+    global _portal_rate_limiter
+    if _portal_rate_limiter is None:
+        with _portal_rate_limiter_lock:
+            if _portal_rate_limiter is None:
+                load_dotenv()
+                _portal_rate_limiter = RateLimiter(
+                    rate=float(os.getenv('PORTAL_REQUESTS_PER_SECOND', '2')),
+                    burst=int(os.getenv('PORTAL_BURST', '4'))
+                )
+    return _portal_rate_limiter
+
+
+class RateLimitedSession(requests.Session):
+    """
+    requests.Session that takes a token from the host's bucket before every request,
+    so all portal traffic shares one politeness budget regardless of how many sessions exist.
+    Every request is counted and timed, as is the time spent waiting for a token.
+    """
+
+    def __init__(self, rate_limiter: Optional[RateLimiter] = None):
+        super().__init__()
+        self.rate_limiter = rate_limiter or get_portal_rate_limiter()
+
+    def request(self, method, url, *args, **kwargs):
+        metrics = get_metrics()
+        metrics.observe("portal_rate_limit_wait", self.rate_limiter.acquire(urlsplit(url).netloc))
+        metrics.increment("portal_requests")
+        with metrics.span("portal_request"):
+            return super().request(method, url, *args, **kwargs)
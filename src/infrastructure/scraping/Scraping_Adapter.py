@@ -1,49 +1,82 @@
-from typing import List, Optional, Dict, Tuple
+import os
+from typing import Callable, List, Optional, Dict, Tuple
 import requests
+from dotenv import load_dotenv
 from src.domain.models.Discipline import Discipline
 from src.domain.models.Post import Post
+from src.domain.models.Report_Card import ReportCard
 from src.domain.services.Scraping_Service import ScrapingService
 from src.infrastructure.scraping.Crawler_Students import CrawlerStudents
 from src.infrastructure.scraping.Scraping_Login import ScrapingLogin
 from src.infrastructure.scraping.Crawler_Disciplines import CrawlerDisciplines
 from src.infrastructure.scraping.Crawler_Posts import CrawlerPosts
-from src.infrastructure.scraping.Crawler_Grades import CrawlerGrades
-from src.infrastructure.scraping.Crawler_Absences import CrawlerAbsences
+from src.infrastructure.scraping.Crawler_Report_Card import CrawlerReportCard
+from src.infrastructure.scraping.Session_Manager import SessionManager, get_portal_session_manager
 from bs4 import BeautifulSoup
 
 
 class ScrapingAdapter(ScrapingService):
     """
     Adapter that wraps the original scraping classes and implements the ScrapingService interface.
+    The crawlers hold no per-student state, so a single adapter can be shared by concurrent workers.
+    Portal sessions are kept between calls by a SessionManager (the process-wide one by default),
+    unless reuse_sessions is False (or PORTAL_SESSION_REUSE=false): then every login is followed by a logout.
     """
-    def __init__(self):
+    def __init__(self, session_manager: Optional[SessionManager] = None, reuse_sessions: Optional[bool] = None):
+        load_dotenv()
+        if reuse_sessions is None:
+            reuse_sessions = os.getenv('PORTAL_SESSION_REUSE', 'true').strip().lower() not in ('false', '0', 'no')
         self.page_handler = ScrapingLogin()
+        self.session_manager = (session_manager or get_portal_session_manager()) if reuse_sessions else None
         self.student_crawler = CrawlerStudents(self.page_handler)
-        self.discipline_crawler = CrawlerDisciplines(self.page_handler)
+        self.discipline_crawler = CrawlerDisciplines(
+            self.page_handler, use_json=os.getenv('PORTAL_DISCIPLINE_SOURCE', 'json').strip().lower() != 'html')
         self.post_crawler = CrawlerPosts(self.page_handler)
-        self.grades_crawler = CrawlerGrades(self.page_handler)
-        self.absences_crawler = CrawlerAbsences(self.page_handler)
+        self.report_card_crawler = CrawlerReportCard(self.page_handler)
+
+    def get_report_card(self, registration: str, password: str) -> ReportCard:
+        print(f"ScrapingAdapter: Fetching report card for {registration}.")
+        if self.session_manager is None:
+            return self.report_card_crawler.fetch_report_card(registration, password)
+        session, dashboard_html = self.login(registration, password)
+        if not session or not dashboard_html:
+            raise Exception("Login failed: could not retrieve session or dashboard HTML.")
+        try:
+            return self.report_card_crawler.fetch_report_card_with_session(session, dashboard_html)
+        finally:
+            self.logout(session)
+
+    def get_report_card_with_session(self, session: requests.Session, dashboard_html: BeautifulSoup) -> ReportCard:
+        return self.report_card_crawler.fetch_report_card_with_session(session, dashboard_html)
 
     def get_grades(self, registration: str, password: str) -> Dict[str, Dict[str, str]]:
-        print(f"ScrapingAdapter: Fetching grades for {registration}.")
-        return self.grades_crawler.fetch_grades(registration, password)
+        return self.get_report_card(registration, password).grades
 
     def get_absences(self, registration: str, password: str) -> Dict[str, Dict[str, str]]:
-        print(f"ScrapingAdapter: Fetching absences for {registration}.")
-        return self.absences_crawler.fetch_absences(registration, password)
+        return self.get_report_card(registration, password).absences
 
     def get_student_name(self, registration: str, password: str) -> str:
-        self.page_handler.login(registration, password)
-        return self.student_crawler.get_name()
+        # Also used to check credentials: always a real login, never a kept session
+        session, dashboard_html = self.page_handler.login(registration, password)
+        try:
+            return self.student_crawler.get_name(dashboard_html)
+        finally:
+            if session:
+                self.page_handler.logout(session)
 
     def login(self, registration: str, password: str) -> Optional[Tuple[requests.Session, BeautifulSoup]]:
         """
         Logs into the academic portal and returns the session and dashboard HTML.
+        With session reuse, an authenticated session kept from a previous call is returned instead.
         """
-        return self.page_handler.login(registration, password)
+        if self.session_manager is None:
+            return self.page_handler.login(registration, password)
+        return self.session_manager.acquire(registration, password)
 
-    def logout(self) -> None:
-        self.page_handler.logout()
+    def logout(self, session: requests.Session) -> None:
+        """Logs out, or gives a reused session back to the session manager."""
+        if self.session_manager is None or not self.session_manager.release(session):
+            self.page_handler.logout(session)
 
     def get_disciplines(self, session: requests.Session, dashboard_html: BeautifulSoup) -> List[Discipline]:
         """
@@ -53,10 +86,11 @@ class ScrapingAdapter(ScrapingService):
         result = self.discipline_crawler.get_disciplines(session, dashboard_html)
         return result if result is not None else []
 
-    def get_posts(self, session: requests.Session, discipline: Discipline) -> List[Post]:
+    def get_posts(self, session: requests.Session, discipline: Discipline,
+                  is_known: Optional[Callable[[Post], bool]] = None, raise_on_error: bool = False) -> List[Post]:
         """
         Scrapes and returns the list of posts for a given discipline,
-        using the provided session.
+        using the provided session. Stops paginating once a page ends with a known post.
         """
-        result = self.post_crawler.get_posts(session, discipline)
+        result = self.post_crawler.get_posts(session, discipline, is_known, raise_on_error)
         return result if result is not None else []
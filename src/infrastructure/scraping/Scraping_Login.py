@@ -1,55 +1,67 @@
-import time
-
 import requests
-from bs4 import BeautifulSoup
 from dotenv import load_dotenv
 import os
+from typing import Optional
+from src.application.services.Metrics import get_metrics
+from src.application.services.Rate_Limiter import RateLimiter
+from src.infrastructure.scraping.Html_Parser import parse_html
+from src.infrastructure.scraping.Rate_Limited_Session import RateLimitedSession, get_portal_rate_limiter
 
 
 class ScrapingLogin:
-    def __init__(self):
+    """
+    Builds authenticated sessions against the academic portal.
+    Every call to login creates its own requests.Session (unless one is given
+    to log in again), so several students can be processed concurrently
+    without sharing state. All sessions draw from the same per-host token bucket.
+    """
+
+    def __init__(self, rate_limiter: Optional[RateLimiter] = None):
         load_dotenv()
+        self.rate_limiter = rate_limiter or get_portal_rate_limiter()
         self.url = os.getenv('BLOG_URL')
         self.url_logout = self.url + '/Aluno/Logout'
+        self.url_dashboard = self.url + '/Aluno'
         self.url_disciplines = self.url + '/Ajax/GetSujectList/?year={}&semester={}'
-        self.url_posts = self.url + '/Aluno/BlogCarregarMais/?parametros={}&pageSize=3&pageNumber={}&filter='
-        self.resp = None
-        self.json_data = None
-        self.html = None
-        self.session = requests.session()
+        self.url_posts = self.url + '/Aluno/BlogCarregarMais/?parametros={}&pageSize={}&pageNumber={}&filter='
+        self.posts_page_size = int(os.getenv('PORTAL_POSTS_PAGE_SIZE', '20'))
         self.max_attempts = 3
-        self.recovery_attempts = 1
 
-    def login(self, registration: str, password: str):
-        self.recovery_attempts = 1
-        self.json_data = {
+    def login(self, registration: str, password: str, session: Optional[RateLimitedSession] = None):
+        session = session or RateLimitedSession(self.rate_limiter)
+        json_data = {
             "Matricula": registration,
             "password": password
         }
-        while not self.recovery_attempts > self.max_attempts:
-            time.sleep(1)
+        attempt = 1
+        while not attempt > self.max_attempts:
             try:
-                self.resp = self.session.post(self.url, data=self.json_data)
-                if self.resp.status_code == 200:
-                    self.html = BeautifulSoup(self.resp.content, 'html.parser')
-                    return self.session, self.html
+                resp = session.post(self.url, data=json_data)
+                if resp.status_code == 200:
+                    html = parse_html(resp.content)
+                    return session, html
                 else:
-                    print(f"Erro ao tentar fazer login tentativa {self.recovery_attempts}/{self.max_attempts}")
-                    self.recovery_attempts += 1
+                    print(f"Erro ao tentar fazer login tentativa {attempt}/{self.max_attempts}")
+                    get_metrics().increment("portal_retries")
+                    attempt += 1
             except requests.exceptions.RequestException as e:
                 print(f"Erro de rede: {e}\n\nSeguindo programa. . .")
-                print(f"Erro ao tentar fazer login tentativa {self.recovery_attempts}/{self.max_attempts}")
-                self.recovery_attempts += 1
+                print(f"Erro ao tentar fazer login tentativa {attempt}/{self.max_attempts}")
+                get_metrics().increment("portal_retries")
+                attempt += 1
 
         print("Número máximo de tentativas de login atingido. Falha no login.")
+        session.close()
         return None, None
 
-    def logout(self):
+    def logout(self, session: requests.Session):
         try:
-            self.resp = self.session.get(self.url_logout)
-            if self.resp.status_code == 200:
-                self.html = BeautifulSoup(self.resp.content, 'html.parser')
-            return self.html
+            resp = session.get(self.url_logout)
+            if resp.status_code == 200:
+                return parse_html(resp.content)
+            return None
         except requests.exceptions.RequestException as e:
             print(f"Erro de rede: {e}\n\nSeguindo programa. . .")
             return None
+        finally:
+            session.close()
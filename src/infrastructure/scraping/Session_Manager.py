@@ -0,0 +1,316 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+import requests
+from bs4 import BeautifulSoup
+from dotenv import load_dotenv
+from src.application.services.Metrics import get_metrics
+from src.application.services.Rate_Limiter import RateLimiter
+from src.infrastructure.scraping.Html_Parser import parse_html
+from src.infrastructure.scraping.Rate_Limited_Session import RateLimitedSession
+from src.infrastructure.scraping.Scraping_Login import ScrapingLogin
+
+
+class ManagedSession(RateLimitedSession):
+    """
+    Portal session that logs in again by itself: when a request is redirected to the
+    login page (the portal's answer to an expired session), it re-authenticates with
+    the stored credentials and repeats the request once.
+    """
+
+    def __init__(self, registration: str, password: str, login_url: str,
+                 rate_limiter: Optional[RateLimiter] = None):
+        super().__init__(rate_limiter)
+        self.registration = registration
+        self.password = password
+        self.login_url = login_url
+        self.relogin: Optional[Callable[["ManagedSession"], bool]] = None
+        self._relogging = False
+
+    def request(self, method, url, *args, **kwargs):
+        response = super().request(method, url, *args, **kwargs)
+        if self.relogin is None or self._relogging or not self.is_login_redirect(response):
+            return response
+        print(f"Portal session of {self.registration} expired. Logging in again...")
+        self._relogging = True
+        try:
+            if not self.relogin(self):
+                return response
+        finally:
+            self._relogging = False
+        return super().request(method, url, *args, **kwargs)
+
+    def is_login_redirect(self, response: requests.Response) -> bool:
+        login_path = urlsplit(self.login_url).path.rstrip("/")
+        for hop in list(response.history) + [response]:
+            if not hop.is_redirect:
+                continue
+            target = urlsplit(urljoin(hop.url, hop.headers.get("Location", ""))).path.rstrip("/")
+            if target == login_path or "login" in target.lower():
+                return True
+        return False
+
+
+@dataclass
+class _SessionEntry:
+    session: ManagedSession
+    dashboard_html: Optional[BeautifulSoup]
+    credentials_digest: Optional[bytes]
+    dashboard_at: float
+    last_used: float
+    in_use: bool = False
+
+
+class SessionManager:
+    """
+    Keeps one authenticated portal session per student between cycles, instead of
+    a login POST, a full dashboard parse and a logout GET for every student every cycle.
+
+    - A session is reused as is while it was used in the last idle_timeout_seconds.
+      Expiry in between is caught by ManagedSession (redirect to the login page).
+    - The dashboard is kept in a compact form (only the parts that are read) and refreshed
+      every dashboard_max_age_seconds with a single GET, which also validates the session.
+    - A session is lent to one caller at a time; a concurrent caller gets its own
+      one-off session, logged out on release.
+    - With cookie_file, the cookies are written to disk and reloaded after a restart. The password
+      of a restored session is unknown, so it is only replaced by a real login on first use.
+    """
+
+    def __init__(self, login_handler: ScrapingLogin,
+                 idle_timeout_seconds: float = 1200,
+                 dashboard_max_age_seconds: float = 3600,
+                 cookie_file: Optional[str] = None):
+        self.login_handler = login_handler
+        self.idle_timeout_seconds = idle_timeout_seconds
+        self.dashboard_max_age_seconds = dashboard_max_age_seconds
+        self.cookie_file = cookie_file
+        self._entries: Dict[str, _SessionEntry] = {}
+        self._one_off: Dict[int, requests.Session] = {}
+        self._lock = threading.Lock()
+        if cookie_file:
+            self._load_cookies()
+
+    def acquire(self, registration: str, password: str) -> Tuple[Optional[requests.Session], Optional[BeautifulSoup]]:
+        """
+        Returns an authenticated session and the student's dashboard, logging in only when needed.
+        A kept session is only reused with the password it was logged in with; it does not prove
+        that a password is right when it was restored from the cookie file.
+        """
+        now = time.monotonic()
+        digest = self._digest(registration, password)
+        with self._lock:
+            self._drop_idle(now)
+            entry = self._entries.get(registration)
+            if entry is not None and entry.in_use:
+                entry = None
+                one_off = True
+            else:
+                one_off = False
+                if entry is not None and entry.credentials_digest != digest:
+                    # Another password (or an unknown one, for a restored session): the kept session must not
+                    # answer for these credentials. A real login checks them and replaces it if they are right.
+                    entry = None
+                if entry is not None:
+                    entry.in_use = True
+
+        if one_off:
+            session, dashboard_html = self.login_handler.login(registration, password)
+            if session:
+                with self._lock:
+                    self._one_off[id(session)] = session
+            return session, dashboard_html
+
+        if entry is not None:
+            if now - entry.dashboard_at < self.dashboard_max_age_seconds and entry.dashboard_html is not None:
+                get_metrics().increment("portal_sessions_reused")
+                return entry.session, entry.dashboard_html
+            if self._refresh_dashboard(entry):
+                get_metrics().increment("portal_sessions_reused")
+                return entry.session, entry.dashboard_html
+            with self._lock:
+                self._entries.pop(registration, None)
+            entry.session.close()
+
+        session = ManagedSession(registration, password, self.login_handler.url, self.login_handler.rate_limiter)
+        session, dashboard_html = self.login_handler.login(registration, password, session)
+        if not session:
+            return None, None
+        if not self._is_authenticated(dashboard_html):
+            # Wrong credentials: nothing is kept, and the session of the right password stays in place
+            session.close()
+            return None, None
+        session.relogin = self._relogin
+        now = time.monotonic()
+        entry = _SessionEntry(session, self._compact_dashboard(dashboard_html), digest, now, now, in_use=True)
+        with self._lock:
+            previous = self._entries.get(registration)
+            self._entries[registration] = entry
+            # A superseded session still lent out is logged out by its caller on release
+            superseded = previous if previous is not None and not previous.in_use else None
+        if superseded is not None:
+            superseded.session.relogin = None  # The logout may redirect to the login page
+            self.login_handler.logout(superseded.session)
+        self._save_cookies()
+        return session, entry.dashboard_html
+
+    def release(self, session: requests.Session) -> bool:
+        """
+        Gives a session back after use. Returns False when the session is not
+        managed here, in which case the caller should log it out itself.
+        """
+        with self._lock:
+            one_off = self._one_off.pop(id(session), None)
+            entry = self._entries.get(getattr(session, "registration", None))
+            if entry is not None and entry.session is session:
+                entry.in_use = False
+                entry.last_used = time.monotonic()
+                return True
+        if one_off is not None:
+            self.login_handler.logout(one_off)
+            return True
+        return False
+
+    def invalidate(self, registration: str):
+        """Logs the student's session out and forgets it (e.g. the student was deleted)."""
+        with self._lock:
+            entry = self._entries.pop(registration, None)
+        if entry is not None:
+            entry.session.relogin = None  # The logout may redirect to the login page
+            self.login_handler.logout(entry.session)
+            self._save_cookies()
+
+    def shutdown(self):
+        """Keeps the sessions alive on disk when cookies are persisted, otherwise logs them all out."""
+        if self.cookie_file:
+            self._save_cookies()
+            return
+        with self._lock:
+            entries = list(self._entries.values())
+            self._entries.clear()
+        for entry in entries:
+            entry.session.relogin = None
+            self.login_handler.logout(entry.session)
+
+    def _relogin(self, session: ManagedSession) -> bool:
+        _, dashboard_html = self.login_handler.login(session.registration, session.password, session)
+        if not self._is_authenticated(dashboard_html):
+            return False
+        get_metrics().increment("portal_relogins")
+        with self._lock:
+            entry = self._entries.get(session.registration)
+            if entry is not None and entry.session is session:
+                entry.dashboard_html = self._compact_dashboard(dashboard_html)
+                entry.dashboard_at = time.monotonic()
+        self._save_cookies()
+        return True
+
+    def _refresh_dashboard(self, entry: _SessionEntry) -> bool:
+        """One GET without redirects: a 200 is a valid session and a fresh dashboard."""
+        try:
+            response = entry.session.get(self.login_handler.url_dashboard, allow_redirects=False, timeout=10)
+        except requests.exceptions.RequestException as e:
+            print(f"Could not validate the portal session of {entry.session.registration}: {e}")
+            return False
+        if response.status_code != 200:
+            return False
+        entry.dashboard_html = self._compact_dashboard(parse_html(response.content))
+        entry.dashboard_at = time.monotonic()
+        return True
+
+    def _drop_idle(self, now: float):
+        """Sessions idle for longer than the portal keeps them are forgotten (not logged out: already expired)."""
+        for registration, entry in list(self._entries.items()):
+            if not entry.in_use and now - entry.last_used > self.idle_timeout_seconds:
+                entry.session.close()
+                del self._entries[registration]
+
+    @staticmethod
+    def _is_authenticated(dashboard_html: Optional[BeautifulSoup]) -> bool:
+        """The portal answers a wrong password with its login page, also with a 200: only a dashboard names the student."""
+        return dashboard_html is not None and dashboard_html.find("p", class_="perfil-aluno-nome") is not None
+
+    @staticmethod
+    def _compact_dashboard(dashboard_html: Optional[BeautifulSoup]) -> Optional[BeautifulSoup]:
+        """
+        Keeps only the parts of the dashboard that are read later (discipline cards, the report
+        card link and the student name), so a cached dashboard per student stays small.
+        """
+        if dashboard_html is None:
+            return None
+        parts = dashboard_html.find_all("div", class_="card-turma") + \
+            dashboard_html.find_all("a", title="Boletins") + \
+            dashboard_html.find_all("p", class_="perfil-aluno-nome")
+        return parse_html("<html><body>" + "".join(str(part) for part in parts) + "</body></html>")
+
+    @staticmethod
+    def _digest(registration: str, password: str) -> bytes:
+        # Only kept in memory, to notice a password change without storing the password twice
+        return hashlib.sha256(f"{registration}\0{password}".encode("utf-8")).digest()
+
+    def _save_cookies(self):
+        if not self.cookie_file:
+            return
+        with self._lock:
+            data = {
+                registration: [{"name": c.name, "value": c.value, "domain": c.domain, "path": c.path}
+                               for c in entry.session.cookies]
+                for registration, entry in self._entries.items()
+            }
+        temp_path = f"{self.cookie_file}.tmp"
+        try:
+            # The cookies are as good as the students' passwords: readable by the owner only
+            fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(temp_path, self.cookie_file)
+        except OSError as e:
+            print(f"Could not save the portal cookies to {self.cookie_file}: {e}")
+
+    def _load_cookies(self):
+        try:
+            with open(self.cookie_file, encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            print(f"Could not load the portal cookies from {self.cookie_file}: {e}")
+            return
+
+        now = time.monotonic()
+        for registration, cookies in data.items():
+            # The password is only known at the first acquire; until then the session cannot log in again
+            session = ManagedSession(registration, "", self.login_handler.url, self.login_handler.rate_limiter)
+            for cookie in cookies:
+                session.cookies.set(cookie["name"], cookie["value"], domain=cookie["domain"], path=cookie["path"])
+            session.relogin = self._relogin
+            # No dashboard yet: the first acquire validates the session with a dashboard GET
+            self._entries[registration] = _SessionEntry(session, None, None, 0, now)
+        print(f"Loaded {len(self._entries)} portal sessions from {self.cookie_file}.")
+
+
+_session_manager: Optional[SessionManager] = None
+_session_manager_lock = threading.Lock()
+
+
+def get_portal_session_manager() -> SessionManager:
+    """
+    Returns the process-wide SessionManager, configured by PORTAL_SESSION_IDLE_TIMEOUT_MINUTES,
+    PORTAL_DASHBOARD_MAX_AGE_MINUTES and PORTAL_SESSION_COOKIE_FILE.
+    """
+    global _session_manager
+    if _session_manager is None:
+        with _session_manager_lock:
+            if _session_manager is None:
+                load_dotenv()
+                _session_manager = SessionManager(
+                    ScrapingLogin(),
+                    idle_timeout_seconds=float(os.getenv('PORTAL_SESSION_IDLE_TIMEOUT_MINUTES', '20')) * 60,
+                    dashboard_max_age_seconds=float(os.getenv('PORTAL_DASHBOARD_MAX_AGE_MINUTES', '60')) * 60,
+                    cookie_file=os.getenv('PORTAL_SESSION_COOKIE_FILE') or None
+                )
+    return _session_manager
@@ -1,4 +1,5 @@
 import datetime
+import html
 from bs4 import BeautifulSoup
 from requests import Response
 from src.domain.models.Post import Post
@@ -23,13 +24,23 @@ class Utils:
 
     @staticmethod
     def constructor_disciplines(data: Response):
+        """
+        Builds the disciplines from the GetSujectList JSON. Names are normalized like the dashboard
+        cards (entities unescaped, surrounding whitespace removed), since disciplines are matched
+        by name and id_cripto. Raises ValueError, KeyError or TypeError when the JSON shape changed.
+        """
+        items = data.json()
+        if not isinstance(items, list):
+            raise TypeError(f"Expected a list of disciplines, got {type(items).__name__}")
         disciplines = []
-        for i in data.json():
+        for i in items:
             disc_name = i['NomeDisciplina']
-            disc_name = str(disc_name).replace('\t', '')
+            disc_name = html.unescape(str(disc_name).replace('\t', '')).strip()
             disc_id = i['IdBlogPostCripto']
+            if not disc_id:
+                continue
 
-            new_discipline = Discipline(name=disc_name, id_cripto=disc_id)
+            new_discipline = Discipline(name=disc_name, id_cripto=str(disc_id))
             disciplines.append(new_discipline)
         return disciplines
 
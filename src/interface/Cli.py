@@ -1,10 +1,19 @@
-from datetime import datetime
+from datetime import datetime, timedelta
+import json
+import os
 import threading
 from time import sleep
 from typing import Tuple, Callable
+from dotenv import load_dotenv
 
 # --- Dependency Imports ---
+from src.application.services.Discipline_Scheduler import DisciplineScheduler
 from src.application.services.InMemory_Store import InMemoryStore
+from src.application.services.Keyed_Lock import KeyedLock
+from src.application.services.Metrics import get_metrics
+from src.application.services.Notification_Dispatcher import NotificationDispatcher
+from src.application.services.Notification_Outbox_Relay import NotificationOutboxRelay
+from src.application.services.Report_Card_Service import ReportCardService
 from src.application.use_cases.Sync_And_Notify import SyncAndNotifyUseCase
 from src.application.services.Send_Whatsapp_Msg import WhatsappNotificationService
 from src.application.use_cases.Save_Student import SaveStudent
@@ -13,20 +22,27 @@ from src.infrastructure.database.Student_pg import StudentPgRepository
 from src.infrastructure.database.Discipline_pg import DisciplinePgRepository
 from src.infrastructure.database.Student_Discipline_pg import StudentDisciplinePgRepository
 from src.infrastructure.database.Post_pg import PostPgRepository
+from src.infrastructure.database.Notification_Outbox_pg import NotificationOutboxPgRepository
 from src.infrastructure.scraping.Scraping_Adapter import ScrapingAdapter
+from src.infrastructure.scraping.Session_Manager import get_portal_session_manager
 
 
-def setup_dependencies() -> Tuple[SyncAndNotifyUseCase, SaveStudent, Callable[[], None]]:
+def setup_dependencies() -> Tuple[SyncAndNotifyUseCase, SaveStudent, Callable[[], None], Callable[[], None]]:
     """Instantiates and wires up all the dependencies, including the recovery callback."""
     print("Setting up dependencies...")
-    # 1. Instantiate repositories and the store
+    load_dotenv()
+    # 1. Instantiate the store and repositories
+    store = InMemoryStore()
     repos = {
-        'student': StudentPgRepository(),
+        'student': StudentPgRepository(store),
         'discipline': DisciplinePgRepository(),
         'student_discipline': StudentDisciplinePgRepository(),
-        'post': PostPgRepository()
+        'post': PostPgRepository(),
+        'outbox': NotificationOutboxPgRepository()
     }
-    store = InMemoryStore()
+    repos['student'].ensure_schema()
+    repos['discipline'].ensure_schema()
+    repos['outbox'].ensure_table()
 
     # 2. Define the sync function which needs access to repos and store
     def perform_full_sync_wrapper():
@@ -38,9 +54,42 @@ def setup_dependencies() -> Tuple[SyncAndNotifyUseCase, SaveStudent, Callable[[]
             student_discipline_repo=repos['student_discipline']
         )
 
+    def perform_delta_sync_wrapper():
+        """A wrapper that captures store and repos to apply only the rows changed since the last sync."""
+        store.delta_sync(
+            student_repo=repos['student'],
+            discipline_repo=repos['discipline'],
+            post_repo=repos['post'],
+            student_discipline_repo=repos['student_discipline']
+        )
+
     # 3. Instantiate services
     scraping_service = ScrapingAdapter()
+    # Registration, deletion and the crawler only contend on the same student
+    student_locks = KeyedLock()
     notification_service = WhatsappNotificationService()
+    notification_dispatcher = NotificationDispatcher(
+        notification_service,
+        workers=int(os.getenv('NOTIFY_WORKERS', '4')),
+        queue_size=int(os.getenv('NOTIFY_QUEUE_SIZE', '1000')),
+        per_destination_per_minute=float(os.getenv('NOTIFY_PER_DESTINATION_PER_MINUTE', '20')),
+        max_attempts=int(os.getenv('NOTIFY_MAX_ATTEMPTS', '8'))
+    )
+    notification_dispatcher.start()
+    # Started by the crawler after the initial sync, so pending messages can be matched to their students
+    outbox_relay = NotificationOutboxRelay(
+        repos['outbox'],
+        notification_dispatcher,
+        store,
+        batch_size=int(os.getenv('OUTBOX_BATCH_SIZE', '100')),
+        poll_interval_seconds=float(os.getenv('OUTBOX_POLL_INTERVAL_SECONDS', '30')),
+        max_attempts=int(os.getenv('OUTBOX_MAX_ATTEMPTS', '3'))
+    )
+
+    # Optional: refresh report cards with the crawler's sessions and notify grade changes
+    report_card_service = None
+    if os.getenv('REPORT_CARD_PREFETCH_ENABLED', 'false').lower() == 'true':
+        report_card_service = ReportCardService(scraping_service)
 
     # 4. Instantiate the main use case, injecting the sync callback
     sync_use_case = SyncAndNotifyUseCase(
@@ -50,23 +99,39 @@ def setup_dependencies() -> Tuple[SyncAndNotifyUseCase, SaveStudent, Callable[[]
         post_repo=repos['post'],
         scraping_service=scraping_service,
         notification_service=notification_service,
-        sync_callback=perform_full_sync_wrapper  # Dependency Injection
+        sync_callback=perform_full_sync_wrapper,  # Dependency Injection
+        max_workers=int(os.getenv('SYNC_MAX_WORKERS', '4')),
+        scheduling_mode=os.getenv('SYNC_SCHEDULING_MODE', 'discipline'),
+        notification_dispatcher=notification_dispatcher,
+        outbox_relay=outbox_relay,
+        student_locks=student_locks,
+        report_card_service=report_card_service,
+        report_card_refresh_seconds=float(os.getenv('REPORT_CARD_PREFETCH_INTERVAL_MINUTES', '60')) * 60,
+        discipline_refresh_seconds=float(os.getenv('DISCIPLINE_REFRESH_MINUTES', '360')) * 60,
+        discipline_scheduler=DisciplineScheduler(
+            min_interval_seconds=float(os.getenv('SYNC_MIN_INTERVAL_SECONDS', '120')),
+            max_interval_seconds=float(os.getenv('SYNC_MAX_INTERVAL_MINUTES', '360')) * 60,
+            backoff=float(os.getenv('SYNC_INTERVAL_BACKOFF', '1.5')),
+            daily_interval_seconds=float(os.getenv('SYNC_DAILY_INTERVAL_SECONDS', '180'))
+        ) if os.getenv('SYNC_ADAPTIVE_SCHEDULING', 'true').lower() == 'true' else None
     )
 
     # 5. Instantiate the student management use case
     student_use_case = SaveStudent(
         student_repo=repos['student'],
         student_discipline_repo=repos['student_discipline'],
-        scraping_service=scraping_service
+        scraping_service=scraping_service,
+        student_locks=student_locks
     )
     
     # 6. Return all necessary components for the main script
-    return sync_use_case, student_use_case, perform_full_sync_wrapper
+    return sync_use_case, student_use_case, perform_full_sync_wrapper, perform_delta_sync_wrapper
 
 
 if __name__ == "__main__":
     # --- Dependency Injection ---
-    sync_use_case, register_student_use_case, perform_full_sync = setup_dependencies()
+    sync_use_case, register_student_use_case, perform_full_sync, perform_delta_sync = setup_dependencies()
+    metrics_dump_path = os.getenv('METRICS_DUMP_PATH')
     
     global running
     running = True
@@ -76,7 +141,9 @@ if __name__ == "__main__":
         # Configuration
         sleep_time_seconds = 120
         sync_interval_minutes = 60
-        cycles_for_resync = (sync_interval_minutes * 60) / sleep_time_seconds
+        # Time based: with adaptive scheduling the cycles are not evenly spaced
+        resync_interval = timedelta(minutes=sync_interval_minutes)
+        full_sync_interval = timedelta(hours=float(os.getenv('FULL_SYNC_INTERVAL_HOURS', '24')))
 
         # Initial full sync before starting the loop
         try:
@@ -85,31 +152,46 @@ if __name__ == "__main__":
             print("--- Initial sync successful. ---")
         except Exception as e:
             print(f"!!! Initial full sync failed: {e}. The application might be in a degraded state. !!!")
+        sync_use_case.outbox_relay.start()
         
         cycle_count = 1
+        last_full_sync = datetime.now()
+        last_resync = datetime.now()
         while running:
             now = datetime.now()
+            sleep_seconds = sleep_time_seconds
             # Resync periodically and reset the recovery state
-            if cycle_count > cycles_for_resync:
-                print(f"\n--- Scheduled Sync Triggered at: {now.strftime('%Y-%m-%d %H:%M:%S')} ---")
-                # Reset the recovery state before attempting a full sync
+            if now - last_resync >= resync_interval:
+                # Reset the recovery state before attempting a delta sync (it falls back to a full one)
                 sync_use_case.reset_recovery_state()
                 try:
-                    perform_full_sync()
+                    if now - last_full_sync >= full_sync_interval:
+                        print(f"\n--- Scheduled Full Sync Triggered at: {now.strftime('%Y-%m-%d %H:%M:%S')} ---")
+                        perform_full_sync()
+                        last_full_sync = now
+                    else:
+                        print(f"\n--- Scheduled Delta Sync Triggered at: {now.strftime('%Y-%m-%d %H:%M:%S')} ---")
+                        perform_delta_sync()
                 except Exception as e:
                     print(f"!!! Scheduled sync failed: {e}. !!!")
-                cycle_count = 1  # Reset counter
+                last_resync = now
 
             # Run sync logic only outside of "quiet hours" (e.g., 23:00 to 05:00)
             if not (23 <= now.hour or now.hour < 5):
-                print(f"\n--- Cycle {cycle_count}/{int(cycles_for_resync)} started at: {now.strftime('%Y-%m-%d %H:%M:%S')} ---")
+                print(f"\n--- Cycle {cycle_count} started at: {now.strftime('%Y-%m-%d %H:%M:%S')} ---")
                 try:
                     sync_use_case.execute()
-                    print(f"--- Cycle finished successfully. Next check in {sleep_time_seconds} seconds. ---")
+                    sleep_seconds = next_check_seconds(sleep_time_seconds)
+                    print(f"--- Cycle finished successfully. Next check in {sleep_seconds:.0f} seconds. ---")
                 except Exception:
                     # The use case already logs the details of the error and recovery attempt.
                     # We just log that the cycle failed and continue the loop.
-                    print(f"--- Cycle failed. See logs above for details. Next check in {sleep_time_seconds} seconds. ---")
+                    print(f"--- Cycle failed. See logs above for details. Next check in {sleep_seconds} seconds. ---")
+                if metrics_dump_path:
+                    try:
+                        get_metrics().dump_json(metrics_dump_path)
+                    except OSError as e:
+                        print(f"Could not write the metrics to {metrics_dump_path}: {e}")
                 cycle_count += 1
             else:
                 print(f"Quiet hours. Skipping synchronization. Current time: {now.strftime('%H:%M:%S')}")
@@ -117,7 +199,14 @@ if __name__ == "__main__":
             if not running:
                 break
 
-            sleep(sleep_time_seconds)
+            sleep(sleep_seconds)
+
+    def next_check_seconds(default: float) -> float:
+        """With adaptive scheduling, the next cycle starts when the next discipline is due (at most default)."""
+        scheduler = sync_use_case.discipline_scheduler
+        if scheduler is None:
+            return default
+        return max(30.0, scheduler.seconds_until_next_due(default))
 
 
     def add_or_remove_student():
@@ -126,7 +215,7 @@ if __name__ == "__main__":
             while True:
                 input('\nPress Enter to manage students (or Ctrl+C to exit CLI)...\n')
 
-                option = input('Register [1] or Delete [2] a Student? (0 to quit program): ')
+                option = input('Register [1] or Delete [2] a Student, or Show metrics [3]? (0 to quit program): ')
                 if option == '1':
                     print('----- Register Student -----')
                     phone = input('Phone: ')
@@ -139,8 +228,7 @@ if __name__ == "__main__":
                         name = ScrapingAdapter().get_student_name(faculty_registration, password)
                         result = register_student_use_case.new_student(name, phone, faculty_registration, password)
                         if isinstance(result, Student):
-                            print('Student registered successfully! Triggering data resynchronization...')
-                            perform_full_sync()  # Resync cache
+                            print('Student registered successfully! In-memory store updated.')
                         else:
                             print(f'Error during registration: {result}')
                     else:
@@ -155,13 +243,16 @@ if __name__ == "__main__":
                     if resp.lower() == 'y':
                         was_deleted = register_student_use_case.del_student(faculty_registration)
                         if was_deleted:
-                            print('Student deleted. Triggering data resynchronization...')
-                            perform_full_sync()  # Resync cache
+                            print('Student deleted. In-memory store updated.')
                         else:
                             print('Could not delete student (maybe not found or an error occurred).')
                     else:
                         print('Operation canceled.')
 
+                elif option == '3':
+                    print('----- Metrics -----')
+                    print(json.dumps(get_metrics().snapshot(), indent=2))
+
                 elif option == '0':
                     print('Finishing program...')
                     running = False
@@ -181,4 +272,5 @@ if __name__ == "__main__":
     print("Starting crawler. Press Enter to manage students.")
     crawler_faculty()
 
+    get_portal_session_manager().shutdown()
     print("Program has been terminated.")
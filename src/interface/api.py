@@ -6,12 +6,19 @@ import os
 from dotenv import load_dotenv
 import uvicorn
 from fastapi import FastAPI, Query, HTTPException
+from fastapi.responses import PlainTextResponse
 from pydantic import BaseModel
 import random
 import string
 
 # --- Layer Imports ---
+from src.application.services.Discipline_Scheduler import DisciplineScheduler
 from src.application.services.InMemory_Store import InMemoryStore
+from src.application.services.Keyed_Lock import KeyedLock
+from src.application.services.Metrics import get_metrics
+from src.application.services.Notification_Dispatcher import NotificationDispatcher
+from src.application.services.Notification_Outbox_Relay import NotificationOutboxRelay
+from src.application.services.Report_Card_Service import ReportCardService
 from src.application.services.Send_Whatsapp_Msg import WhatsappNotificationService
 from src.application.use_cases.Get_Student_Absences import GetStudentAbsences
 from src.application.use_cases.Get_Student_Grades import GetStudentGrades
@@ -20,7 +27,9 @@ from src.application.use_cases.Sync_And_Notify import SyncAndNotifyUseCase
 from src.domain.models.Student import Student
 from src.domain.services.Scraping_Service import ScrapingService
 from src.infrastructure.database.Discipline_pg import DisciplinePgRepository
+from src.infrastructure.database.Notification_Outbox_pg import NotificationOutboxPgRepository
 from src.infrastructure.database.Post_pg import PostPgRepository
+from src.infrastructure.scraping.Session_Manager import get_portal_session_manager
 from src.infrastructure.database.Student_Discipline_pg import StudentDisciplinePgRepository
 from src.infrastructure.database.Student_pg import StudentPgRepository
 from src.infrastructure.scraping.Scraping_Adapter import ScrapingAdapter
@@ -33,7 +42,6 @@ from fastapi import Depends
 in_memory_store = InMemoryStore()
 dependencies: Dict[str, Any] = {}
 running_thread = True
-scraping_lock = threading.Lock()
 verification_codes: Dict[str, Dict[str, str]] = {}
 
 
@@ -80,6 +88,18 @@ def perform_full_sync_wrapper():
         )
 
 
+def perform_delta_sync_wrapper():
+    """A wrapper that uses globally stored dependencies to apply only the rows changed since the last sync."""
+    if dependencies:
+        print("--- Delta synchronization triggered... ---")
+        in_memory_store.delta_sync(
+            student_repo=dependencies['student_repo'],
+            discipline_repo=dependencies['discipline_repo'],
+            post_repo=dependencies['post_repo'],
+            student_discipline_repo=dependencies['student_discipline_repo']
+        )
+
+
 def crawler_loop():
     """Main background loop for automatic synchronization."""
     global running_thread
@@ -89,34 +109,51 @@ def crawler_loop():
     sync_use_case: SyncAndNotifyUseCase = dependencies['sync_use_case']
     sleep_time_seconds = 300
     sync_interval_minutes = 60
-    cycles_for_resync = (sync_interval_minutes * 60) / sleep_time_seconds
+    # Time based: with adaptive scheduling the cycles are not evenly spaced
+    resync_interval = timedelta(minutes=sync_interval_minutes)
+    full_sync_interval = timedelta(hours=float(os.getenv('FULL_SYNC_INTERVAL_HOURS', '24')))
+    last_full_sync = datetime.now()
+    last_resync = datetime.now()
     cycle_count = 1
 
     while running_thread:
         now = datetime.now()
-        if cycle_count > cycles_for_resync:
-            print(f"\n--- Scheduled Full Sync Triggered at: {now.strftime('%Y-%m-%d %H:%M:%S')} ---")
+        sleep_seconds = sleep_time_seconds
+        if now - last_resync >= resync_interval:
             sync_use_case.reset_recovery_state()
             try:
-                perform_full_sync_wrapper()
+                if now - last_full_sync >= full_sync_interval:
+                    print(f"\n--- Scheduled Full Sync Triggered at: {now.strftime('%Y-%m-%d %H:%M:%S')} ---")
+                    perform_full_sync_wrapper()
+                    last_full_sync = now
+                else:
+                    print(f"\n--- Scheduled Delta Sync Triggered at: {now.strftime('%Y-%m-%d %H:%M:%S')} ---")
+                    perform_delta_sync_wrapper()
             except Exception as e:
                 print(f"!!! Scheduled sync failed: {e}. !!!")
-            cycle_count = 1
+            last_resync = now
 
         if not (23 <= now.hour or now.hour < 5):  # Quiet hours
-            print(
-                f"\n--- Cycle {cycle_count}/{int(cycles_for_resync)} started at: {now.strftime('%Y-%m-%d %H:%M:%S')} ---")
-            with scraping_lock:
-                try:
-                    sync_use_case.execute()
-                    print(f"--- Cycle finished successfully. Next check in {sleep_time_seconds} seconds. ---")
-                except Exception:
-                    print(f"--- Cycle failed. See logs above. Next check in {sleep_time_seconds} seconds. ---")
+            print(f"\n--- Cycle {cycle_count} started at: {now.strftime('%Y-%m-%d %H:%M:%S')} ---")
+            try:
+                sync_use_case.execute()
+                sleep_seconds = next_check_seconds(sync_use_case, sleep_time_seconds)
+                print(f"--- Cycle finished successfully. Next check in {sleep_seconds:.0f} seconds. ---")
+            except Exception:
+                print(f"--- Cycle failed. See logs above. Next check in {sleep_seconds} seconds. ---")
             cycle_count += 1
         else:
             print(f"Quiet hours. Skipping synchronization. Current time: {now.strftime('%Y-%m-%d %H:%M:%S')}")
 
-        sleep(sleep_time_seconds)
+        sleep(sleep_seconds)
+
+
+def next_check_seconds(sync_use_case: SyncAndNotifyUseCase, default: float) -> float:
+    """With adaptive scheduling, the next cycle starts when the next discipline is due (at most default)."""
+    scheduler = sync_use_case.discipline_scheduler
+    if scheduler is None:
+        return default
+    return max(30.0, scheduler.seconds_until_next_due(default))
 
 
 # --- FastAPI Lifespan Manager ---
@@ -127,13 +164,43 @@ async def lifespan(app: FastAPI):
     """
     global dependencies, running_thread
     print("API Startup: Setting up dependencies...")
+    load_dotenv()
 
     dependencies['student_repo'] = StudentPgRepository(in_memory_store)
+    dependencies['student_repo'].ensure_schema()
     dependencies['discipline_repo'] = DisciplinePgRepository()
+    dependencies['discipline_repo'].ensure_schema()
     dependencies['student_discipline_repo'] = StudentDisciplinePgRepository()
     dependencies['post_repo'] = PostPgRepository()
+    dependencies['outbox_repo'] = NotificationOutboxPgRepository()
+    dependencies['outbox_repo'].ensure_table()
     dependencies['scraping_service'] = ScrapingAdapter()
+    # Registration, deletion and the crawler only contend on the same student
+    dependencies['student_locks'] = KeyedLock()
     dependencies['notification_service'] = WhatsappNotificationService()
+    dependencies['notification_dispatcher'] = NotificationDispatcher(
+        dependencies['notification_service'],
+        workers=int(os.getenv('NOTIFY_WORKERS', '4')),
+        queue_size=int(os.getenv('NOTIFY_QUEUE_SIZE', '1000')),
+        per_destination_per_minute=float(os.getenv('NOTIFY_PER_DESTINATION_PER_MINUTE', '20')),
+        max_attempts=int(os.getenv('NOTIFY_MAX_ATTEMPTS', '8'))
+    )
+    dependencies['notification_dispatcher'].start()
+    dependencies['outbox_relay'] = NotificationOutboxRelay(
+        dependencies['outbox_repo'],
+        dependencies['notification_dispatcher'],
+        in_memory_store,
+        batch_size=int(os.getenv('OUTBOX_BATCH_SIZE', '100')),
+        poll_interval_seconds=float(os.getenv('OUTBOX_POLL_INTERVAL_SECONDS', '30')),
+        max_attempts=int(os.getenv('OUTBOX_MAX_ATTEMPTS', '3'))
+    )
+    dependencies['report_card_service'] = ReportCardService(
+        scraping_service=dependencies['scraping_service'],
+        ttl_seconds=float(os.getenv('REPORT_CARD_CACHE_TTL_SECONDS', '600')),
+        max_concurrent_fetches=int(os.getenv('REPORT_CARD_MAX_CONCURRENT_FETCHES', '4')),
+        timeout_seconds=float(os.getenv('REPORT_CARD_TIMEOUT_SECONDS', '20'))
+    )
+    prefetch_report_cards = os.getenv('REPORT_CARD_PREFETCH_ENABLED', 'false').lower() == 'true'
 
     dependencies['sync_use_case'] = SyncAndNotifyUseCase(
         store=in_memory_store,
@@ -142,19 +209,34 @@ async def lifespan(app: FastAPI):
         post_repo=dependencies['post_repo'],
         scraping_service=dependencies['scraping_service'],
         notification_service=dependencies['notification_service'],
-        sync_callback=perform_full_sync_wrapper
+        sync_callback=perform_full_sync_wrapper,
+        max_workers=int(os.getenv('SYNC_MAX_WORKERS', '4')),
+        scheduling_mode=os.getenv('SYNC_SCHEDULING_MODE', 'discipline'),
+        notification_dispatcher=dependencies['notification_dispatcher'],
+        outbox_relay=dependencies['outbox_relay'],
+        student_locks=dependencies['student_locks'],
+        report_card_service=dependencies['report_card_service'] if prefetch_report_cards else None,
+        report_card_refresh_seconds=float(os.getenv('REPORT_CARD_PREFETCH_INTERVAL_MINUTES', '60')) * 60,
+        discipline_refresh_seconds=float(os.getenv('DISCIPLINE_REFRESH_MINUTES', '360')) * 60,
+        discipline_scheduler=DisciplineScheduler(
+            min_interval_seconds=float(os.getenv('SYNC_MIN_INTERVAL_SECONDS', '120')),
+            max_interval_seconds=float(os.getenv('SYNC_MAX_INTERVAL_MINUTES', '360')) * 60,
+            backoff=float(os.getenv('SYNC_INTERVAL_BACKOFF', '1.5')),
+            daily_interval_seconds=float(os.getenv('SYNC_DAILY_INTERVAL_SECONDS', '180'))
+        ) if os.getenv('SYNC_ADAPTIVE_SCHEDULING', 'true').lower() == 'true' else None
     )
     dependencies['save_student_use_case'] = SaveStudent(
         student_repo=dependencies['student_repo'],
         student_discipline_repo=dependencies['student_discipline_repo'],
-        scraping_service=dependencies['scraping_service']
+        scraping_service=dependencies['scraping_service'],
+        student_locks=dependencies['student_locks']
     )
     dependencies['get_grades_use_case'] = GetStudentGrades(
-        scraping_service=dependencies['scraping_service'],
+        report_card_service=dependencies['report_card_service'],
         student_repository=dependencies['student_repo']
     )
     dependencies['get_absences_use_case'] = GetStudentAbsences(
-        scraping_service=dependencies['scraping_service'],
+        report_card_service=dependencies['report_card_service'],
         student_repository=dependencies['student_repo']
     )
 
@@ -163,6 +245,8 @@ async def lifespan(app: FastAPI):
 
     print("API Startup: Starting background threads.")
     running_thread = True
+    # Started after the initial sync so pending messages can be matched to their students
+    dependencies['outbox_relay'].start()
     threading.Thread(target=crawler_loop, daemon=True).start()
     threading.Thread(target=cleanup_expired_codes, daemon=True).start()
 
@@ -170,6 +254,11 @@ async def lifespan(app: FastAPI):
 
     print("API Shutdown: Stopping background thread.")
     running_thread = False
+    dependencies['outbox_relay'].stop(timeout=5)
+    print("API Shutdown: Draining pending notifications...")
+    dependencies['report_card_service'].shutdown()
+    dependencies['notification_dispatcher'].stop(timeout=float(os.getenv('NOTIFY_SHUTDOWN_TIMEOUT_SECONDS', '30')))
+    get_portal_session_manager().shutdown()
 
 
 # --- FastAPI App Initialization ---
@@ -220,9 +309,10 @@ def health_check():
 
 
 @app.get("/notas", summary="Busca as notas de um aluno via WhatsApp")
-def get_grades_endpoint(
+async def get_grades_endpoint(
         token: Annotated[HTTPAuthorizationCredentials, Depends(auth_scheme)],
         sender_phone: str = Query(..., alias="from"),
+        refresh: bool = Query(False, description="Ignora o cache e busca o boletim novamente no portal"),
 ):
     load_dotenv()
     expected_token = os.getenv('ACESS_TOKEN')
@@ -234,14 +324,15 @@ def get_grades_endpoint(
         raise HTTPException(status_code=401, detail="Token de acesso inválido.")
 
     uc: GetStudentGrades = dependencies['get_grades_use_case']
-    response_message = uc.execute(sender_phone)
+    response_message = await uc.execute_async(sender_phone, refresh)
     return {"data": response_message}
 
 
 @app.get("/faltas", summary="Busca as faltas de um aluno via WhatsApp")
-def get_absences_endpoint(
+async def get_absences_endpoint(
         token: Annotated[HTTPAuthorizationCredentials, Depends(auth_scheme)],
         sender_phone: str = Query(..., alias="from"),
+        refresh: bool = Query(False, description="Ignora o cache e busca o boletim novamente no portal"),
 ):
     load_dotenv()
     expected_token = os.getenv('ACESS_TOKEN')
@@ -253,10 +344,29 @@ def get_absences_endpoint(
         raise HTTPException(status_code=401, detail="Token de acesso inválido.")
 
     uc: GetStudentAbsences = dependencies['get_absences_use_case']
-    response_message = uc.execute(sender_phone)
+    response_message = await uc.execute_async(sender_phone, refresh)
     return {"data": response_message}
 
 
+@app.get("/metrics", summary="Métricas do crawler por etapa (formato Prometheus ou JSON)")
+def metrics_endpoint(
+        token: Annotated[HTTPAuthorizationCredentials, Depends(auth_scheme)],
+        format: str = Query("prometheus", description="'prometheus' ou 'json' (inclui o ciclo atual e o último ciclo)"),
+):
+    load_dotenv()
+    expected_token = os.getenv('ACESS_TOKEN')
+
+    if not expected_token:
+        raise HTTPException(status_code=500, detail="Variável de ambiente ACESS_TOKEN não configurada no servidor.")
+
+    if token.credentials != expected_token:
+        raise HTTPException(status_code=401, detail="Token de acesso inválido.")
+
+    if format == "json":
+        return get_metrics().snapshot()
+    return PlainTextResponse(get_metrics().render_prometheus(), media_type="text/plain; version=0.0.4")
+
+
 @app.get("/registrar", summary="retorna o link da página de registro")
 def get_register_url_endpoint(
         token: Annotated[HTTPAuthorizationCredentials, Depends(auth_scheme)],
@@ -310,29 +420,28 @@ def create_student(
 
     uc: SaveStudent = dependencies['save_student_use_case']
 
-    with scraping_lock:
-        try:
-            result = uc.new_student(
-                phone=student_data["phone"],
-                faculty_registration=student_data["faculty_registration"],
-                password=student_data["password"]
-            )
+    try:
+        result = uc.new_student(
+            phone=student_data["phone"],
+            faculty_registration=student_data["faculty_registration"],
+            password=student_data["password"]
+        )
 
-            if isinstance(result, Student):
-                del verification_codes[code]
-                perform_full_sync_wrapper()
-                return {"status": "success", "detail": f"Aluno '{result.name}' registrado.",
-                        "student_id": result.id_student}
-            else:
-                status_code = 401 if "credenciais" in result or "login" in result.lower() else 409
-                raise HTTPException(status_code=status_code, detail=result)
+        if isinstance(result, Student):
+            # The repository already added the new student to the in-memory store.
+            del verification_codes[code]
+            return {"status": "success", "detail": f"Aluno '{result.name}' registrado.",
+                    "student_id": result.id_student}
+        else:
+            status_code = 401 if "credenciais" in result or "login" in result.lower() else 409
+            raise HTTPException(status_code=status_code, detail=result)
 
-        except StudentCreationError as e:
-            raise HTTPException(status_code=500, detail=str(e))
-        except HTTPException as e:
-            raise e
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Um erro inesperado ocorreu no servidor: {e}")
+    except StudentCreationError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Um erro inesperado ocorreu no servidor: {e}")
 
 
 @app.post("/verification-code", summary="Faz o envio do código de verificação para validar o número")
@@ -350,7 +459,8 @@ def send_verification_code(
         raise HTTPException(status_code=401, detail="Token de acesso inválido.")
 
     student_repo: StudentPgRepository = dependencies['student_repo']
-    if student_repo.get_by_phone_number(
+    # Cache first, then one indexed SELECT per field (blind indexes), never the whole table
+    if student_repo.find_by_phone_number(
             student_data.phone) or student_repo.find_by_registration(
             student_data.faculty_registration):
         raise HTTPException(status_code=409, detail="Este número de telefone ou matrícula já está em uso.")
@@ -392,11 +502,12 @@ def delete_student(
 
     uc: SaveStudent = dependencies['save_student_use_case']
     
-    with scraping_lock:
-        result = uc.del_student(registration, delete_data.password)
+    result = uc.del_student(registration, delete_data.password)
 
     if result is True:
-        perform_full_sync_wrapper()  # Resync cache
+        # The repository already removed the student and their associations from the in-memory store.
+        dependencies['report_card_service'].invalidate(registration)
+        get_portal_session_manager().invalidate(registration)
         return {"status": "success", "detail": f"Aluno com matrícula {registration} removido."}
     elif result is False:
         raise HTTPException(status_code=404,